@@ -0,0 +1,19 @@
+"""
+Celery application of the Django project.
+
+Runs the long service imports outside of the web workers. The configuration is read from the
+Django settings (`CELERY_*` names) and the tasks are discovered in the installed apps.
+
+Start a worker with:
+    celery -A config worker --queues=import --pool=solo
+"""
+
+from celery import Celery
+
+from .env import configure_django_settings
+
+configure_django_settings()
+
+app = Celery("config")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
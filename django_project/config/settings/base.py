@@ -12,12 +12,10 @@ Notes:
 
 from pathlib import Path
 from typing import Any
+from urllib.parse import quote_plus
 
 import environ
 
-# from urllib.parse import quote_plus
-
-
 # ---------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------
@@ -101,27 +99,26 @@ def build_postgres_dict_from_parts() -> dict[str, Any]:
     return cfg
 
 
-# def build_redis_url(db_env_name: str, default_db: str) -> str:
-#     """
-#     Compose a `redis://` URL from REDIS_* envs plus `REDIS_PASSWORD[_FILE]`.
-#
-#     Args:
-#         db_env_name: Name of the env var carrying the logical Redis DB index
-#                      (e.g., "REDIS_DB_BROKER").
-#         default_db: Fallback DB index string to use when `db_env_name` is unset.
-#
-#     Returns:
-#         A `redis://` or `redis://:password@host:port/db` connection URL.
-#     """
-#     host = env("REDIS_HOST", default="redis")
-#     port = env("REDIS_PORT", default="6379")
-#     db = env(db_env_name, default=default_db)
-#     pwd = read_secret(
-#         env("REDIS_PASSWORD_FILE", default=None), default=env("REDIS_PASSWORD", default="")
-#     )
-#     if pwd:
-#         return f"redis://:{quote_plus(pwd)}@{host}:{port}/{db}"
-#     return f"redis://{host}:{port}/{db}"
+def build_redis_url(db_env_name: str, default_db: str) -> str:
+    """
+    Compose a `redis://` URL from REDIS_* envs plus `REDIS_PASSWORD[_FILE]`.
+
+    Args:
+        db_env_name: Name of the env var carrying the logical Redis DB index
+                     (e.g., "REDIS_DB_BROKER").
+        default_db: Fallback DB index string to use when `db_env_name` is unset.
+
+    Returns:
+        A `redis://` or `redis://:password@host:port/db` connection URL.
+    """
+    host = env("REDIS_HOST", default="redis")
+    port = env("REDIS_PORT", default="6379")
+    db = env(db_env_name, default=default_db)
+    pwd = read_secret(env("REDIS_PASSWORD_FILE", default=None), default=env("REDIS_PASSWORD", default=""))
+    if pwd:
+        return f"redis://:{quote_plus(pwd)}@{host}:{port}/{db}"
+    return f"redis://{host}:{port}/{db}"
+
 
 # ---------------------------------------------------------------------
 # Core / Security
@@ -175,7 +172,7 @@ MIDDLEWARE = [
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": ["templates"],  # Global templates directory
+        "DIRS": [BASE_DIR / "templates"],  # Global templates directory
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -220,6 +217,34 @@ else:
     else:
         DATABASES = {"default": env.db(default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}")}
 
+# ---------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------
+# Redis when REDIS_HOST is set, shared by all Gunicorn workers; otherwise per-process local memory
+if env("REDIS_HOST", default=None):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": build_redis_url("REDIS_DB_CACHE", "2"),
+            "KEY_PREFIX": env("CACHE_KEY_PREFIX", default="tsl_manager"),
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# ---------------------------------------------------------------------
+# Celery (service imports)
+# ---------------------------------------------------------------------
+# Imports run on a worker consuming the "import" queue of the Redis broker shared with the downloader.
+# Without REDIS_HOST there is no broker: tasks run eagerly, within the request (local runs).
+if env("REDIS_HOST", default=None):
+    CELERY_BROKER_URL = build_redis_url("REDIS_DB_BROKER", "0")
+else:
+    CELERY_BROKER_URL = "memory://"
+    CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_ROUTES = {"tsl_manager_app.tasks.*": {"queue": "import"}}
+CELERY_TASK_IGNORE_RESULT = True
+
 # ---------------------------------------------------------------------
 # Password validation
 # ---------------------------------------------------------------------
@@ -245,6 +270,46 @@ STATIC_URL = "/static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = Path(env("MEDIA_ROOT", default="/code/media"))
 
+# ---------------------------------------------------------------------
+# TSL PARSER
+# ---------------------------------------------------------------------
+# XML engine used to read TSL files: "minidom" (full DOM) or "iterparse" (incremental, lower memory)
+TSL_PARSER_BACKEND: str = env("TSL_PARSER_BACKEND", default="minidom")
+# Number of worker processes parsing TSL files in parallel (1 parses them in the web process)
+TSL_PARSER_WORKERS: int = env.int("TSL_PARSER_WORKERS", default=1)
+# Import only TSL files whose content hash changed since the last successful import
+TSL_PARSER_INCREMENTAL: bool = env.bool("TSL_PARSER_INCREMENTAL", default=True)
+# How parsed services are written: "upsert" (single INSERT ... ON CONFLICT statement, PostgreSQL only;
+# other databases fall back to bulk) or "bulk" (bulk_create / bulk_update)
+TSL_SERVICE_UPDATE_MODE: str = env("TSL_SERVICE_UPDATE_MODE", default="upsert")
+# Seconds an import job may hold the import lock; a job still unfinished by then is reported as failed.
+# Its progress stays available for polling twice as long.
+TSL_IMPORT_JOB_TIMEOUT: int = env.int("TSL_IMPORT_JOB_TIMEOUT", default=3600)
+
+# ---------------------------------------------------------------------
+# SERVICE LISTS
+# ---------------------------------------------------------------------
+# Number of services per page of the service lists; a `page_size` query parameter may override it
+TSL_SERVICES_PAGE_SIZE: int = env.int("TSL_SERVICES_PAGE_SIZE", default=50)
+# Seconds a rendered service list stays cached; entries are dropped earlier whenever the data version changes
+TSL_LIST_CACHE_TIMEOUT: int = env.int("TSL_LIST_CACHE_TIMEOUT", default=300)
+
+# ---------------------------------------------------------------------
+# TSL STATUS
+# ---------------------------------------------------------------------
+# Number of days before its next update date from which a TSL is reported as expiring soon
+TSL_EXPIRY_WARNING_DAYS: int = env.int("TSL_EXPIRY_WARNING_DAYS", default=7)
+
+# ---------------------------------------------------------------------
+# METRICS
+# ---------------------------------------------------------------------
+# Prometheus Pushgateway the importer worker pushes its metrics to after every import; empty disables pushing.
+# The web app serves the metrics of its own processes at /metrics/ (set PROMETHEUS_MULTIPROC_DIR when running
+# several workers): imports run by the Celery worker are only seen through the Pushgateway.
+TSL_METRICS_PUSHGATEWAY_URL: str = env("TSL_METRICS_PUSHGATEWAY_URL", default="")
+# Bearer token required to scrape /metrics/; empty leaves the endpoint to the nginx allow-list
+TSL_METRICS_TOKEN: str = env("TSL_METRICS_TOKEN", default="")
+
 # ---------------------------------------------------------------------
 # DEFAULT FIELD CONFIGURATION
 # ---------------------------------------------------------------------
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The loader runs as a script from this directory (`python main.py`), so its modules import each other as
+# top-level modules, `config` included, which clashes with the Django project's `config` package. Its tests
+# therefore run without the Django plugin: `python -m pytest -p no:django django_project/send_to_db`.
+LOADER_DIR = Path(__file__).resolve().parent
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if not config.pluginmanager.has_plugin("django"):
+        sys.path.insert(0, str(LOADER_DIR))
+
+
+def pytest_ignore_collect(collection_path: Path, config: pytest.Config) -> bool | None:
+    if config.pluginmanager.has_plugin("django"):
+        return True
+    return None
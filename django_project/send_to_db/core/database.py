@@ -1,70 +1,264 @@
+import asyncio
 import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
 
 import asyncpg
+from config.config import load_config
 
-from ..config.config import load_config
 from .parser import TSPService
 
 logger = logging.getLogger(__name__)
 
+SERVICES_TABLE = "tsl_manager_app_tspserviceinfo"
+DATA_VERSION_TABLE = "tsl_manager_app_dataversion"
+STAGING_TABLE = "tsp_service_staging"
 
-async def insert_services_to_db(services: list[TSPService]) -> None:
+# Number of records sent per COPY command
+COPY_BATCH_SIZE = 5000
+
+# Connection pool size, unless set with `min_size` / `max_size` in the database config
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 4
+
+COLUMNS = (
+    "country_code",
+    "country_name",
+    "tsp_name",
+    "tsp_service_name",
+    "tsp_service_type",
+    "tsp_service_status",
+    "tsp_service_start_date",
+    "tsp_url",
+    "crl_url",
+    "tsp_service_digital_id",
+    "service_status_app",
+    "crl_url_status_app",
+)
+
+
+# Kept for the lifetime of each pooled connection and emptied by every commit
+CREATE_STAGING_SQL = f"""
+CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DELETE ROWS AS
+SELECT {", ".join(COLUMNS)} FROM {SERVICES_TABLE} WITH NO DATA
+"""
+
+# Prepared once per pooled connection: asyncpg keeps it in the connection's statement cache. Services without
+# a digital ID are not covered by the partial unique index of the web app, so each service is inserted once
+# per load and only if no row matches; the ON CONFLICT clause names the index predicate so it can be inferred.
+MERGE_SQL = f"""
+INSERT INTO {SERVICES_TABLE} ({", ".join(COLUMNS)})
+SELECT DISTINCT ON (s.tsp_service_name, s.tsp_service_digital_id) {", ".join(f"s.{c}" for c in COLUMNS)}
+FROM {STAGING_TABLE} AS s
+WHERE NOT EXISTS (
+    SELECT 1 FROM {SERVICES_TABLE} AS t
+    WHERE t.tsp_service_name = s.tsp_service_name AND t.tsp_service_digital_id = s.tsp_service_digital_id
+)
+ON CONFLICT (tsp_service_name, tsp_service_digital_id) WHERE tsp_service_digital_id <> '' DO NOTHING
+RETURNING country_code
+"""
+
+# Bumps the version of the services data shared with the web app (see `tsl_manager_app.cache.data_version`)
+# in the transaction of the load, so the web app rebuilds its cached filter choices and lists once it commits
+BUMP_DATA_VERSION_SQL = f"""
+INSERT INTO {DATA_VERSION_TABLE} (id, version) VALUES (1, 1)
+ON CONFLICT (id) DO UPDATE SET version = {DATA_VERSION_TABLE}.version + 1
+"""
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+@dataclass
+class LoadResult:
+    """
+    Outcome of a load: row counts, statements sent, timing and the database error, if any.
     """
-    Inserts a list of TSPService entries into the PostgreSQL database.
 
-    Args:
-        services (list[TSPService]): A list of TSPService objects containing service details to be inserted.
+    copied: int = 0
+    inserted_by_country: Counter[str] = field(default_factory=Counter)
+    statements: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def inserted(self) -> int:
+        return sum(self.inserted_by_country.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.copied / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def get_pool() -> asyncpg.Pool:
+    """
+    Returns the connection pool shared by all loads, creating it on first use.
+
+    The pool size is read from the `min_size` and `max_size` keys of the database config; the other keys
+    are passed to asyncpg as connection parameters.
+
+    Returns:
+        asyncpg.Pool: The shared connection pool.
+    """
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            params: dict[str, Any] = load_config()
+            min_size = int(params.pop("min_size", POOL_MIN_SIZE))
+            max_size = int(params.pop("max_size", POOL_MAX_SIZE))
+            _pool = await asyncpg.create_pool(min_size=min_size, max_size=max_size, **params)
+            logger.info(f"Opened a database connection pool ({min_size}-{max_size} connections).")
+        return _pool
+
+
+async def close_pool() -> None:
+    """
+    Closes the shared connection pool, if it was opened.
+    """
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+
 
-    Raises:
-        asyncpg.PostgresError: If a database error occurs during connection or execution.
+def _to_record(s: TSPService) -> tuple[Any, ...]:
     """
-    # params = load_config()
-    # conn = await asyncpg.connect(**params)
-    params: dict[str, str] = load_config()
-    conn: asyncpg.Connection = await asyncpg.connect(**params)
-
-    sql = """
-    INSERT INTO tsl_manager_app_tspserviceinfo (
-        country_code, country_name, tsp_name, tsp_service_name,
-        tsp_service_type, tsp_service_status, tsp_service_start_date,
-        tsp_url, crl_url, tsp_service_digital_id, service_status_app, crl_url_status_app
-    ) VALUES (
-        $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12
+    Converts a TSPService into a tuple ordered like COLUMNS.
+    """
+    return (
+        s.country_code,
+        s.country_name,
+        s.tsp_name,
+        s.service_name,
+        s.service_type,
+        s.service_status,
+        s.service_start_date,
+        s.tsp_url,
+        s.crl_url,
+        s.service_digital_id,
+        s.service_status_app,
+        s.crl_url_status_app,
     )
+
+
+class ServiceLoader:
     """
+    Loads services into the database within a single transaction, on a connection from the shared pool.
+
+    Records are copied into a temporary staging table as they arrive and merged into the services table
+    at the end, so a load either completes as a whole or leaves the table untouched.
+
+    Usage:
+        async with ServiceLoader() as loader:
+            await loader.copy(services)
+            inserted = await loader.merge()
+    """
+
+    def __init__(self, batch_size: int = COPY_BATCH_SIZE) -> None:
+        """
+        Args:
+            batch_size (int): Maximum number of records sent per COPY command.
+        """
+        self.batch_size = batch_size
+        self.copied = 0
+        # Statements sent to the database: staging table creation, COPY batches, the merge and the version bump
+        self.statements = 0
+        self._pool: Optional[asyncpg.Pool] = None
+        self._conn: Any = None
+        self._transaction: Any = None
+
+    async def __aenter__(self) -> "ServiceLoader":
+        self._pool = await get_pool()
+        self._conn = await self._pool.acquire()
+        try:
+            self._transaction = self._conn.transaction()
+            await self._transaction.start()
+            await self._conn.execute(CREATE_STAGING_SQL)
+            self.statements += 1
+        except BaseException:
+            await self._pool.release(self._conn)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        assert self._pool is not None
+        try:
+            if exc_type is None:
+                await self._transaction.commit()
+            else:
+                await self._transaction.rollback()
+        finally:
+            await self._pool.release(self._conn)
+
+    async def copy(self, services: list[TSPService]) -> None:
+        """
+        Copies services into the staging table, in batches of `batch_size` records.
+
+        Args:
+            services (list[TSPService]): Services to load.
+        """
+        records = [_to_record(s) for s in services]
+        for start in range(0, len(records), self.batch_size):
+            await self._conn.copy_records_to_table(
+                STAGING_TABLE, records=records[start : start + self.batch_size], columns=COLUMNS
+            )
+            self.statements += 1
+        self.copied += len(records)
 
+    async def merge(self) -> Counter[str]:
+        """
+        Inserts the staged services into the services table, skipping the ones already present
+        (same service name and digital ID), and bumps the data version if any service was inserted.
+
+        Returns:
+            Counter[str]: Number of inserted services per country code.
+        """
+        rows = await self._conn.fetch(MERGE_SQL)
+        self.statements += 1
+        if rows:
+            await self._conn.execute(BUMP_DATA_VERSION_SQL)
+            self.statements += 1
+        return Counter(row["country_code"] for row in rows)
+
+
+async def insert_services_to_db(services: list[TSPService], batch_size: int = COPY_BATCH_SIZE) -> LoadResult:
+    """
+    Inserts a list of TSPService entries into the PostgreSQL database.
+
+    The records are loaded with COPY into a temporary staging table, then merged into the services table
+    with a single INSERT ... SELECT. Services already present (same service name and digital ID) are left untouched.
+    Connections come from the shared pool, so repeated calls reuse warm connections.
+
+    Args:
+        services (list[TSPService]): A list of TSPService objects containing service details to be inserted.
+        batch_size (int): Maximum number of records sent per COPY command.
+
+    Returns:
+        LoadResult: Row counts and timing of the load; `error` holds the database error if the load was rolled back.
+    """
+    result = LoadResult()
+    started = time.perf_counter()
     try:
-        async with conn.transaction():
-            for s in services:
-                await conn.execute(
-                    sql,
-                    s.country_code,
-                    s.country_name,
-                    s.tsp_name,
-                    s.service_name,
-                    s.service_type,
-                    s.service_status,
-                    s.service_start_date,
-                    s.tsp_url,
-                    s.crl_url,
-                    s.service_digital_id,
-                    s.service_status_app,
-                    s.crl_url_status_app,
-                )
-
-            # await conn.executemany(sql, [
-            #     (
-            #         s.country_code, s.country_name, s.tsp_name, s.service_name,
-            #         s.service_type, s.service_status, s.service_start_date,
-            #         s.tsp_url, s.crl_url, s.service_digital_id,
-            #         s.service_status_app, s.crl_url_status_app
-            #     )
-            #     for s in services
-            # ])
-
-        logger.info(f"Inserted {len(services)} services into the database.")
+        async with ServiceLoader(batch_size) as loader:
+            await loader.copy(services)
+            result.inserted_by_country = await loader.merge()
+            result.copied = loader.copied
+            result.statements = loader.statements
     except asyncpg.PostgresError as e:
+        result.error = str(e)
         logger.error(f"Database error: {e}")
-        # raise  # Uncomment if you want the exception to propagate upward
-    finally:
-        await conn.close()
+    result.elapsed = time.perf_counter() - started
+
+    if result.ok:
+        logger.info(
+            f"Inserted {result.inserted} of {result.copied} services into the database "
+            f"in {result.elapsed:.3f}s ({result.rows_per_second:.0f} rows/s, {result.statements} statements)."
+        )
+    return result
@@ -1,11 +1,13 @@
 import logging
 import xml.dom.minidom as minidom
 from base64 import b64decode
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, dataclass
 from datetime import datetime
 from hashlib import sha256
+from itertools import repeat
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 from urllib.parse import urlparse
 
 from .constants import CA_QC_URI, COUNTRIES_EN
@@ -38,24 +40,37 @@ class TSPServiceParser:
     A parser class responsible for extracting TSPService information from XML files in a given directory.
     """
 
-    def __init__(self, directory: Path):
+    def __init__(self, directory: Path, workers: int = 1):
         """
         Initialize the parser with the given directory containing XML files.
 
         Args:
             directory (Path): Path to the directory with XML files.
+            workers (int): Number of worker processes parsing files in parallel; 1 parses them in the current process.
+
+        Raises:
+            ValueError: If the number of workers is not positive.
         """
+        if workers < 1:
+            raise ValueError(f"The number of parser workers must be positive, got {workers}.")
         self.directory = directory
+        self.workers = workers
 
     def parse_all(self) -> list[TSPService]:
         """
         Parse all XML files in the specified directory.
 
+        Files are processed in name order, so the result does not depend on the number of workers.
+
         Returns:
             list[TSPService]: A list of parsed TSPService entries.
         """
+        file_paths = self.xml_files()
+        if self.workers > 1 and len(file_paths) > 1:
+            return self._parse_all_parallel(file_paths)
+
         all_services: list[TSPService] = []
-        for file_path in self.directory.glob("*.xml"):
+        for file_path in file_paths:
             try:
                 services = self._parse_file(file_path)
                 all_services.extend(services)
@@ -63,6 +78,37 @@ class TSPServiceParser:
                 logger.error(f"Failed to parse {file_path.name}: {e}")
         return all_services
 
+    def xml_files(self) -> list[Path]:
+        """
+        List the XML files of the directory, in name order.
+
+        Returns:
+            list[Path]: Paths to the XML files.
+        """
+        return sorted(self.directory.glob("*.xml"))
+
+    def _parse_all_parallel(self, file_paths: list[Path]) -> list[TSPService]:
+        """
+        Parse the given files in a pool of worker processes, sending services back as plain tuples.
+
+        Args:
+            file_paths (list[Path]): Files to parse, in the order of the result.
+
+        Returns:
+            list[TSPService]: A list of parsed TSPService entries.
+        """
+        all_services: list[TSPService] = []
+        workers = min(self.workers, len(file_paths))
+        chunk_size = max(1, len(file_paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(parse_file_records, file_paths, repeat(self.directory), chunksize=chunk_size)
+            for file_path, (records, error) in zip(file_paths, results):
+                if error is not None:
+                    logger.error(f"Failed to parse {file_path.name}: {error}")
+                    continue
+                all_services.extend(TSPService(*record) for record in records)
+        return all_services
+
     def _parse_file(self, path: Path) -> list[TSPService]:
         """
         Parse a single XML file and extract valid TSP services.
@@ -233,3 +279,19 @@ class TSPServiceParser:
                             break
 
         return tsp_url, crl_url
+
+
+def parse_file_records(path: Path, directory: Path) -> tuple[list[tuple[Any, ...]], Optional[str]]:
+    """
+    Parse a single XML file in a worker process.
+
+    Errors are returned as text rather than raised, since parser exceptions cannot always be pickled.
+
+    Returns:
+        tuple: The services found in the file as tuples of TSPService fields, and the error message if any.
+    """
+    try:
+        services = TSPServiceParser(directory)._parse_file(path)
+    except Exception as e:
+        return [], str(e)
+    return [astuple(service) for service in services], None
@@ -1,30 +1,138 @@
 import asyncio
 import logging
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Any, Optional
 
-from core.database import insert_services_to_db
-from core.parser import TSPServiceParser
+import asyncpg
+from core.database import COPY_BATCH_SIZE, LoadResult, ServiceLoader, close_pool
+from core.parser import TSPService, TSPServiceParser, parse_file_records
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent
-DATA_DIRECTORY = BASE_DIR / "data" / "data_1"
+# Directory of the TSL files; the same DATA_DIRECTORY as the web app (its dev default, /code/tsl_downloads in prod)
+DATA_DIRECTORY = Path(os.getenv("DATA_DIRECTORY", str(BASE_DIR / "data" / "data_1")))
+# Number of processes parsing XML files in parallel; like in the web app, 1 parses them without a process pool
+PARSER_WORKERS = int(os.getenv("TSL_PARSER_WORKERS", "1"))
+# Maximum number of parsed files waiting to be loaded; parsing pauses while the queue is full
+PIPELINE_QUEUE_SIZE = int(os.getenv("TSL_PIPELINE_QUEUE_SIZE", "4"))
+
+# Queue items: the services of one parsed file, or None once all files have been parsed
+QueueItem = Optional[list[TSPService]]
+
+
+async def produce(
+    parser: TSPServiceParser, executor: Executor | None, queue: "asyncio.Queue[QueueItem]", parsed: Counter[str]
+) -> None:
+    """
+    Parses the XML files in the executor and puts the services of each file into the queue, in file order.
+
+    At most one file per worker is parsed ahead, so a full queue also holds back the parsing.
+
+    Args:
+        parser: Parser of the data directory.
+        executor: Pool of worker processes, or None to parse in a thread of the current process.
+        queue: Bounded queue read by the consumer.
+        parsed: Counter of parsed services per country code, updated in place.
+    """
+    loop = asyncio.get_running_loop()
+    file_paths = iter(parser.xml_files())
+    pending: deque[tuple[Path, asyncio.Future[Any]]] = deque()
+
+    def submit_next() -> None:
+        file_path = next(file_paths, None)
+        if file_path is not None:
+            pending.append((file_path, loop.run_in_executor(executor, parse_file_records, file_path, parser.directory)))
+
+    for _ in range(parser.workers):
+        submit_next()
+
+    while pending:
+        file_path, future = pending.popleft()
+        records, error = await future
+        submit_next()
+        if error is not None:
+            logger.error(f"Failed to parse {file_path.name}: {error}")
+            continue
+        services = [TSPService(*record) for record in records]
+        parsed.update(s.country_code for s in services)
+        await queue.put(services)
+
+    await queue.put(None)
+
+
+async def consume(loader: ServiceLoader, queue: "asyncio.Queue[QueueItem]") -> None:
+    """
+    Takes services from the queue and copies them to the database in batches of `loader.batch_size`.
+
+    Args:
+        loader: Open loader of the current transaction.
+        queue: Queue filled by the producer.
+    """
+    batch: list[TSPService] = []
+    while (services := await queue.get()) is not None:
+        batch.extend(services)
+        if len(batch) >= loader.batch_size:
+            await loader.copy(batch)
+            batch = []
+    if batch:
+        await loader.copy(batch)
+
+
+def log_summary(parsed: Counter[str], result: LoadResult) -> None:
+    """
+    Logs the number of parsed and inserted services per country, then the totals of the load.
+    """
+    inserted = result.inserted_by_country
+    for country_code in sorted(parsed.keys() | inserted.keys()):
+        logger.info(f"{country_code}: parsed {parsed[country_code]}, inserted {inserted[country_code]}")
+    logger.info(
+        f"Inserted {result.inserted} of {result.copied} services in {result.elapsed:.3f}s "
+        f"({result.rows_per_second:.0f} rows/s, {result.statements} statements)."
+    )
 
 
 async def main() -> None:
     """
     Asynchronously loads and parses TSP XML data, then inserts parsed services into the database.
+
+    Parsing and loading run as a pipeline: the files are parsed (by worker processes if `PARSER_WORKERS` > 1)
+    while the services of the files already parsed are copied to the database, with a bounded queue in between.
     """
     logger.info("Loading and parsing TSP XML data...")
 
-    parser = TSPServiceParser(DATA_DIRECTORY)
-    services = parser.parse_all()
+    parser = TSPServiceParser(DATA_DIRECTORY, workers=PARSER_WORKERS)
+    queue: asyncio.Queue[QueueItem] = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    parsed: Counter[str] = Counter()
 
-    logger.info(f"Parsed {len(services)} services. Inserting into database...")
-    await insert_services_to_db(services)
+    result = LoadResult()
+    started = time.perf_counter()
+    try:
+        pool = ProcessPoolExecutor(max_workers=parser.workers) if parser.workers > 1 else nullcontext()
+        with pool as executor:
+            async with ServiceLoader(COPY_BATCH_SIZE) as loader:
+                async with asyncio.TaskGroup() as tasks:
+                    tasks.create_task(produce(parser, executor, queue, parsed))
+                    tasks.create_task(consume(loader, queue))
+                result.inserted_by_country = await loader.merge()
+                result.copied = loader.copied
+                result.statements = loader.statements
+    except* asyncpg.PostgresError as e:
+        result.error = str(e.exceptions[0])
+        logger.error(f"Database error: {result.error}")
+    finally:
+        await close_pool()
+    result.elapsed = time.perf_counter() - started
 
-    logger.info("Done.")
+    if result.ok:
+        log_summary(parsed, result)
+        logger.info("Done.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+import asyncio
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import TestCase
+
+from core.parser import TSPService, TSPServiceParser
+from main import QueueItem, produce
+
+# The TSL fixtures of the web app
+FIXTURES = Path(__file__).resolve().parents[2] / "tsl_manager_app" / "tests" / "fixtures" / "tsl"
+
+
+class ProducerTests(TestCase):
+    """
+    The producer puts the same services into the queue, in the same order, whatever the number of workers.
+    """
+
+    @staticmethod
+    def _produce(workers: int) -> tuple[list[list[TSPService]], Counter[str]]:
+        async def run() -> tuple[list[list[TSPService]], Counter[str]]:
+            parser = TSPServiceParser(FIXTURES, workers=workers)
+            queue: asyncio.Queue[QueueItem] = asyncio.Queue()
+            parsed: Counter[str] = Counter()
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    await produce(parser, executor, queue, parsed)
+            else:
+                await produce(parser, None, queue, parsed)
+            files = []
+            while (services := queue.get_nowait()) is not None:
+                files.append(services)
+            return files, parsed
+
+        return asyncio.run(run())
+
+    def test_workers_produce_identical_output(self) -> None:
+        files, parsed = self._produce(1)
+
+        self.assertEqual(len(files), 2)
+        self.assertEqual(set(parsed), {"CZ", "PL"})
+        self.assertEqual(self._produce(2), (files, parsed))
+        self.assertEqual(self._produce(3), (files, parsed))
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import TslValidityInfo, TspServiceInfo
+from .models import TslFileManifest, TslValidityInfo, TspServiceInfo
 
 
 @admin.register(TspServiceInfo)
@@ -28,3 +28,4 @@ class TSPAdmin(admin.ModelAdmin):
 
 
 admin.site.register(TslValidityInfo)
+admin.site.register(TslFileManifest)
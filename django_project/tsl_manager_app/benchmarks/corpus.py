@@ -0,0 +1,251 @@
+import base64
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable
+
+from ..constants import COUNTRIES_PL
+
+TSL_NAMESPACE = "http://uri.etsi.org/02231/v2#"
+XMLDSIG_NAMESPACE = "http://www.w3.org/2000/09/xmldsig#"
+
+SERVICE_TYPE_URI = "http://uri.etsi.org/TrstSvc/Svctype/{}"
+SERVICE_STATUS_URI = "http://uri.etsi.org/TrstSvc/TrustedList/Svcstatus/{}"
+# Service types and statuses, with their approximate share of the services in the EU lists
+SERVICE_TYPES = (("CA/QC", 0.55), ("TSA/QTST", 0.2), ("QESValidation/Q", 0.1), ("CA/PKC", 0.1), ("EDS/Q", 0.05))
+SERVICE_STATUSES = (("granted", 0.85), ("withdrawn", 0.15))
+
+# Volume of the EU lists today: one list per country, about 20 providers per list and 7 services per provider
+EU_PROVIDERS_PER_LIST = 20
+EU_SERVICES_PER_PROVIDER = 7
+MAX_SCALE = 10.0
+
+ISSUE_DATE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """
+    Shape of a synthetic TSL corpus.
+    """
+
+    providers_per_list: int = EU_PROVIDERS_PER_LIST
+    services_per_provider: int = EU_SERVICES_PER_PROVIDER
+    certificate_bytes: int = 1500
+    history_instances: int = 1
+    seed: int = 0
+
+    @classmethod
+    def eu_scale(cls, scale: float, **kwargs: int) -> "CorpusSpec":
+        """
+        Returns the spec of a corpus `scale` times the size of the EU lists today, by scaling the number of providers.
+
+        Raises:
+            ValueError: If the scale is not in (0, MAX_SCALE].
+        """
+        if not 0 < scale <= MAX_SCALE:
+            raise ValueError(f"The corpus scale must be in (0, {MAX_SCALE:g}], got {scale:g}.")
+        kwargs.setdefault("providers_per_list", max(1, round(EU_PROVIDERS_PER_LIST * scale)))
+        return cls(**kwargs)
+
+
+@dataclass
+class CorpusStats:
+    """
+    Size of a generated corpus.
+    """
+
+    files: int = 0
+    providers: int = 0
+    services: int = 0
+    bytes: int = 0
+
+
+def generate_corpus(directory: Path, spec: CorpusSpec, countries: Iterable[str] = COUNTRIES_PL) -> CorpusStats:
+    """
+    Writes one synthetic ETSI TS 119 612 trusted list per country into the directory, as "<country code>.xml".
+
+    The files are laid out like the published lists (indented, with multilingual names, service history and
+    a signature block) and have random certificates of the requested size. The output depends only on the spec.
+
+    Args:
+        directory: Directory to write the files to; created if missing.
+        spec: Shape of the corpus.
+        countries: Country codes of the lists.
+
+    Returns:
+        CorpusStats: Number of files, providers and services written, and their total size.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    rnd = random.Random(spec.seed)
+    stats = CorpusStats()
+    for sequence, country_code in enumerate(countries, start=1):
+        xml = _trusted_list(rnd, spec, country_code, sequence).encode()
+        (directory / f"{country_code}.xml").write_bytes(xml)
+        stats.files += 1
+        stats.providers += spec.providers_per_list
+        stats.services += spec.providers_per_list * spec.services_per_provider
+        stats.bytes += len(xml)
+    return stats
+
+
+def _trusted_list(rnd: random.Random, spec: CorpusSpec, country_code: str, sequence: int) -> str:
+    providers = "\n".join(_provider(rnd, spec, country_code, index) for index in range(spec.providers_per_list))
+    next_update = ISSUE_DATE + timedelta(days=rnd.randint(-10, 180))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<TrustServiceStatusList xmlns="{TSL_NAMESPACE}" xmlns:ds="{XMLDSIG_NAMESPACE}" Id="TSL-{country_code}">
+  <SchemeInformation>
+    <TSLVersionIdentifier>5</TSLVersionIdentifier>
+    <TSLSequenceNumber>{sequence}</TSLSequenceNumber>
+    <TSLType>http://uri.etsi.org/TrstSvc/TrustedList/TSLType/EUgeneric</TSLType>
+    <SchemeOperatorName>
+      <Name xml:lang="en">{country_code} Supervisory Body</Name>
+      <Name xml:lang="{country_code.lower()}">{country_code} Supervisory Body</Name>
+    </SchemeOperatorName>
+    <SchemeOperatorAddress>
+      <PostalAddresses>
+        <PostalAddress xml:lang="en">
+          <StreetAddress>1 Main Street</StreetAddress>
+          <Locality>Capital</Locality>
+          <PostalCode>00-001</PostalCode>
+          <CountryName>{country_code}</CountryName>
+        </PostalAddress>
+      </PostalAddresses>
+      <ElectronicAddress>
+        <URI xml:lang="en">mailto:tsl@{country_code.lower()}.example</URI>
+      </ElectronicAddress>
+    </SchemeOperatorAddress>
+    <SchemeName>
+      <Name xml:lang="en">{country_code}:EN_name_value</Name>
+    </SchemeName>
+    <SchemeInformationURI>
+      <URI xml:lang="en">https://tsl.{country_code.lower()}.example/</URI>
+    </SchemeInformationURI>
+    <StatusDeterminationApproach>http://uri.etsi.org/TrstSvc/TrustedList/StatusDetn/EUappropriate</StatusDeterminationApproach>
+    <SchemeTypeCommunityRules>
+      <URI xml:lang="en">http://uri.etsi.org/TrstSvc/TrustedList/schemerules/EUcommon</URI>
+    </SchemeTypeCommunityRules>
+    <SchemeTerritory>{country_code}</SchemeTerritory>
+    <PolicyOrLegalNotice>
+      <TSLLegalNotice xml:lang="en">Synthetic trusted list generated for benchmarking.</TSLLegalNotice>
+    </PolicyOrLegalNotice>
+    <HistoricalInformationPeriod>65535</HistoricalInformationPeriod>
+    <ListIssueDateTime>{_iso(ISSUE_DATE)}</ListIssueDateTime>
+    <NextUpdate>
+      <dateTime>{_iso(next_update)}</dateTime>
+    </NextUpdate>
+    <DistributionPoints>
+      <URI>https://tsl.{country_code.lower()}.example/{country_code}.xml</URI>
+    </DistributionPoints>
+  </SchemeInformation>
+  <TrustServiceProviderList>
+{providers}
+  </TrustServiceProviderList>
+  <ds:Signature Id="signature-{country_code}">
+    <ds:SignedInfo>
+      <ds:SignatureMethod Algorithm="http://www.w3.org/2001/04/xmldsig-more#rsa-sha256"/>
+    </ds:SignedInfo>
+    <ds:SignatureValue>{_random_base64(rnd, 256)}</ds:SignatureValue>
+    <ds:KeyInfo>
+      <ds:X509Data>
+        <ds:X509Certificate>{_random_base64(rnd, spec.certificate_bytes)}</ds:X509Certificate>
+      </ds:X509Data>
+    </ds:KeyInfo>
+  </ds:Signature>
+</TrustServiceStatusList>
+"""
+
+
+def _provider(rnd: random.Random, spec: CorpusSpec, country_code: str, index: int) -> str:
+    name = f"{country_code} Trust Provider {index:04d}"
+    host = f"tsp{index}.{country_code.lower()}.example"
+    services = "\n".join(
+        _service(rnd, spec, f"{name} Service {number:02d}", host, number)
+        for number in range(spec.services_per_provider)
+    )
+    # The trade name is a second TSPName, which the TSL parser reads the provider name from
+    return f"""    <TrustServiceProvider>
+      <TSPInformation>
+        <TSPName>
+          <Name xml:lang="en">{name}</Name>
+          <Name xml:lang="{country_code.lower()}">{name}</Name>
+        </TSPName>
+        <TSPName>{name}</TSPName>
+        <TSPAddress>
+          <PostalAddresses>
+            <PostalAddress xml:lang="en">
+              <StreetAddress>{index} Provider Street</StreetAddress>
+              <Locality>Capital</Locality>
+              <CountryName>{country_code}</CountryName>
+            </PostalAddress>
+          </PostalAddresses>
+          <ElectronicAddress>
+            <URI xml:lang="{country_code.lower()}">mailto:info@{host}</URI>
+            <URI xml:lang="en">https://{host}/</URI>
+          </ElectronicAddress>
+        </TSPAddress>
+        <TSPInformationURI>
+          <URI xml:lang="en">https://{host}/repository</URI>
+        </TSPInformationURI>
+      </TSPInformation>
+      <TSPServices>
+{services}
+      </TSPServices>
+    </TrustServiceProvider>"""
+
+
+def _service(rnd: random.Random, spec: CorpusSpec, name: str, host: str, number: int) -> str:
+    service_type = SERVICE_TYPE_URI.format(_weighted_choice(rnd, SERVICE_TYPES))
+    status = SERVICE_STATUS_URI.format(_weighted_choice(rnd, SERVICE_STATUSES))
+    started = ISSUE_DATE - timedelta(days=rnd.randint(30, 3650))
+    supply_point = f"http://crl.{host}/ca{number}.crl" if rnd.random() < 0.8 else f"https://{host}/ocsp"
+    # Every history instance repeats the service name, which the TSL parser reads from its second occurrence
+    history = "\n".join(f"""            <ServiceHistoryInstance>
+              <ServiceTypeIdentifier>{service_type}</ServiceTypeIdentifier>
+              <ServiceName>{name}</ServiceName>
+              <ServiceDigitalIdentity>
+                <DigitalId>
+                  <X509SKI>{_random_base64(rnd, 20)}</X509SKI>
+                </DigitalId>
+              </ServiceDigitalIdentity>
+              <ServiceStatus>{SERVICE_STATUS_URI.format("undersupervision")}</ServiceStatus>
+              <StatusStartingTime>{_iso(started - timedelta(days=365 * (instance + 1)))}</StatusStartingTime>
+            </ServiceHistoryInstance>""" for instance in range(spec.history_instances))
+    return f"""        <TSPService>
+          <ServiceInformation>
+            <ServiceTypeIdentifier>{service_type}</ServiceTypeIdentifier>
+            <ServiceName>
+              <Name xml:lang="en">{name}</Name>
+            </ServiceName>
+            <ServiceDigitalIdentity>
+              <DigitalId>
+                <X509Certificate>{_random_base64(rnd, spec.certificate_bytes)}</X509Certificate>
+              </DigitalId>
+            </ServiceDigitalIdentity>
+            <ServiceStatus>{status}</ServiceStatus>
+            <StatusStartingTime>{_iso(started)}</StatusStartingTime>
+            <ServiceSupplyPoints>
+              <ServiceSupplyPoint>{supply_point}</ServiceSupplyPoint>
+            </ServiceSupplyPoints>
+            <TSPServiceDefinitionURI>
+              <URI xml:lang="en">https://{host}/policy/{number}</URI>
+            </TSPServiceDefinitionURI>
+          </ServiceInformation>
+          <ServiceHistory>
+{history}
+          </ServiceHistory>
+        </TSPService>"""
+
+
+def _weighted_choice(rnd: random.Random, choices: tuple[tuple[str, float], ...]) -> str:
+    values = [value for value, _ in choices]
+    return rnd.choices(values, [weight for _, weight in choices])[0]
+
+
+def _random_base64(rnd: random.Random, size: int) -> str:
+    return base64.b64encode(rnd.randbytes(size)).decode()
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -0,0 +1,155 @@
+import gc
+import os
+import resource
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, TypeVar
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+T = TypeVar("T")
+
+# Interval between two samples of the resident set size while a stage runs
+RSS_SAMPLE_INTERVAL = 0.005
+MIB = 1024 * 1024
+
+
+@dataclass
+class StageResult:
+    """
+    Measurements of a benchmark stage.
+    """
+
+    name: str
+    wall_s: float
+    peak_rss_mib: float
+    rss_growth_mib: float
+    queries: int
+    items: int | None = None
+    details: dict[str, Any] = field(default_factory=dict)
+
+
+def _current_rss() -> int | None:
+    """Return the resident set size of the process in bytes, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss() -> int:
+    """Return the peak resident set size of the process so far, in bytes."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class _RssSampler:
+    """
+    Samples the resident set size in a background thread and keeps its maximum.
+
+    Falls back to the peak reported by `getrusage`, which never decreases, where /proc is not available.
+    """
+
+    def __init__(self) -> None:
+        self.start = _current_rss()
+        self.peak = self.start or 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(RSS_SAMPLE_INTERVAL):
+            self.peak = max(self.peak, _current_rss() or 0)
+
+    def __enter__(self) -> "_RssSampler":
+        if self.start is None:
+            self.start = _max_rss()
+        else:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._thread.is_alive():
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, _current_rss() or 0)
+        else:
+            self.peak = _max_rss()
+
+
+def run_stage(name: str, func: Callable[[], T], count: Callable[[T], int] | None = None) -> tuple[StageResult, T]:
+    """
+    Runs a benchmark stage and measures its wall time, peak resident set size and database queries.
+
+    Args:
+        name: Name of the stage in the report.
+        func: The stage.
+        count: Returns the number of items the stage processed, from its result.
+
+    Returns:
+        The measurements and the result of the stage.
+    """
+    gc.collect()
+    with _RssSampler() as rss, CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        value = func()
+        wall_s = time.perf_counter() - started
+    result = StageResult(
+        name=name,
+        wall_s=round(wall_s, 6),
+        peak_rss_mib=round(rss.peak / MIB, 2),
+        rss_growth_mib=round(max(rss.peak - (rss.start or 0), 0) / MIB, 2),
+        queries=len(queries),
+        items=count(value) if count is not None else None,
+    )
+    return result, value
+
+
+@dataclass
+class Regression:
+    """
+    A stage measurement that got worse than in the baseline run.
+    """
+
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+
+def compare(
+    baseline: Mapping[str, Any], current: Mapping[str, Any], tolerance: float
+) -> tuple[list[tuple[str, float | None, float | None]], list[Regression]]:
+    """
+    Compares two benchmark reports stage by stage.
+
+    A stage regressed if its wall time or peak RSS grew by more than `tolerance` (a fraction of the baseline),
+    or if it runs more queries. Stages missing from either report are skipped.
+
+    Args:
+        baseline: Report of the reference run.
+        current: Report of this run.
+        tolerance: Allowed relative growth of the wall time and peak RSS.
+
+    Returns:
+        The wall time and peak RSS ratios of every stage run by both, and the regressions.
+    """
+    baseline_stages = {stage["name"]: stage for stage in baseline.get("stages", [])}
+    ratios: list[tuple[str, float | None, float | None]] = []
+    regressions: list[Regression] = []
+    for stage in current["stages"]:
+        before = baseline_stages.get(stage["name"])
+        if before is None:
+            continue
+        wall_ratio = stage["wall_s"] / before["wall_s"] if before["wall_s"] else None
+        rss_ratio = stage["peak_rss_mib"] / before["peak_rss_mib"] if before["peak_rss_mib"] else None
+        ratios.append((stage["name"], wall_ratio, rss_ratio))
+        for metric, ratio in (("wall_s", wall_ratio), ("peak_rss_mib", rss_ratio)):
+            if ratio is not None and ratio > 1 + tolerance:
+                regressions.append(Regression(stage["name"], metric, before[metric], stage[metric]))
+        if stage["queries"] > before["queries"]:
+            regressions.append(Regression(stage["name"], "queries", before["queries"], stage["queries"]))
+    return ratios, regressions
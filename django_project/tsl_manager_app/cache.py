@@ -0,0 +1,74 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import F
+from django.http import QueryDict
+
+from .models import DataVersion, TspServiceInfo
+
+# Primary key of the single DataVersion row, created by migration 0006
+DATA_VERSION_ID = 1
+
+FILTER_CHOICES_KEY = "tsl:filter-choices:{field}:{version}"
+# Choices cached under an older version are never read again and expire after a day
+FILTER_CHOICES_TIMEOUT = 24 * 60 * 60
+
+LIST_FRAGMENT_KEY = "tsl:list:{name}:{version}:{query}"
+
+
+def data_version() -> int:
+    """
+    Returns the current version of the services data, as committed by the last change to the services table.
+    """
+    version: int | None = DataVersion.objects.filter(pk=DATA_VERSION_ID).values_list("version", flat=True).first()
+    return version or 0
+
+
+def bump_data_version() -> None:
+    """
+    Bumps the version of the services data, so the caches derived from it are rebuilt on next use.
+
+    The row is updated in the current transaction: the new version is visible exactly when the change
+    it stands for is committed, and not at all if that change is rolled back.
+    """
+    if not DataVersion.objects.filter(pk=DATA_VERSION_ID).update(version=F("version") + 1):
+        DataVersion.objects.get_or_create(pk=DATA_VERSION_ID, defaults={"version": 1})
+
+
+def filter_choices(field: str) -> list[tuple[str, str]]:
+    """
+    Returns the distinct values of a TspServiceInfo field as sorted filter choices.
+
+    The choices are cached under the current data version (see `data_version`), so they are read again from
+    the database once the data has changed.
+
+    Args:
+        field (str): Name of the field.
+
+    Returns:
+        list[tuple[str, str]]: (value, label) pairs, ordered by value.
+    """
+    key = FILTER_CHOICES_KEY.format(field=field, version=data_version())
+    choices: list[tuple[str, str]] | None = cache.get(key)
+    if choices is None:
+        values = TspServiceInfo.objects.order_by(field).values_list(field, flat=True).distinct()
+        choices = [(value, value) for value in values]
+        cache.set(key, choices, FILTER_CHOICES_TIMEOUT)
+    return choices
+
+
+def list_fragment_key(name: str, params: QueryDict) -> str:
+    """
+    Returns the cache key of a rendered service list for the given query parameters at the current data version.
+
+    Args:
+        name (str): Name of the list.
+        params (QueryDict): Query parameters of the request (filters, page cursor and size), in any order.
+
+    Returns:
+        str: The cache key.
+    """
+    query = urlencode(sorted((key, value) for key, values in params.lists() for value in values))
+    digest = hashlib.sha256(query.encode()).hexdigest()
+    return LIST_FRAGMENT_KEY.format(name=name, version=data_version(), query=digest)
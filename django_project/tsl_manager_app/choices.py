@@ -28,3 +28,14 @@ class CrlUrlStatus(models.TextChoices):
 
     URL_DEFINED = "CRL URL defined", _("CRL URL defined")
     URL_UNDEFINED = "CRL URL undefined", _("CRL URL undefined")
+
+
+class TslValidityAlert(models.TextChoices):
+    """
+    Enumeration of TSL validity alerts, derived from the next update date of a list.
+    """
+
+    VALID = "Valid", _("Valid")
+    EXPIRING_SOON = "Expiring soon", _("Expiring soon")
+    EXPIRED = "Expired", _("Expired")
+    CLOSED = "Closed", _("Closed")
@@ -1,5 +1,8 @@
-from django_filters import AllValuesFilter, CharFilter, ChoiceFilter, FilterSet
+from functools import partial
 
+from django_filters import CharFilter, ChoiceFilter, FilterSet
+
+from .cache import filter_choices
 from .choices import CrlUrlStatus, ServiceStatus, TspServiceStatus
 from .models import TspServiceInfo
 
@@ -9,9 +12,14 @@ class MainViewFilter(FilterSet):
     FilterSet used in the main view to enable filtering of TspServiceInfo records.
     Provides filters by country, provider name, service name, CRL URL status, service status,
     service type, and application handling status.
+
+    The country and service type choices come from the cache (see `filter_choices`), not from the database.
     """
 
-    country_name = AllValuesFilter(empty_label="Country...")
+    country_name = ChoiceFilter(
+        empty_label="Country...",
+        choices=partial(filter_choices, "country_name"),
+    )
 
     tsp_name = CharFilter(label="Service Provider...", lookup_expr="icontains")
 
@@ -27,8 +35,9 @@ class MainViewFilter(FilterSet):
         choices=TspServiceStatus.choices,
     )
 
-    tsp_service_type = AllValuesFilter(
+    tsp_service_type = ChoiceFilter(
         empty_label="Service Type...",
+        choices=partial(filter_choices, "tsp_service_type"),
     )
 
     service_status_app = ChoiceFilter(
@@ -0,0 +1,263 @@
+import dataclasses
+import json
+import platform
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Protocol, TypeVar, cast
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from django.db.models.functions import Mod
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+from send_to_db.core.parser import TSPServiceParser
+
+from ...benchmarks.corpus import MAX_SCALE, CorpusSpec, generate_corpus
+from ...benchmarks.harness import StageResult, compare, run_stage
+from ...choices import ServiceStatus
+from ...constants import COUNTRIES_PL
+from ...models import TspServiceInfo
+from ...services.service_updater import UPDATE_MODES, ServiceUpdater
+from ...services.tsl_parser import ITERPARSE_BACKEND, MINIDOM_BACKEND, ParsedService, TslParser
+from ...views import AllServicesView, FilteredServiceListView, NewServicesView, ProcessedServicesView
+
+T = TypeVar("T")
+
+STAGES = ("parse", "update", "views")
+VIEWS: tuple[type[FilteredServiceListView], ...] = (NewServicesView, AllServicesView, ProcessedServicesView)
+
+# Share of the imported services changed by the "changed" update stage, and marked as served for the list views
+CHANGED_SERVICES_EVERY = 10
+SERVED_SERVICES_EVERY = 5
+
+# The list views render into a private cache, so the cached fragments of the application are neither read nor evicted
+BENCHMARK_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tsl-benchmark"},
+}
+
+
+class _SettingsWithUpdateMode(Protocol):
+    TSL_SERVICE_UPDATE_MODE: str
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the TSL parsers, the service updater and the service list views on a synthetic corpus, "
+        "reporting wall time, peak RSS and query counts per stage. The database stages run in a transaction "
+        "that is rolled back, but they lock the services table meanwhile: use a scratch database."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        corpus = parser.add_argument_group("corpus")
+        corpus.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help=f"Size of the corpus relative to the EU lists today, up to {MAX_SCALE:g} (default 1).",
+        )
+        corpus.add_argument("--providers", type=int, help="Providers per list; overrides the scale.")
+        corpus.add_argument("--services", type=int, help="Services per provider (default 7).")
+        corpus.add_argument("--certificate-bytes", type=int, help="Size of the certificates (default 1500).")
+        corpus.add_argument("--history", type=int, help="History instances per service (default 1).")
+        corpus.add_argument("--seed", type=int, default=0, help="Seed of the generator (default 0).")
+        corpus.add_argument(
+            "--corpus-dir", type=Path, help="Directory to write the corpus to and keep; a temporary one by default."
+        )
+
+        parser.add_argument(
+            "--stages", nargs="+", choices=STAGES, default=list(STAGES), help="Stages to run (default all)."
+        )
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=UPDATE_MODES,
+            help="Service update modes to benchmark (default TSL_SERVICE_UPDATE_MODE).",
+        )
+        parser.add_argument("--workers", type=int, default=1, help="Parser worker processes (default 1).")
+        parser.add_argument("--output", type=Path, help="Write the report as JSON to this file.")
+        parser.add_argument("--compare", type=Path, help="JSON report of an earlier run to compare this run with.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Relative growth of wall time or peak RSS reported as a regression (default 0.2).",
+        )
+        parser.add_argument(
+            "--fail-on-regression", action="store_true", help="Exit with an error if the comparison finds regressions."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        overrides = {
+            name: options[option]
+            for name, option in (
+                ("providers_per_list", "providers"),
+                ("services_per_provider", "services"),
+                ("certificate_bytes", "certificate_bytes"),
+                ("history_instances", "history"),
+            )
+            if options[option] is not None
+        }
+        try:
+            spec = CorpusSpec.eu_scale(options["scale"], seed=options["seed"], **overrides)
+        except ValueError as e:
+            raise CommandError(str(e))
+        baseline = self._load_report(options["compare"]) if options["compare"] else None
+        modes: list[str] = options["modes"] or [
+            cast(_SettingsWithUpdateMode, cast(object, settings)).TSL_SERVICE_UPDATE_MODE
+        ]
+
+        self.results: list[StageResult] = []
+        with ExitStack() as stack:
+            directory = options["corpus_dir"] or Path(stack.enter_context(tempfile.TemporaryDirectory()))
+            _, stats = self._run("corpus:generate", lambda: generate_corpus(directory, spec), lambda s: s.services)
+            self.stdout.write(
+                f"Corpus: {stats.files} lists, {stats.providers} providers, {stats.services} services, "
+                f"{stats.bytes / 1024 / 1024:.1f} MiB in {directory}"
+            )
+            services = self._parse(directory, options["workers"], full="parse" in options["stages"])
+            if "update" in options["stages"] or "views" in options["stages"]:
+                with override_settings(CACHES=BENCHMARK_CACHES):
+                    self._update_and_render(services, modes, options["stages"])
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "platform": platform.platform(),
+                "parser_workers": options["workers"],
+                "update_modes": modes,
+            },
+            "corpus": {"spec": dataclasses.asdict(spec), "stats": dataclasses.asdict(stats)},
+            "stages": [dataclasses.asdict(result) for result in self.results],
+        }
+        if options["output"]:
+            options["output"].write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+            self.stdout.write(f"Report written to {options['output']}")
+        if baseline is not None:
+            self._compare(baseline, report, options["tolerance"], options["fail_on_regression"])
+
+    def _run(self, name: str, func: Callable[[], T], count: Callable[[T], int] | None = None) -> tuple[StageResult, T]:
+        """Runs and prints a stage, and records its result for the report."""
+        result, value = run_stage(name, func, count)
+        self.results.append(result)
+        items = "" if result.items is None else f"{result.items:>8} items"
+        self.stdout.write(
+            f"{name:<42} {result.wall_s:>9.3f} s {result.peak_rss_mib:>9.1f} MiB "
+            f"{result.rss_growth_mib:>+8.1f} MiB {result.queries:>6} queries {items}"
+        )
+        return result, value
+
+    def _parse(self, directory: Path, workers: int, full: bool) -> list[ParsedService]:
+        """
+        Parses the corpus with both backends of the TSL parser and with the send_to_db parser.
+
+        Returns:
+            The services parsed by the TSL parser, which the database stages import.
+        """
+        if not full:
+            return TslParser(directory, COUNTRIES_PL, backend=ITERPARSE_BACKEND, workers=workers).parse_all()
+
+        services: list[ParsedService] = []
+        for backend in (MINIDOM_BACKEND, ITERPARSE_BACKEND):
+            parser = TslParser(directory, COUNTRIES_PL, backend=backend, workers=workers)
+            _, services = self._run(f"parse:tsl_parser[{backend}]", parser.parse_all, len)
+        self._run("parse:send_to_db", TSPServiceParser(directory, workers=workers).parse_all, len)
+        return services
+
+    def _update_and_render(self, services: list[ParsedService], modes: list[str], stages: list[str]) -> None:
+        """
+        Imports the services into an emptied services table, once per update mode, and renders the list views
+        over the last import. Every import is rolled back.
+        """
+        changed = [
+            (
+                dataclasses.replace(service, tsp_url=f"{service.tsp_url}v2")
+                if index % CHANGED_SERVICES_EVERY == 0
+                else service
+            )
+            for index, service in enumerate(services)
+        ]
+        with transaction.atomic():
+            for number, mode in enumerate(modes, start=1):
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"DELETE FROM {connection.ops.quote_name(TspServiceInfo._meta.db_table)}")
+                    if "update" in stages:
+                        for step, step_services in (
+                            ("insert", services),
+                            ("unchanged", services),
+                            ("changed", changed),
+                        ):
+                            self._update(f"update[{mode}]:{step}", step_services, mode)
+                    else:
+                        ServiceUpdater(services, mode=mode).run()
+                    if "views" in stages and number == len(modes):
+                        self._render_views(services)
+                    transaction.set_rollback(True)
+            transaction.set_rollback(True)
+
+    def _update(self, name: str, services: list[ParsedService], mode: str) -> None:
+        updater = ServiceUpdater(services, mode=mode)
+        result, _ = self._run(name, updater.run, lambda _: len(services))
+        result.details.update(created=updater.created_count, updated=updater.updated_count)
+
+    def _render_views(self, services: list[ParsedService]) -> None:
+        """
+        Renders the first page of every service list, unfiltered, filtered and at the largest page size, then
+        the first page again, which the lists with cached fragments serve from the cache.
+        """
+        TspServiceInfo.objects.alias(bucket=Mod("id", SERVED_SERVICES_EVERY)).filter(bucket=0).update(
+            service_status_app=ServiceStatus.SERVED
+        )
+        sample = services[len(services) // 2] if services else None
+        filters: dict[str, dict[str, str]] = {
+            "first-page": {},
+            "filtered": {"country_name": sample.country_name, "tsp_name": "Provider 00"} if sample else {},
+            "page-size-max": {"page_size": str(FilteredServiceListView.max_page_size)},
+            "repeat": {},
+        }
+        factory = RequestFactory()
+        user = User(username="benchmark")
+        for view_class in VIEWS:
+            view = view_class.as_view()
+            for label, params in filters.items():
+                request = factory.get("/", params)
+                request.user = user
+                result, response = self._run(
+                    f"view:{view_class.__name__}:{label}", lambda: cast(HttpResponse, view(request))
+                )
+                result.details.update(status=response.status_code, bytes=len(response.content))
+
+    def _load_report(self, path: Path) -> dict[str, Any]:
+        try:
+            report: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read the baseline report {path}: {e}")
+        return report
+
+    def _compare(self, baseline: dict[str, Any], report: dict[str, Any], tolerance: float, fail: bool) -> None:
+        ratios, regressions = compare(baseline, report, tolerance)
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Compared with the run of {baseline['meta']['created_at']}"))
+        for name, wall_ratio, rss_ratio in ratios:
+            wall = f"{wall_ratio:>6.2f}x" if wall_ratio is not None else "     -"
+            rss = f"{rss_ratio:>6.2f}x" if rss_ratio is not None else "     -"
+            self.stdout.write(f"{name:<42} wall {wall}   peak RSS {rss}")
+        for regression in regressions:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Regression in {regression.stage}: {regression.metric} "
+                    f"{regression.baseline:g} -> {regression.current:g}"
+                )
+            )
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions"))
+        elif fail:
+            raise CommandError(f"{len(regressions)} regression(s) compared with {baseline['meta']['created_at']}")
@@ -0,0 +1,41 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+
+from ...filters import MainViewFilter
+from ...models import TspServiceInfo
+from ...views import AllServicesView, FilteredServiceListView, NewServicesView, ProcessedServicesView
+
+VIEWS: tuple[type[FilteredServiceListView], ...] = (NewServicesView, AllServicesView, ProcessedServicesView)
+
+
+class Command(BaseCommand):
+    help = "Print the query plans of the service list views, with and without the search filters."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--analyze", action="store_true", help="Execute the queries and report actual timings.")
+        parser.add_argument("--search", default="cert", help="Text used for the tsp_name / tsp_service_name filters.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        explain_options: dict[str, Any] = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options = {"analyze": True, "buffers": True}
+
+        filters: list[dict[str, str]] = [
+            {},
+            {"tsp_name": options["search"]},
+            {"tsp_service_name": options["search"]},
+        ]
+        for view in VIEWS:
+            for params in filters:
+                queryset: QuerySet[TspServiceInfo] = MainViewFilter(params, queryset=view().get_queryset()).qs
+                with CaptureQueriesContext(connection) as queries:
+                    plan = queryset.explain(**explain_options)
+                label = ", ".join(f"{key}={value!r}" for key, value in params.items()) or "no filters"
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{view.__name__} ({label})"))
+                self.stdout.write(queries.captured_queries[-1]["sql"])
+                self.stdout.write(plan)
+                self.stdout.write("")
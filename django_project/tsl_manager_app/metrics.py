@@ -0,0 +1,116 @@
+import hmac
+import logging
+import os
+import socket
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Protocol, cast
+
+from django.conf import settings
+from django.db import connection
+from prometheus_client import CollectorRegistry, Histogram, generate_latest, multiprocess, push_to_gateway
+
+logger = logging.getLogger(__name__)
+
+# Metrics of the service imports, recorded by the process running the import. The web app serves those of its own
+# processes (see `MetricsView`), which covers imports only when Celery runs them eagerly; the importer worker is
+# not scraped and pushes its metrics to a Pushgateway instead.
+REGISTRY = CollectorRegistry()
+
+PUSH_JOB = "tsl_importer"
+
+PARSE_FILE_SECONDS = Histogram(
+    "tsl_parse_file_seconds",
+    "Time spent parsing one TSL file.",
+    ["backend"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    registry=REGISTRY,
+)
+IMPORT_STAGE_SECONDS = Histogram(
+    "tsl_import_stage_seconds",
+    "Time spent in each stage of a service import: parsing the files, then storing the services.",
+    ["stage"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+    registry=REGISTRY,
+)
+IMPORT_SERVICES = Histogram(
+    "tsl_import_services",
+    "Parsed services per import, by what the import did with them.",
+    ["result"],
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000),
+    registry=REGISTRY,
+)
+IMPORT_DB_STATEMENTS = Histogram(
+    "tsl_import_db_statements",
+    "Database statements executed to store the services of an import.",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+    registry=REGISTRY,
+)
+
+
+class _SettingsWithMetrics(Protocol):
+    TSL_METRICS_PUSHGATEWAY_URL: str
+    TSL_METRICS_TOKEN: str
+
+
+def render_metrics() -> bytes:
+    """
+    Returns the metrics of the current process in the Prometheus text format.
+
+    When the web app runs several worker processes with `PROMETHEUS_MULTIPROC_DIR` set, the metrics of all
+    the processes are aggregated; otherwise those of the current process are returned.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def push_metrics() -> None:
+    """
+    Pushes the metrics of this process to the Pushgateway, if one is configured.
+
+    Every process pushes under its own grouping key, so the workers do not overwrite each other's metrics.
+    A failed push is logged and ignored.
+    """
+    url = cast(_SettingsWithMetrics, cast(object, settings)).TSL_METRICS_PUSHGATEWAY_URL
+    if not url:
+        return
+    try:
+        push_to_gateway(
+            url, job=PUSH_JOB, registry=REGISTRY, grouping_key={"instance": f"{socket.gethostname()}:{os.getpid()}"}
+        )
+    except OSError as e:
+        logger.warning(f"Could not push the import metrics to {url}: {e}")
+
+
+def is_scrape_authorized(authorization: str) -> bool:
+    """
+    Tells whether a scrape request may read the metrics, given its `Authorization` header.
+
+    Any request may when `TSL_METRICS_TOKEN` is empty, in which case nginx is left to restrict the endpoint;
+    otherwise the header must carry the token as a bearer token.
+    """
+    token = cast(_SettingsWithMetrics, cast(object, settings)).TSL_METRICS_TOKEN
+    if not token:
+        return True
+    return hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
+
+
+@contextmanager
+def count_db_statements() -> Iterator[Callable[[], int]]:
+    """
+    Counts the statements executed on the default database connection within the block.
+
+    Yields:
+        A function returning the number of statements executed so far.
+    """
+    count = 0
+
+    def execute(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+        nonlocal count
+        count += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(execute):
+        yield lambda: count
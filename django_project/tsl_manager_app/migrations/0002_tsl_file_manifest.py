@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-17 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tsl_manager_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TslFileManifest",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("file_name", models.CharField(max_length=255, unique=True, verbose_name="File Name")),
+                ("sha256", models.CharField(max_length=64, verbose_name="SHA-256")),
+                (
+                    "sequence_number",
+                    models.PositiveIntegerField(blank=True, null=True, verbose_name="TSL Sequence Number"),
+                ),
+                ("issue_date", models.DateTimeField(blank=True, null=True, verbose_name="TSL Issue Date")),
+                ("imported_at", models.DateTimeField(auto_now=True, verbose_name="Imported At")),
+            ],
+        ),
+    ]
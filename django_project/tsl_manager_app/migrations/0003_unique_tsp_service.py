@@ -0,0 +1,63 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:10
+
+import logging
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+def remove_duplicate_services(apps, schema_editor):
+    """
+    Keeps one row per (service name, digital ID) so the unique constraint can be created.
+
+    A row already marked as served is kept in preference to the others, then the oldest one. Rows without a
+    digital ID (their certificate could not be decoded) are not covered by the constraint and are all kept:
+    they may be different services sharing a name.
+    """
+    TspServiceInfo = apps.get_model("tsl_manager_app", "TspServiceInfo")
+    kept: dict[tuple[str, str], tuple[int, bool]] = {}
+    duplicates: list[int] = []
+    without_digital_id = 0
+    rows = TspServiceInfo.objects.order_by("pk").values_list(
+        "pk", "tsp_service_name", "tsp_service_digital_id", "service_status_app"
+    )
+    for pk, name, digital_id, status_app in rows:
+        if not digital_id:
+            without_digital_id += 1
+            continue
+        key = (name, digital_id)
+        served = status_app == "Served"
+        if key not in kept:
+            kept[key] = (pk, served)
+        elif served and not kept[key][1]:
+            duplicates.append(kept[key][0])
+            kept[key] = (pk, served)
+        else:
+            duplicates.append(pk)
+
+    for start in range(0, len(duplicates), 500):
+        TspServiceInfo.objects.filter(pk__in=duplicates[start : start + 500]).delete()
+    if duplicates:
+        logger.warning(f"Removed {len(duplicates)} duplicate services.")
+    if without_digital_id:
+        logger.warning(f"Kept {without_digital_id} services without a digital ID, which may share their name.")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tsl_manager_app", "0002_tsl_file_manifest"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_services, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="tspserviceinfo",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("tsp_service_digital_id", ""), _negated=True),
+                fields=("tsp_service_name", "tsp_service_digital_id"),
+                name="unique_tsp_service_name_digital_id",
+            ),
+        ),
+    ]
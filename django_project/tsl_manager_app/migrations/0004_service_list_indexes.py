@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tsl_manager_app", "0003_unique_tsp_service"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tspserviceinfo",
+            index=models.Index(
+                fields=["country_name", "tsp_name", "tsp_service_name", "id"], name="tsp_service_list_order_idx"
+            ),
+        ),
+        # Only helps the paginated query of NewServicesView: its status filter, ordered by these columns with a
+        # LIMIT. Other filters still narrow the rows read from it, but other orderings cannot use it.
+        migrations.AddIndex(
+            model_name="tspserviceinfo",
+            index=models.Index(
+                condition=models.Q(("service_status_app__in", ["Not served (new)", "Not served (withdrawn)"])),
+                fields=["country_name", "tsp_name", "tsp_service_name", "id"],
+                name="tsp_service_new_order_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.1 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+
+def remove_duplicate_countries(apps, schema_editor):
+    """
+    Keeps one row per country code, the most recent one, so the code can be made unique.
+    """
+    TslValidityInfo = apps.get_model("tsl_manager_app", "TslValidityInfo")
+    kept: set[str] = set()
+    duplicates: list[int] = []
+    for pk, country_code in TslValidityInfo.objects.order_by("-pk").values_list("pk", "country_code"):
+        if country_code in kept:
+            duplicates.append(pk)
+        else:
+            kept.add(country_code)
+
+    TslValidityInfo.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tsl_manager_app", "0004_service_list_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_countries, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name="tslvalidityinfo",
+            name="tsl_sequence_number",
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name="TSL Sequence Number"),
+        ),
+        migrations.AlterField(
+            model_name="tslvalidityinfo",
+            name="country_code",
+            field=models.CharField(max_length=2, unique=True, verbose_name="Country Code"),
+        ),
+        migrations.AlterField(
+            model_name="tslvalidityinfo",
+            name="tsl_expiry_date",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="TSL Expiry Date"),
+        ),
+        migrations.AlterField(
+            model_name="tslvalidityinfo",
+            name="tsl_validity_alert",
+            field=models.CharField(
+                choices=[
+                    ("Valid", "Valid"),
+                    ("Expiring soon", "Expiring soon"),
+                    ("Expired", "Expired"),
+                    ("Closed", "Closed"),
+                ],
+                default="",
+                max_length=100,
+                verbose_name="TSL Status",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tslvalidityinfo",
+            index=models.Index(fields=["country_name"], name="tsl_validity_order_idx"),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-17 05:10
+
+from django.db import migrations, models
+
+
+def create_data_version(apps, schema_editor):
+    """
+    Creates the single row the writers bump (see `tsl_manager_app.cache.bump_data_version`).
+    """
+    DataVersion = apps.get_model("tsl_manager_app", "DataVersion")
+    DataVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tsl_manager_app", "0005_tsl_validity_header"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataVersion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("version", models.PositiveBigIntegerField(default=0, verbose_name="Version")),
+            ],
+        ),
+        migrations.RunPython(create_data_version, migrations.RunPython.noop),
+    ]
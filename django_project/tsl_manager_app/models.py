@@ -3,7 +3,7 @@ from typing import ClassVar
 from django.db import models
 from django.db.models.manager import Manager as DjangoManager
 
-from .choices import CrlUrlStatus, ServiceStatus, TspServiceStatus
+from .choices import CrlUrlStatus, ServiceStatus, TslValidityAlert, TspServiceStatus
 
 
 class TspServiceInfo(models.Model):
@@ -28,6 +28,33 @@ class TspServiceInfo(models.Model):
     )
     crl_url_status_app = models.CharField(verbose_name="CRL URL Status", max_length=50, choices=CrlUrlStatus.choices)
 
+    class Meta:
+        # Services without a digital ID (their certificate could not be decoded) are told apart by nothing else
+        # and are left out of the constraint
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tsp_service_name", "tsp_service_digital_id"],
+                name="unique_tsp_service_name_digital_id",
+                condition=~models.Q(tsp_service_digital_id=""),
+            ),
+        ]
+        # Orderings of AllServicesView and NewServicesView (a partial index matching its `service_status_app`
+        # filter, which only helps that paginated query); ProcessedServicesView orders by id first and is served
+        # by the primary key.
+        indexes = [
+            models.Index(
+                fields=["country_name", "tsp_name", "tsp_service_name", "id"],
+                name="tsp_service_list_order_idx",
+            ),
+            models.Index(
+                fields=["country_name", "tsp_name", "tsp_service_name", "id"],
+                name="tsp_service_new_order_idx",
+                condition=models.Q(
+                    service_status_app__in=[ServiceStatus.NEW_NOT_SERVED, ServiceStatus.WITHDRAWN_NOT_SERVED]
+                ),
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"TSP: {self.tsp_name} — Service: {self.tsp_service_name}"
 
@@ -35,12 +62,49 @@ class TspServiceInfo(models.Model):
 class TslValidityInfo(models.Model):
     objects: ClassVar[DjangoManager["TslValidityInfo"]] = models.Manager()
 
-    country_code = models.CharField(verbose_name="Country Code", max_length=2)
+    country_code = models.CharField(verbose_name="Country Code", max_length=2, unique=True)
     country_name = models.CharField(verbose_name="Country", max_length=20)
     tsl_operator_name = models.CharField(verbose_name="TSL Operator", max_length=255)
+    tsl_sequence_number = models.PositiveIntegerField(verbose_name="TSL Sequence Number", null=True, blank=True)
     tsl_issue_date = models.DateTimeField(verbose_name="TSL Issue Date")
-    tsl_expiry_date = models.DateTimeField(verbose_name="TSL Expiry Date")
-    tsl_validity_alert = models.CharField(verbose_name="TSL Status", max_length=100, default="")
+    # NextUpdate of the list; a closed list has none
+    tsl_expiry_date = models.DateTimeField(verbose_name="TSL Expiry Date", null=True, blank=True)
+    tsl_validity_alert = models.CharField(
+        verbose_name="TSL Status", max_length=100, choices=TslValidityAlert.choices, default=""
+    )
+
+    class Meta:
+        # Ordering of TslStatusView
+        indexes = [models.Index(fields=["country_name"], name="tsl_validity_order_idx")]
 
     def __str__(self) -> str:
         return f"Country: {self.country_name} — TSL Operator: {self.tsl_operator_name}"
+
+
+class TslFileManifest(models.Model):
+    objects: ClassVar[DjangoManager["TslFileManifest"]] = models.Manager()
+
+    file_name = models.CharField(verbose_name="File Name", max_length=255, unique=True)
+    sha256 = models.CharField(verbose_name="SHA-256", max_length=64)
+    sequence_number = models.PositiveIntegerField(verbose_name="TSL Sequence Number", null=True, blank=True)
+    issue_date = models.DateTimeField(verbose_name="TSL Issue Date", null=True, blank=True)
+    imported_at = models.DateTimeField(verbose_name="Imported At", auto_now=True)
+
+    def __str__(self) -> str:
+        return f"File: {self.file_name} — Sequence: {self.sequence_number}"
+
+
+class DataVersion(models.Model):
+    """
+    Version of the services data, bumped in the transaction of every change to the services table.
+
+    The single row is shared by all the writers, the web app and its importer as well as send_to_db,
+    and keys the caches derived from the services (see `tsl_manager_app.cache`).
+    """
+
+    objects: ClassVar[DjangoManager["DataVersion"]] = models.Manager()
+
+    version = models.PositiveBigIntegerField(verbose_name="Version", default=0)
+
+    def __str__(self) -> str:
+        return f"Data version: {self.version}"
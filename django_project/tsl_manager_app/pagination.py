@@ -0,0 +1,201 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Generic, Sequence, TypeVar
+
+from django.db import connection
+from django.db.models import BooleanField, CharField, DateField, DateTimeField, Field, IntegerField, QuerySet, TextField
+from django.db.models.expressions import RawSQL
+from django.http import QueryDict
+
+# Row type of the paginated queryset: model instances, or named tuples of a `values_list(named=True)` projection
+R = TypeVar("R")
+
+AFTER_PARAM = "after"
+BEFORE_PARAM = "before"
+
+
+@dataclass
+class KeysetPage(Generic[R]):
+    """
+    A page of results, with the cursors leading to its neighbours.
+    """
+
+    object_list: list[R]
+    start_index: int
+    next_cursor: str | None
+    previous_cursor: str | None
+    next_query: str = ""
+    previous_query: str = ""
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    @property
+    def end_index(self) -> int:
+        return self.start_index + len(self.object_list) - 1
+
+
+class KeysetPaginator(Generic[R]):
+    """
+    Paginates a queryset by seeking past the ordering values of the last row shown, instead of using an offset.
+
+    Fetching any page costs the same as fetching the first one, as long as an index matches the ordering.
+    The ordering must be ascending and unique: the primary key is appended to it if it is not part of it,
+    and the fields following the primary key are dropped, as they never decide the order. Cursors carry the
+    ordering values as JSON, so the ordering fields must be text, integer, date or datetime fields.
+    """
+
+    def __init__(self, queryset: QuerySet[Any, R], order_by_fields: Sequence[str], page_size: int) -> None:
+        """
+        Args:
+            queryset: Filtered queryset to paginate; a projection must include the ordering fields.
+            order_by_fields: Names of the fields the rows are ordered by, ascending.
+            page_size: Maximum number of rows per page.
+
+        Raises:
+            ValueError: If an ordering field is descending or of an unsupported type, or the page size is not
+                positive.
+        """
+        if page_size < 1:
+            raise ValueError(f"The page size must be positive, got {page_size}.")
+        fields = list(order_by_fields)
+        if any(field.startswith("-") for field in fields):
+            raise ValueError("Keyset pagination supports ascending orderings only.")
+        pk_name = queryset.model._meta.pk.name
+        fields = [pk_name if field == "pk" else field for field in fields]
+        if pk_name in fields:
+            fields = fields[: fields.index(pk_name) + 1]
+        else:
+            fields.append(pk_name)
+        model_fields = [queryset.model._meta.get_field(field) for field in fields]
+        if not all(isinstance(field, (CharField, TextField, IntegerField, DateField)) for field in model_fields):
+            raise ValueError("Keyset pagination supports text, integer, date and datetime orderings only.")
+
+        self.queryset = queryset
+        self.fields = fields
+        self.model_fields = model_fields
+        self.page_size = page_size
+
+    def page(self, after: str | None = None, before: str | None = None) -> KeysetPage[R]:
+        """
+        Returns the page following the `after` cursor, or preceding the `before` cursor, or the first page.
+
+        Invalid cursors are ignored, so a mangled link leads to the first page.
+        """
+        after_position = self._decode(after)
+        before_position = None if after_position else self._decode(before)
+
+        if before_position is not None:
+            values, position = before_position
+            rows = list(self._seek(values, "<").order_by(*(f"-{field}" for field in self.fields))[: self.page_size + 1])
+            has_previous = len(rows) > self.page_size
+            rows = rows[: self.page_size][::-1]
+            start_index = max(position - len(rows), 1)
+            has_next = True
+        else:
+            queryset = self.queryset.order_by(*self.fields)
+            start_index = 1
+            if after_position is not None:
+                values, position = after_position
+                queryset = self._seek(values, ">").order_by(*self.fields)
+                start_index = position + 1
+            rows = list(queryset[: self.page_size + 1])
+            has_next = len(rows) > self.page_size
+            rows = rows[: self.page_size]
+            has_previous = after_position is not None
+
+        return KeysetPage(
+            object_list=rows,
+            start_index=start_index,
+            next_cursor=self._encode(rows[-1], start_index + len(rows) - 1) if has_next and rows else None,
+            previous_cursor=self._encode(rows[0], start_index) if has_previous and rows else None,
+        )
+
+    def _seek(self, values: list[Any], operator: str) -> QuerySet[Any, R]:
+        """
+        Filters the rows whose ordering values compare to `values` with `operator`, as a single row comparison.
+        """
+        meta = self.queryset.model._meta
+        table = connection.ops.quote_name(meta.db_table)
+        columns = ", ".join(
+            f"{table}.{connection.ops.quote_name(meta.get_field(field).column)}" for field in self.fields
+        )
+        placeholders = ", ".join(["%s"] * len(values))
+        condition = RawSQL(f"({columns}) {operator} ({placeholders})", values, output_field=BooleanField())
+        return self.queryset.filter(condition)
+
+    def _encode(self, obj: R, position: int) -> str:
+        values = [getattr(obj, field) for field in self.fields]
+        values = [value.isoformat() if isinstance(value, date) else value for value in values]
+        payload = json.dumps({"v": values, "n": position}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def _decode(self, cursor: str | None) -> tuple[list[Any], int] | None:
+        """
+        Returns the ordering values and the position carried by a cursor, or None if the cursor is malformed
+        or its values do not match the types of the ordering fields.
+        """
+        if not cursor:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            values, position = payload["v"], payload["n"]
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            return None
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            return None
+        if not isinstance(position, int) or isinstance(position, bool) or position < 1:
+            return None
+        try:
+            return [_cursor_value(field, value) for field, value in zip(self.model_fields, values)], position
+        except (TypeError, ValueError):
+            return None
+
+
+def _cursor_value(field: "Field[Any, Any]", value: Any) -> Any:
+    """
+    Converts a value read from a cursor to the type of its ordering field.
+
+    Raises:
+        TypeError: If the value does not match the type of the field.
+        ValueError: If a date value is not in ISO format.
+    """
+    if value is None:
+        if not field.null:
+            raise TypeError(f"{field.name} is not nullable.")
+        return None
+    if isinstance(field, IntegerField):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise TypeError(f"{field.name} expects an integer.")
+        return value
+    if not isinstance(value, str):
+        raise TypeError(f"{field.name} expects a string.")
+    if isinstance(field, DateTimeField):
+        return datetime.fromisoformat(value)
+    if isinstance(field, DateField):
+        return date.fromisoformat(value)
+    return value
+
+
+def page_query(params: QueryDict, cursor_param: str, cursor: str | None) -> str:
+    """
+    Returns the querystring of a page link: the current parameters (e.g. filters) with the cursor replaced.
+    """
+    query = params.copy()
+    query.pop(AFTER_PARAM, None)
+    query.pop(BEFORE_PARAM, None)
+    if cursor is not None:
+        query[cursor_param] = cursor
+    return query.urlencode()
@@ -1,88 +1,352 @@
 import logging
 from typing import Any
 
-from django.db.models import QuerySet
+from django.db import connection, transaction
 
-from ..choices import CrlUrlStatus, ServiceStatus
+from ..cache import bump_data_version
+from ..choices import CrlUrlStatus, ServiceStatus, TspServiceStatus
 from ..models import TspServiceInfo
 from .tsl_parser import ParsedService
 
 logger = logging.getLogger(__name__)
 
+# Key identifying a service: (service name, digital ID)
+ServiceKey = tuple[str, str]
+
+BULK_MODE = "bulk"
+UPSERT_MODE = "upsert"
+UPDATE_MODES = (BULK_MODE, UPSERT_MODE)
+
+CA_QC_URI = "http://uri.etsi.org/TrstSvc/Svctype/CA/QC"
+
+# Fields that `_update_existing_service` may change
+UPDATABLE_FIELDS = (
+    "crl_url",
+    "tsp_url",
+    "tsp_service_type",
+    "tsp_service_status",
+    "service_status_app",
+    "crl_url_status_app",
+)
+
+
+# Upsert of a batch of parsed services in a single statement (PostgreSQL only). The UPDATE applies the same
+# transitions as `_update_existing_service` to the existing rows; the INSERT then adds the qualified CA services
+# that have no row yet, except those without a start date, which are counted as skipped like in bulk mode.
+# All sub-statements see the table as it was before the statement. Services without a digital ID are not covered
+# by the unique constraint, so the INSERT also checks that no row matches; the ON CONFLICT clause names the
+# predicate of the partial unique index so that PostgreSQL can infer it.
+UPSERT_SQL = """
+WITH input AS (
+    SELECT * FROM unnest(
+        %(country_code)s::text[], %(country_name)s::text[], %(tsp_name)s::text[], %(tsp_service_name)s::text[],
+        %(tsp_service_type)s::text[], %(tsp_service_status)s::text[], %(tsp_service_start_date)s::timestamptz[],
+        %(tsp_url)s::text[], %(crl_url)s::text[], %(tsp_service_digital_id)s::text[]
+    ) AS i (
+        country_code, country_name, tsp_name, tsp_service_name, tsp_service_type, tsp_service_status,
+        tsp_service_start_date, tsp_url, crl_url, tsp_service_digital_id
+    )
+),
+updated AS (
+    UPDATE {table} AS t SET
+        crl_url = CASE WHEN t.crl_url = '' AND i.crl_url <> '' THEN i.crl_url ELSE t.crl_url END,
+        tsp_url = i.tsp_url,
+        tsp_service_type = i.tsp_service_type,
+        tsp_service_status = i.tsp_service_status,
+        service_status_app = CASE
+            WHEN t.service_status_app = %(served)s THEN t.service_status_app
+            WHEN t.tsp_service_status <> i.tsp_service_status THEN
+                CASE WHEN i.tsp_service_status = 'granted' THEN %(new_not_served)s ELSE %(withdrawn_not_served)s END
+            WHEN t.tsp_service_type <> i.tsp_service_type THEN
+                CASE WHEN i.tsp_service_type = %(ca_qc_uri)s THEN %(new_not_served)s ELSE %(withdrawn_not_served)s END
+            ELSE t.service_status_app
+        END,
+        crl_url_status_app = CASE
+            WHEN t.service_status_app <> %(served)s AND (
+                (t.tsp_service_type <> i.tsp_service_type AND i.tsp_service_type = %(ca_qc_uri)s)
+                OR (t.tsp_service_status <> i.tsp_service_status AND i.tsp_service_status = 'granted')
+            ) THEN %(url_undefined)s
+            ELSE t.crl_url_status_app
+        END
+    FROM input AS i
+    WHERE t.tsp_service_name = i.tsp_service_name
+        AND t.tsp_service_digital_id = i.tsp_service_digital_id
+        AND (
+            (t.crl_url = '' AND i.crl_url <> '')
+            OR t.tsp_url <> i.tsp_url
+            OR t.tsp_service_type <> i.tsp_service_type
+            OR t.tsp_service_status <> i.tsp_service_status
+        )
+    RETURNING t.id
+),
+inserted AS (
+    INSERT INTO {table} (
+        country_code, country_name, tsp_name, tsp_service_name, tsp_service_type, tsp_service_status,
+        tsp_service_start_date, tsp_url, crl_url, tsp_service_digital_id, service_status_app, crl_url_status_app
+    )
+    SELECT
+        i.country_code, i.country_name, i.tsp_name, i.tsp_service_name, i.tsp_service_type,
+        CASE WHEN i.tsp_service_status = 'granted' THEN %(granted)s ELSE %(withdrawn)s END,
+        i.tsp_service_start_date, i.tsp_url, i.crl_url, i.tsp_service_digital_id,
+        CASE WHEN i.tsp_service_status = 'granted' THEN %(new_not_served)s ELSE %(withdrawn_not_served)s END,
+        %(url_undefined)s
+    FROM input AS i
+    WHERE i.tsp_service_type = %(ca_qc_uri)s AND i.tsp_service_start_date IS NOT NULL
+        AND NOT EXISTS (
+            SELECT 1 FROM {table} AS t
+            WHERE t.tsp_service_name = i.tsp_service_name AND t.tsp_service_digital_id = i.tsp_service_digital_id
+        )
+    ON CONFLICT (tsp_service_name, tsp_service_digital_id) WHERE tsp_service_digital_id <> '' DO NOTHING
+    RETURNING id
+),
+skipped AS (
+    SELECT i.tsp_service_name, i.tsp_service_digital_id
+    FROM input AS i
+    WHERE i.tsp_service_type = %(ca_qc_uri)s AND i.tsp_service_start_date IS NULL
+        AND NOT EXISTS (
+            SELECT 1 FROM {table} AS t
+            WHERE t.tsp_service_name = i.tsp_service_name AND t.tsp_service_digital_id = i.tsp_service_digital_id
+        )
+)
+SELECT
+    (SELECT coalesce(array_agg(id), '{{}}') FROM inserted),
+    (SELECT coalesce(array_agg(id), '{{}}') FROM updated),
+    (SELECT coalesce(array_agg(tsp_service_name || ' (' || tsp_service_digital_id || ')'), '{{}}') FROM skipped)
+"""
+
 
 class ServiceUpdater:
     """
     Updates or creates TSP service records based on parsed data.
+
+    In bulk mode, existing records are loaded in a single query and compared in memory; the changes are
+    then written with batched bulk inserts and updates inside one transaction. In upsert mode, the whole
+    batch is sent to PostgreSQL, which applies the same rules in a single statement.
     """
 
-    def __init__(self, service_data_list: list[ParsedService]) -> None:
+    def __init__(self, service_data_list: list[ParsedService], batch_size: int = 500, mode: str = BULK_MODE) -> None:
         """
         Initialize the updater with parsed service data.
 
         Args:
             service_data_list (list[ParsedService]): List of parsed TSP service entries.
+            batch_size (int): Maximum number of rows written per bulk query.
+            mode (str): "bulk" or "upsert"; upsert falls back to bulk on databases other than PostgreSQL.
+
+        Raises:
+            ValueError: If the mode is not supported.
         """
+        if mode not in UPDATE_MODES:
+            raise ValueError(f"Unsupported service update mode '{mode}'. Choose one of: {', '.join(UPDATE_MODES)}.")
         self.service_data_list = service_data_list
+        self.batch_size = batch_size
+        self.mode = mode
+        self.created_count = 0
+        self.updated_count = 0
+        self.skipped_count = 0
+
+    @property
+    def unchanged_count(self) -> int:
+        """Number of parsed services neither created, updated nor skipped: unchanged, or not qualified CA services."""
+        return max(len(self.service_data_list) - self.created_count - self.updated_count - self.skipped_count, 0)
 
     def run(self) -> None:
         """
         Executes the update or creation process for all provided service data.
+
+        If any service was created or updated, the data version is bumped in the same transaction,
+        which invalidates the cached filter choices and service lists once it commits.
+        """
+        with transaction.atomic():
+            if self.mode == UPSERT_MODE and connection.vendor == "postgresql":
+                self._run_upsert()
+            else:
+                self._run_bulk()
+
+            if self.created_count or self.updated_count:
+                bump_data_version()
+
+    def _run_upsert(self) -> None:
         """
+        Upserts the services with one statement per round.
+
+        A statement may touch each row only once, so a service listed several times is applied in
+        consecutive rounds, in input order. Qualified CA services without a start date cannot be
+        created (the column is required): they only update existing rows and are otherwise skipped
+        and logged, as in bulk mode.
+        """
+        rounds: list[list[ParsedService]] = []
+        seen: dict[ServiceKey, int] = {}
         for data in self.service_data_list:
-            self._update_or_create_service(data)
+            key = (data.tsp_service_name, data.tsp_service_digital_id)
+            round_index = seen.get(key, 0)
+            seen[key] = round_index + 1
+            if round_index == len(rounds):
+                rounds.append([])
+            rounds[round_index].append(data)
+
+        sql = UPSERT_SQL.format(table=connection.ops.quote_name(TspServiceInfo._meta.db_table))
+        created_ids: set[int] = set()
+        updated_ids: set[int] = set()
+        self.skipped_count = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            for services in rounds:
+                cursor.execute(sql, self._upsert_params(services))
+                created, updated, skipped = cursor.fetchone()
+                created_ids.update(created)
+                updated_ids.update(updated)
+                self.skipped_count += len(skipped)
+                for service in skipped:
+                    logger.warning(f"Skipped service without a start date: {service}")
+
+        # Counted like in bulk mode: rows, not statements, and rows created in this run are not updated ones
+        self.created_count = len(created_ids)
+        self.updated_count = len(updated_ids - created_ids)
+        self._log_counts()
 
-    def _update_or_create_service(self, data: ParsedService) -> None:
-        existing_qs: QuerySet[TspServiceInfo] = TspServiceInfo.objects.filter(
-            tsp_service_name=data.tsp_service_name,
-            tsp_service_digital_id=data.tsp_service_digital_id,
+    @staticmethod
+    def _upsert_params(services: list[ParsedService]) -> dict[str, Any]:
+        """
+        Builds the parameters of `UPSERT_SQL`: one array per parsed field, plus the status values.
+        """
+        params: dict[str, Any] = {
+            field: [getattr(data, field) for data in services]
+            for field in (
+                "country_code",
+                "country_name",
+                "tsp_name",
+                "tsp_service_name",
+                "tsp_service_type",
+                "tsp_service_status",
+                "tsp_service_start_date",
+                "tsp_url",
+                "crl_url",
+                "tsp_service_digital_id",
+            )
+        }
+        params.update(
+            {
+                "ca_qc_uri": CA_QC_URI,
+                "granted": TspServiceStatus.GRANTED,
+                "withdrawn": TspServiceStatus.WITHDRAWN,
+                "served": ServiceStatus.SERVED,
+                "new_not_served": ServiceStatus.NEW_NOT_SERVED,
+                "withdrawn_not_served": ServiceStatus.WITHDRAWN_NOT_SERVED,
+                "url_undefined": CrlUrlStatus.URL_UNDEFINED,
+            }
         )
+        return params
 
-        if existing_qs.exists():
-            for obj in existing_qs:
-                self._update_existing_service(obj, data)
-        else:
-            self._create_new_service(data)
+    def _run_bulk(self) -> None:
+        """
+        Compares the services with the existing records in memory and writes the differences in bulk.
+        """
+        existing = self._load_existing()
+        self.skipped_count = 0
+        to_create: list[TspServiceInfo] = []
+        to_update: dict[int, TspServiceInfo] = {}
+        changed_fields: set[str] = set()
 
-    def _update_existing_service(self, obj: TspServiceInfo, data: ParsedService) -> None:
-        updated = False
+        for data in self.service_data_list:
+            key = (data.tsp_service_name, data.tsp_service_digital_id)
+            objs = existing.get(key)
+            if objs:
+                for obj in objs:
+                    fields = self._update_existing_service(obj, data)
+                    # Rows created earlier in this run are inserted with their final values
+                    if fields and obj.pk is not None:
+                        to_update[obj.pk] = obj
+                        changed_fields.update(fields)
+            elif self._is_qc_ca(data) and data.tsp_service_start_date is None:
+                self.skipped_count += 1
+                logger.warning(f"Skipped service without a start date: {data.tsp_service_name} ({key[1]})")
+            else:
+                new_obj = self._create_new_service(data)
+                if new_obj is not None:
+                    to_create.append(new_obj)
+                    existing[key] = [new_obj]
+
+        with transaction.atomic():
+            if to_create:
+                TspServiceInfo.objects.bulk_create(to_create, batch_size=self.batch_size)
+            if to_update:
+                TspServiceInfo.objects.bulk_update(
+                    list(to_update.values()), fields=sorted(changed_fields), batch_size=self.batch_size
+                )
+
+        self.created_count = len(to_create)
+        self.updated_count = len(to_update)
+        self._log_counts()
+
+    def _log_counts(self) -> None:
+        logger.info(
+            f"Services created: {self.created_count}, updated: {self.updated_count}, skipped: {self.skipped_count}"
+        )
+
+    def _load_existing(self) -> dict[ServiceKey, list[TspServiceInfo]]:
+        """
+        Loads the existing service records, grouped by service name and digital ID.
+        """
+        existing: dict[ServiceKey, list[TspServiceInfo]] = {}
+        queryset = TspServiceInfo.objects.only("tsp_service_name", "tsp_service_digital_id", *UPDATABLE_FIELDS)
+        for obj in queryset.order_by("pk"):
+            existing.setdefault((obj.tsp_service_name, obj.tsp_service_digital_id), []).append(obj)
+        return existing
+
+    def _update_existing_service(self, obj: TspServiceInfo, data: ParsedService) -> set[str]:
+        """
+        Applies the parsed data to an existing record in memory.
+
+        Returns:
+            set[str]: Names of the fields that changed.
+        """
+        updated: set[str] = set()
 
         if not obj.crl_url and data.crl_url:
             obj.crl_url = data.crl_url
-            updated = True
+            updated.add("crl_url")
 
         if obj.tsp_url != data.tsp_url:
             obj.tsp_url = data.tsp_url
-            updated = True
+            updated.add("tsp_url")
 
         if obj.tsp_service_type != data.tsp_service_type:
             obj.tsp_service_type = data.tsp_service_type
-            updated = True
+            updated.add("tsp_service_type")
             if obj.service_status_app != ServiceStatus.SERVED:
                 if self._is_qc_ca(data):
                     obj.service_status_app = ServiceStatus.NEW_NOT_SERVED
                     obj.crl_url_status_app = CrlUrlStatus.URL_UNDEFINED
+                    updated.add("crl_url_status_app")
                 else:
                     obj.service_status_app = ServiceStatus.WITHDRAWN_NOT_SERVED
-                updated = True
+                updated.add("service_status_app")
 
         if obj.tsp_service_status != data.tsp_service_status:
             obj.tsp_service_status = data.tsp_service_status
-            updated = True
+            updated.add("tsp_service_status")
             if obj.service_status_app != ServiceStatus.SERVED:
                 if data.tsp_service_status == "granted":
                     obj.service_status_app = ServiceStatus.NEW_NOT_SERVED
                     obj.crl_url_status_app = CrlUrlStatus.URL_UNDEFINED
+                    updated.add("crl_url_status_app")
                 else:
                     obj.service_status_app = ServiceStatus.WITHDRAWN_NOT_SERVED
-                updated = True
+                updated.add("service_status_app")
 
         if updated:
-            obj.save()
             logger.info(f"Updated service: {obj.tsp_service_name} ({obj.tsp_service_digital_id})")
+        return updated
 
-    def _create_new_service(self, data: ParsedService) -> None:
-        if not self._is_qc_ca(data):
-            return
+    def _create_new_service(self, data: ParsedService) -> TspServiceInfo | None:
+        """
+        Builds a new, unsaved record for a qualified CA service that has a start date.
+
+        Returns:
+            TspServiceInfo | None: The record to insert, or None if the service is not a qualified CA.
+        """
+        if not self._is_qc_ca(data) or data.tsp_service_start_date is None:
+            return None
 
         kwargs: dict[str, Any] = {
             "country_code": data.country_code,
@@ -90,7 +354,10 @@ class ServiceUpdater:
             "tsp_name": data.tsp_name,
             "tsp_service_name": data.tsp_service_name,
             "tsp_service_type": data.tsp_service_type,
-            "tsp_service_status": "Granted" if data.tsp_service_status == "granted" else "Withdrawn",
+            "tsp_service_start_date": data.tsp_service_start_date,
+            "tsp_service_status": (
+                TspServiceStatus.GRANTED if data.tsp_service_status == "granted" else TspServiceStatus.WITHDRAWN
+            ),
             "tsp_url": data.tsp_url,
             "crl_url": data.crl_url,
             "tsp_service_digital_id": data.tsp_service_digital_id,
@@ -98,16 +365,13 @@ class ServiceUpdater:
             "crl_url_status_app": CrlUrlStatus.URL_UNDEFINED,
         }
 
-        if data.tsp_service_start_date is not None:
-            kwargs["tsp_service_start_date"] = data.tsp_service_start_date
-
         new_obj = TspServiceInfo(**kwargs)
-        new_obj.save()
         logger.info(f"Created new service: {new_obj.tsp_service_name} ({new_obj.tsp_service_digital_id})")
+        return new_obj
 
     @staticmethod
     def _is_qc_ca(data: ParsedService) -> bool:
-        return data.tsp_service_type == "http://uri.etsi.org/TrstSvc/Svctype/CA/QC"
+        return data.tsp_service_type == CA_QC_URI
 
     @staticmethod
     def _get_initial_status(data: ParsedService) -> ServiceStatus:
@@ -0,0 +1,116 @@
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Collection, Protocol, cast
+
+from django.conf import settings
+from django.db import transaction
+
+from ..constants import COUNTRIES_PL
+from ..metrics import (
+    IMPORT_DB_STATEMENTS,
+    IMPORT_SERVICES,
+    IMPORT_STAGE_SECONDS,
+    PARSE_FILE_SECONDS,
+    count_db_statements,
+)
+from .service_updater import ServiceUpdater
+from .tsl_manifest import load_manifest, save_manifest
+from .tsl_parser import TslParser
+from .tsl_validity import refresh_validity_alerts, save_validity_info
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class _SettingsWithDataDir(Protocol):
+    DATA_DIRECTORY: Path
+    TSL_PARSER_BACKEND: str
+    TSL_PARSER_WORKERS: int
+    TSL_PARSER_INCREMENTAL: bool
+    TSL_SERVICE_UPDATE_MODE: str
+
+
+@dataclass
+class ImportProgress:
+    """
+    Progress of a service import, as reported to the user.
+    """
+
+    state: str = PENDING
+    files_parsed: int = 0
+    files_total: int = 0
+    created: int = 0
+    updated: int = 0
+    error: str = ""
+
+
+def import_services(
+    on_progress: Callable[[ImportProgress], None] | None = None,
+    file_names: Collection[str] | None = None,
+) -> ImportProgress:
+    """
+    Imports the services of the TSL files in the data directory.
+
+    The files are parsed first; the services, the scheme headers of the TSLs and the manifest of the import
+    are then stored in a single transaction, which also bumps the data version if any service changed.
+    If no file was parsed, only the validity alerts of the recorded TSLs are brought up to date.
+
+    The time spent in each stage and parsing each file, the outcome for the parsed services and the number of
+    database statements are recorded in the import metrics (see `tsl_manager_app.metrics`).
+
+    Args:
+        on_progress: Called with the current progress whenever it changes.
+        file_names: Names of the TSL files to import (e.g. "PL.xml"); all the files of the directory if None.
+
+    Returns:
+        ImportProgress: The final progress of the import.
+    """
+    _settings = cast(_SettingsWithDataDir, cast(object, settings))
+    progress = ImportProgress(state=RUNNING)
+
+    def report() -> None:
+        if on_progress is not None:
+            on_progress(progress)
+
+    def file_parsed(files_parsed: int, files_total: int) -> None:
+        progress.files_parsed = files_parsed
+        progress.files_total = files_total
+        report()
+
+    report()
+    parser = TslParser(
+        _settings.DATA_DIRECTORY,
+        COUNTRIES_PL,
+        backend=_settings.TSL_PARSER_BACKEND,
+        workers=_settings.TSL_PARSER_WORKERS,
+    )
+    previous = load_manifest() if _settings.TSL_PARSER_INCREMENTAL else None
+    with IMPORT_STAGE_SECONDS.labels("parse").time():
+        parsed_services = parser.parse_all(previous, on_file_parsed=file_parsed, file_names=file_names)
+    for seconds in parser.parse_seconds.values():
+        PARSE_FILE_SECONDS.labels(parser.backend).observe(seconds)
+
+    # Nothing to store when no file changed since the last import
+    if parser.file_states:
+        with IMPORT_STAGE_SECONDS.labels("store").time(), count_db_statements() as statements:
+            with transaction.atomic():
+                updater = ServiceUpdater(parsed_services, mode=_settings.TSL_SERVICE_UPDATE_MODE)
+                updater.run()
+                save_validity_info(parser.file_states, COUNTRIES_PL)
+                save_manifest(parser.file_states)
+        progress.created = updater.created_count
+        progress.updated = updater.updated_count
+        IMPORT_DB_STATEMENTS.observe(statements())
+        IMPORT_SERVICES.labels("created").observe(updater.created_count)
+        IMPORT_SERVICES.labels("updated").observe(updater.updated_count)
+        IMPORT_SERVICES.labels("unchanged").observe(updater.unchanged_count)
+    refresh_validity_alerts()
+
+    progress.state = DONE
+    report()
+    return progress
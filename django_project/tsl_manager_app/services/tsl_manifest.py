@@ -0,0 +1,57 @@
+import logging
+from typing import Mapping
+
+from django.utils import timezone
+
+from ..models import TslFileManifest
+from .tsl_parser import TslFileState
+
+logger = logging.getLogger(__name__)
+
+
+def load_manifest() -> dict[str, TslFileState]:
+    """
+    Loads the manifest of the last successful import.
+
+    Returns:
+        dict[str, TslFileState]: State of every imported TSL file, keyed by file name.
+    """
+    return {
+        entry.file_name: TslFileState(
+            sha256=entry.sha256,
+            sequence_number=entry.sequence_number,
+            issue_date=entry.issue_date,
+        )
+        for entry in TslFileManifest.objects.all()
+    }
+
+
+def save_manifest(file_states: Mapping[str, TslFileState]) -> None:
+    """
+    Records the state of the imported TSL files, replacing the previous entries of the same files.
+
+    Should be called only once the parsed services have been stored, so a failed import is retried.
+
+    Args:
+        file_states (Mapping[str, TslFileState]): State of every imported TSL file, keyed by file name.
+    """
+    if not file_states:
+        return
+
+    now = timezone.now()
+    TslFileManifest.objects.bulk_create(
+        [
+            TslFileManifest(
+                file_name=file_name,
+                sha256=state.sha256,
+                sequence_number=state.sequence_number,
+                issue_date=state.issue_date,
+                imported_at=now,
+            )
+            for file_name, state in file_states.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["file_name"],
+        update_fields=["sha256", "sequence_number", "issue_date", "imported_at"],
+    )
+    logger.info(f"Recorded {len(file_states)} TSL files in the import manifest")
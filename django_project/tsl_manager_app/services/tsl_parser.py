@@ -1,16 +1,50 @@
 import base64
 import hashlib
 import logging
-from dataclasses import dataclass
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, dataclass, replace
 from datetime import datetime
+from itertools import repeat
 from pathlib import Path
-from typing import Mapping, Optional, TypedDict
+from typing import Any, Callable, Collection, Iterator, Mapping, Optional, Sequence, TypedDict
 from urllib.parse import urlparse
 from xml.dom.minidom import Element, Node
 from xml.dom.minidom import parse as minidom_parse
+from xml.etree import ElementTree
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # lxml is optional; the iterparse backend falls back to the standard library
+    lxml_etree = None
 
 logger = logging.getLogger(__name__)
 
+MINIDOM_BACKEND = "minidom"
+ITERPARSE_BACKEND = "iterparse"
+PARSER_BACKENDS = (MINIDOM_BACKEND, ITERPARSE_BACKEND)
+
+XML_LANG_ATTRIBUTE = "{http://www.w3.org/XML/1998/namespace}lang"
+
+# Elements collected in a single pass over the scheme header and each provider / service subtree
+SCHEME_TAGS = frozenset({"TSLSequenceNumber", "ListIssueDateTime", "NextUpdate", "CountryName", "SchemeOperatorName"})
+PROVIDER_TAGS = frozenset({"TSPName", "ElectronicAddress"})
+SERVICE_TAGS = frozenset(
+    {
+        "ServiceName",
+        "ServiceTypeIdentifier",
+        "X509Certificate",
+        "StatusStartingTime",
+        "ServiceStatus",
+        "ServiceSupplyPoint",
+        "TSPServiceDefinitionURI",
+        "SchemeServiceDefinitionURI",
+    }
+)
+
+# Elements of a provider or service subtree grouped by local name, in document order
+Fields = dict[str, list[Any]]
+
 
 class Urls(TypedDict):
     """Return structure for `_extract_urls`."""
@@ -37,47 +71,223 @@ class ParsedService:
     crl_url: str
 
 
+@dataclass(frozen=True)
+class TslFileState:
+    """
+    Content hash and scheme header of a TSL file.
+
+    The hash, sequence number and issue date are recorded in the import manifest; the other header
+    fields feed the TSL status page (see `TslValidityInfo`). The header is read while the file is parsed.
+    """
+
+    sha256: str
+    sequence_number: int | None
+    issue_date: datetime | None
+    country_code: str = ""
+    operator_name: str = ""
+    next_update: datetime | None = None
+
+
 class TslParser:
     """
     Parser class for extracting TSP service data from XML files in a given directory.
     """
 
-    def __init__(self, directory_path: Path, countries: Mapping[str, str]) -> None:
+    def __init__(
+        self,
+        directory_path: Path,
+        countries: Mapping[str, str],
+        backend: str = MINIDOM_BACKEND,
+        workers: int = 1,
+    ) -> None:
         """
         Initialize the TSL parser.
 
         Args:
             directory_path: Path to a directory containing XML files.
             countries: Mapping of country codes to country names.
+            backend: XML engine used to read the files: "minidom" (full DOM) or "iterparse"
+                (incremental, lxml when available); both produce identical results.
+            workers: Number of worker processes parsing files in parallel; 1 parses them in the current process.
+
+        Raises:
+            ValueError: If the backend is not supported or the number of workers is not positive.
         """
+        if backend not in PARSER_BACKENDS:
+            raise ValueError(
+                f"Unsupported TSL parser backend '{backend}'. Choose one of: {', '.join(PARSER_BACKENDS)}."
+            )
+        if workers < 1:
+            raise ValueError(f"The number of TSL parser workers must be positive, got {workers}.")
         self.directory_path: Path = directory_path
         self.countries: Mapping[str, str] = countries
-
-    def parse_all(self) -> list[ParsedService]:
+        self.backend: str = backend
+        self.workers: int = workers
+        self.file_states: dict[str, TslFileState] = {}
+        self.parse_seconds: dict[str, float] = {}
+
+    def parse_all(
+        self,
+        previous: Mapping[str, TslFileState] | None = None,
+        on_file_parsed: Callable[[int, int], None] | None = None,
+        file_names: Collection[str] | None = None,
+    ) -> list[ParsedService]:
         """
-        Parses all XML files in the directory.
+        Parses the XML files in the directory.
+
+        Files are processed in name order, so the result does not depend on the number of workers.
+        A file that fails to parse is logged and skipped. The state of every successfully parsed file
+        is recorded in `file_states`, to be stored as the manifest of the import, and the time spent parsing
+        it in `parse_seconds`.
+
+        Args:
+            previous: Manifest of the last successful import, keyed by file name. If given, only files whose
+                content hash changed since then are parsed (incremental mode).
+            on_file_parsed: Called after every successfully parsed file with the number of files parsed
+                so far and the number of files to parse, e.g. to report the progress of an import.
+            file_names: Names of the files to consider (e.g. "PL.xml"); all the XML files of the directory if None.
 
         Returns:
             list[ParsedService]: List of parsed service entries.
         """
+        xml_files = sorted(self.directory_path.glob("*.xml"))
+        if file_names is not None:
+            xml_files = [xml_file for xml_file in xml_files if xml_file.name in file_names]
+        hashes = {xml_file: self._hash_file(xml_file) for xml_file in xml_files}
+        if previous is not None:
+            # A file with the same content has the same header, sequence number included: the hash decides
+            xml_files = [
+                xml_file
+                for xml_file in xml_files
+                if xml_file.name not in previous or previous[xml_file.name].sha256 != hashes[xml_file]
+            ]
+            logger.info(f"{len(xml_files)} of {len(hashes)} TSL files changed since the last import")
+
+        self.file_states = {}
+        self.parse_seconds = {}
         services: list[ParsedService] = []
-        for xml_file in self.directory_path.glob("*.xml"):
+        for xml_file, parsed_services, header, seconds in self._parse_files(xml_files):
+            services.extend(parsed_services)
+            self.file_states[xml_file.name] = replace(header, sha256=hashes[xml_file])
+            self.parse_seconds[xml_file.name] = seconds
+            if on_file_parsed is not None:
+                on_file_parsed(len(self.file_states), len(xml_files))
+        return services
+
+    def _parse_files(self, xml_files: list[Path]) -> Iterator[tuple[Path, list[ParsedService], TslFileState, float]]:
+        """
+        Parses the given files, in the current process or in a worker pool, skipping the ones that fail.
+
+        Args:
+            xml_files: Files to parse, in the order of the result.
+
+        Yields:
+            The path, the extracted services, the scheme header and the parse time in seconds of every
+            successfully parsed file.
+        """
+        if self.workers > 1 and len(xml_files) > 1:
+            yield from self._parse_files_parallel(xml_files)
+            return
+
+        for xml_file in xml_files:
+            started = time.perf_counter()
             try:
-                parsed_services = self._parse_file(xml_file)
-                services.extend(parsed_services)
+                services, header = self._parse_file(xml_file)
             except Exception as e:
                 logger.error(f"Failed to parse {xml_file.name}: {e}")
-        return services
+                continue
+            yield xml_file, services, header, time.perf_counter() - started
 
-    def _parse_file(self, path: Path) -> list[ParsedService]:
+    def _parse_files_parallel(
+        self, xml_files: list[Path]
+    ) -> Iterator[tuple[Path, list[ParsedService], TslFileState, float]]:
         """
-        Parses a single XML file and extracts TSP service entries.
+        Parses the given files in a pool of worker processes.
+
+        XML parsing is CPU-bound, so separate processes sidestep the GIL. Workers send the services
+        back as plain tuples, which are cheaper to pickle than dataclass instances.
+
+        Args:
+            xml_files: Files to parse, in the order of the result.
+
+        Yields:
+            The path, the extracted services, the scheme header and the parse time in seconds (measured
+            in the worker) of every successfully parsed file.
+        """
+        workers = min(self.workers, len(xml_files))
+        chunk_size = max(1, len(xml_files) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _parse_file_records,
+                xml_files,
+                repeat(dict(self.countries)),
+                repeat(self.backend),
+                chunksize=chunk_size,
+            )
+            for xml_file, (records, header, error, seconds) in zip(xml_files, results):
+                if header is None:
+                    logger.error(f"Failed to parse {xml_file.name}: {error}")
+                    continue
+                yield xml_file, [ParsedService(*record) for record in records], header, seconds
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        """Return the SHA-256 hex digest of a file, which decides whether it changed since the last import."""
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    @staticmethod
+    def _scheme_header(
+        path: Path, sequence_number: str, issue_date: str, next_update: str, country_code: str, operator_name: str
+    ) -> TslFileState:
+        """
+        Builds the state of a file from the texts of its `SchemeInformation` header, read by either backend.
+
+        The hash is left empty; `parse_all` fills it in. Header fields that cannot be read are left empty
+        (`next_update` is also None for a closed list).
+        """
+        number: int | None = None
+        try:
+            number = int(sequence_number) if sequence_number else None
+        except ValueError:
+            logger.warning(f"Cannot read the sequence number of {path.name}: {sequence_number!r}")
+        return TslFileState(
+            sha256="",
+            sequence_number=number,
+            issue_date=TslParser._start_date(issue_date),
+            country_code=country_code,
+            operator_name=operator_name,
+            next_update=TslParser._start_date(next_update),
+        )
+
+    def _parse_file(self, path: Path) -> tuple[list[ParsedService], TslFileState]:
+        """
+        Parses a single XML file and extracts TSP service entries and the scheme header.
 
         Args:
             path (Path): Path to the XML file.
 
         Returns:
-            list[ParsedService]: Extracted service data.
+            tuple[list[ParsedService], TslFileState]: Extracted service data, and the header of the file
+            (without its hash).
+        """
+        if self.backend == ITERPARSE_BACKEND:
+            return self._iterparse_file(path)
+        return self._parse_file_minidom(path)
+
+    def _parse_file_minidom(self, path: Path) -> tuple[list[ParsedService], TslFileState]:
+        """
+        Parses a single XML file with minidom, building the whole DOM in memory.
+
+        Each provider subtree is walked once; the walk collects the provider-level elements
+        and, per `TSPService`, the service-level elements needed to build an entry.
+
+        Args:
+            path (Path): Path to the XML file.
+
+        Returns:
+            tuple[list[ParsedService], TslFileState]: Extracted service data, and the header of the file
+            (without its hash).
         """
         result: list[ParsedService] = []
         tsl = minidom_parse(str(path))
@@ -85,95 +295,256 @@ class TslParser:
         scheme_info = tsl.getElementsByTagNameNS("*", "SchemeInformation")[0]
         country_code = self._get_text(scheme_info, "CountryName")
         country_name = self.countries.get(country_code, "Unknown")
+        next_updates = scheme_info.getElementsByTagNameNS("*", "NextUpdate")
+        operator_names = scheme_info.getElementsByTagNameNS("*", "SchemeOperatorName")
+        header = self._scheme_header(
+            path,
+            self._get_text(scheme_info, "TSLSequenceNumber"),
+            self._get_text(scheme_info, "ListIssueDateTime"),
+            self._get_text(next_updates[0], "dateTime") if next_updates else "",
+            country_code,
+            self._english_name(operator_names[0]) if operator_names else "",
+        )
 
         for tsp in tsl.getElementsByTagNameNS("*", "TrustServiceProvider"):
-            tsp_name = self._get_text(tsp, "TSPName", index=1)
+            provider_fields, services_fields = self._visit_provider(tsp)
+            tsp_name = self._text_at(provider_fields, "TSPName", self._node_text_from_first_child, index=1)
             if not tsp_name:
                 continue
 
-            for service in tsp.getElementsByTagNameNS("*", "TSPService"):
-                service_name = self._get_text(service, "ServiceName", index=1)
-                if not service_name:
-                    continue
+            english_uri = self._english_uri(provider_fields)
+            for service_fields in services_fields:
+                service = self._build_service(
+                    service_fields,
+                    self._node_text_from_first_child,
+                    self._child_node_value,
+                    country_code,
+                    country_name,
+                    tsp_name,
+                    english_uri,
+                )
+                if service is not None:
+                    result.append(service)
+        return result, header
 
-                service_type = self._get_text(service, "ServiceTypeIdentifier")
-                if not service_type:
-                    continue
+    def _iterparse_file(self, path: Path) -> tuple[list[ParsedService], TslFileState]:
+        """
+        Parses a single XML file incrementally, building one entry per `TSPService` element.
 
-                cert_value = self._get_text(service, "X509Certificate", default="")
-                try:
-                    digital_id = hashlib.sha256(base64.b64decode(cert_value)).hexdigest()
-                except ValueError:
-                    digital_id = ""
-
-                date_str = self._get_text(service, "StatusStartingTime", default="")
-                try:
-                    start_date: datetime | None = datetime.fromisoformat(date_str) if date_str else None
-                except ValueError:
-                    start_date = None
-
-                status_uri = self._get_text(service, "ServiceStatus", default="")
-                status_simple = urlparse(status_uri).path.split("/")[-1] if status_uri else ""
-
-                urls = self._extract_urls(tsp, service)
-
-                result.append(
-                    ParsedService(
-                        country_code=country_code,
-                        country_name=country_name,
-                        tsp_name=tsp_name,
-                        tsp_service_name=service_name,
-                        tsp_service_type=service_type,
-                        tsp_service_status=status_simple,
-                        tsp_service_start_date=start_date,
-                        tsp_service_digital_id=digital_id,
-                        tsp_url=urls["tsp_url"],
-                        crl_url=urls["crl_url"],
-                    )
+        Each service subtree is evaluated as soon as it has been read and is then dropped from
+        the tree, as is every provider once all its services are done, so the tree held in memory
+        is bounded by the size of a single provider rather than the whole document. The scheme header
+        is read from `SchemeInformation` as soon as it ends.
+
+        Args:
+            path (Path): Path to the XML file.
+
+        Returns:
+            tuple[list[ParsedService], TslFileState]: Extracted service data, in document order, and the
+            header of the file (without its hash).
+        """
+        result: list[ParsedService] = []
+        header: TslFileState | None = None
+        country_code: str | None = None
+        country_name = "Unknown"
+        tsp_node: Any = None
+        # Provider-level values (TSP name, English URI), computed once per provider from its TSPInformation
+        tsp_values: tuple[str, str | None] | None = None
+        stack: list[Any] = []
+
+        for event, el in self._iterparse_events(path):
+            tag = self._et_local_name(el.tag)
+            if event == "start":
+                stack.append(el)
+                if tag == "TrustServiceProvider" and tsp_node is None:
+                    tsp_node = el
+                    tsp_values = None
+                continue
+
+            stack.pop()
+
+            if tag == "SchemeInformation" and header is None:
+                scheme_fields = self._et_collect(el, SCHEME_TAGS)
+                country_code = self._text_at(scheme_fields, "CountryName", self._et_first_child_text)
+                country_name = self.countries.get(country_code, "Unknown")
+                next_updates = scheme_fields.get("NextUpdate")
+                operator_names = scheme_fields.get("SchemeOperatorName")
+                header = self._scheme_header(
+                    path,
+                    self._text_at(scheme_fields, "TSLSequenceNumber", self._et_first_child_text),
+                    self._text_at(scheme_fields, "ListIssueDateTime", self._et_first_child_text),
+                    self._et_get_text(next_updates[0], "dateTime") if next_updates else "",
+                    country_code,
+                    self._et_english_name(operator_names[0]) if operator_names else "",
                 )
-        return result
+            elif tag == "TSPService" and tsp_node is not None:
+                if country_code is None:
+                    raise ValueError("SchemeInformation not found before the first TSPService")
+                if tsp_values is None:
+                    provider_fields = self._et_collect(tsp_node, PROVIDER_TAGS)
+                    tsp_values = (
+                        self._text_at(provider_fields, "TSPName", self._et_first_child_text, index=1),
+                        self._english_uri(provider_fields),
+                    )
+                tsp_name, english_uri = tsp_values
+                if tsp_name:
+                    service = self._build_service(
+                        self._et_collect(el, SERVICE_TAGS),
+                        self._et_first_child_text,
+                        self._et_child_node_value,
+                        country_code,
+                        country_name,
+                        tsp_name,
+                        english_uri,
+                    )
+                    if service is not None:
+                        result.append(service)
+                stack[-1].remove(el)
+            elif el is tsp_node:
+                tsp_node = None
+                if stack:
+                    stack[-1].remove(el)
+
+        if header is None:
+            raise ValueError("SchemeInformation not found")
+        return result, header
+
+    @staticmethod
+    def _iterparse_events(path: Path) -> Iterator[tuple[str, Any]]:
+        """
+        Yields (event, element) pairs for `start` and `end` events, keeping comments like minidom does.
+        """
+        if lxml_etree is not None:
+            yield from lxml_etree.iterparse(str(path), events=("start", "end"), remove_comments=False)
+        else:
+            parser = ElementTree.XMLParser(target=ElementTree.TreeBuilder(insert_comments=True))
+            yield from ElementTree.iterparse(str(path), events=("start", "end"), parser=parser)
+
+    def _build_service(
+        self,
+        fields: Fields,
+        text_of: Callable[[Any], Optional[str]],
+        child_value_of: Callable[[Any, int], Optional[str]],
+        country_code: str,
+        country_name: str,
+        tsp_name: str,
+        english_uri: str | None,
+    ) -> ParsedService | None:
+        """
+        Builds a service entry from the elements collected from a `TSPService` subtree.
+
+        Args:
+            fields: Service elements grouped by local name.
+            text_of: Backend accessor returning the stripped text of an element's first child node.
+            child_value_of: Backend accessor returning the value of the first child of an element's n-th child node.
+            country_code: Country code of the TSL.
+            country_name: Country name of the TSL.
+            tsp_name: Name of the provider.
+            english_uri: English URI of the provider's electronic address, if any.
+
+        Returns:
+            The service entry, or None if the service has no name or type.
+        """
+        service_name = self._text_at(fields, "ServiceName", text_of, index=1)
+        if not service_name:
+            return None
+
+        service_type = self._text_at(fields, "ServiceTypeIdentifier", text_of)
+        if not service_type:
+            return None
+
+        urls = self._extract_urls(fields, english_uri, text_of, child_value_of)
+
+        return ParsedService(
+            country_code=country_code,
+            country_name=country_name,
+            tsp_name=tsp_name,
+            tsp_service_name=service_name,
+            tsp_service_type=service_type,
+            tsp_service_status=self._status_simple(self._text_at(fields, "ServiceStatus", text_of)),
+            tsp_service_start_date=self._start_date(self._text_at(fields, "StatusStartingTime", text_of)),
+            tsp_service_digital_id=self._digital_id(self._text_at(fields, "X509Certificate", text_of)),
+            tsp_url=urls["tsp_url"],
+            crl_url=urls["crl_url"],
+        )
 
     # ---------- internal helpers ----------
 
     @staticmethod
-    def _node_text_from_first_child(node: Optional[Node]) -> Optional[str]:
-        """Return stripped text of `node.firstChild.nodeValue` if present and a string."""
-        if node is None:
-            return None
-        first = getattr(node, "firstChild", None)
-        value = getattr(first, "nodeValue", None)
-        return value.strip() if isinstance(value, str) else None
+    def _visit_provider(tsp: Element) -> tuple[Fields, list[Fields]]:
+        """
+        Walks a `TrustServiceProvider` subtree once, in document order.
+
+        Args:
+            tsp: The provider node.
+
+        Returns:
+            The provider elements grouped by local name, and the service elements grouped by
+            local name for every `TSPService` of the provider.
+        """
+        provider_fields: Fields = {}
+        services_fields: list[Fields] = []
+        # Each stack item carries the field groups of the services enclosing the node
+        stack: list[tuple[Node, tuple[Fields, ...]]] = [(child, ()) for child in reversed(tsp.childNodes)]
+
+        while stack:
+            node, enclosing = stack.pop()
+            if node.nodeType != Node.ELEMENT_NODE:
+                continue
+
+            name = node.localName
+            if name in PROVIDER_TAGS:
+                provider_fields.setdefault(name, []).append(node)
+            if name in SERVICE_TAGS:
+                for service_fields in enclosing:
+                    service_fields.setdefault(name, []).append(node)
+            if name == "TSPService":
+                service_fields = {}
+                services_fields.append(service_fields)
+                enclosing = (*enclosing, service_fields)
+
+            stack.extend((child, enclosing) for child in reversed(node.childNodes))
+
+        return provider_fields, services_fields
 
     @staticmethod
-    def _get_text(node: Element, tag: str, index: int = 0, default: str = "") -> str:
+    def _text_at(
+        fields: Fields, tag: str, text_of: Callable[[Any], Optional[str]], index: int = 0, default: str = ""
+    ) -> str:
         """
-        Safely get text content from the given XML tag.
+        Safely get text content of a collected element.
 
         Args:
-            node: XML element to search in.
+            fields: Elements grouped by local name.
             tag: Tag local name.
+            text_of: Backend accessor returning the stripped text of an element's first child node.
             index: Index of the occurrence.
             default: Default value if the tag is missing.
 
         Returns:
             The text value or the default.
         """
-        try:
-            el = node.getElementsByTagNameNS("*", tag)[index]
-        except IndexError:
+        elements: Sequence[Any] = fields.get(tag, ())
+        if len(elements) <= index:
             return default
-
-        text = TslParser._node_text_from_first_child(el)
+        text = text_of(elements[index])
         return text if text is not None else default
 
     @staticmethod
-    def _extract_urls(tsp_node: Element, service_node: Element) -> Urls:
+    def _extract_urls(
+        fields: Fields,
+        english_uri: str | None,
+        text_of: Callable[[Any], Optional[str]],
+        child_value_of: Callable[[Any, int], Optional[str]],
+    ) -> Urls:
         """
-        Extract TSP and CRL URLs from the XML structure.
+        Extract TSP and CRL URLs from the collected service elements.
 
         Args:
-            tsp_node: The provider node.
-            service_node: The service node.
+            fields: Service elements grouped by local name.
+            english_uri: English URI of the provider's electronic address, if any; it takes precedence.
+            text_of: Backend accessor returning the stripped text of an element's first child node.
+            child_value_of: Backend accessor returning the value of the first child of an element's n-th child node.
 
         Returns:
             A dict with keys `tsp_url` and `crl_url`.
@@ -181,36 +552,212 @@ class TslParser:
         tsp_url = ""
         crl_url = ""
 
-        supply_points = service_node.getElementsByTagNameNS("*", "ServiceSupplyPoint")
+        supply_points = fields.get("ServiceSupplyPoint")
         if supply_points:
-            text = TslParser._node_text_from_first_child(supply_points[0])
+            text = text_of(supply_points[0])
             if isinstance(text, str):
                 if text.endswith(".crl"):
                     crl_url = text
                 tsp_url = text
 
-        def_uris = service_node.getElementsByTagNameNS("*", "TSPServiceDefinitionURI")
-        if def_uris and def_uris[0].childNodes and len(def_uris[0].childNodes) > 1:
-            candidate = getattr(def_uris[0].childNodes[1], "firstChild", None)
-            value = getattr(candidate, "nodeValue", None)
-            if isinstance(value, str) and value.strip():
-                tsp_url = value.strip()
-
-        scheme_uris = service_node.getElementsByTagNameNS("*", "SchemeServiceDefinitionURI")
-        if scheme_uris and scheme_uris[0].childNodes and len(scheme_uris[0].childNodes) > 1:
-            candidate = getattr(scheme_uris[0].childNodes[1], "firstChild", None)
-            value = getattr(candidate, "nodeValue", None)
-            if isinstance(value, str) and value.strip():
-                tsp_url = value.strip()
-
-        emails = tsp_node.getElementsByTagNameNS("*", "ElectronicAddress")
-        if emails:
-            uris = emails[0].getElementsByTagNameNS("*", "URI")
-            for uri in uris:
+        for uri_tag in ("TSPServiceDefinitionURI", "SchemeServiceDefinitionURI"):
+            def_uris = fields.get(uri_tag)
+            if def_uris:
+                value = child_value_of(def_uris[0], 1)
+                if isinstance(value, str) and value.strip():
+                    tsp_url = value.strip()
+
+        if english_uri:
+            tsp_url = english_uri
+
+        return {"tsp_url": tsp_url, "crl_url": crl_url}
+
+    @staticmethod
+    def _english_uri(provider_fields: Fields) -> str | None:
+        """Return the English URI of the provider's first `ElectronicAddress`, if any."""
+        addresses = provider_fields.get("ElectronicAddress")
+        if not addresses:
+            return None
+        address = addresses[0]
+        if isinstance(address, Element):
+            for uri in address.getElementsByTagNameNS("*", "URI"):
                 if uri.getAttribute("xml:lang") == "en":
                     value = TslParser._node_text_from_first_child(uri)
                     if isinstance(value, str) and value:
-                        tsp_url = value
-                        break
+                        return value
+            return None
+        for uri in TslParser._et_descendants(address, "URI"):
+            if uri.get(XML_LANG_ATTRIBUTE) == "en":
+                value = TslParser._et_first_child_text(uri)
+                if isinstance(value, str) and value:
+                    return value
+        return None
 
-        return {"tsp_url": tsp_url, "crl_url": crl_url}
+    @staticmethod
+    def _english_name(node: Element) -> str:
+        """Return the English `Name` child of a multilingual element, or its first `Name`."""
+        names = [
+            (child.getAttribute("xml:lang"), TslParser._node_text_from_first_child(child) or "")
+            for child in node.childNodes
+            if child.nodeType == Node.ELEMENT_NODE and child.localName == "Name"
+        ]
+        return next((text for lang, text in names if lang == "en"), names[0][1] if names else "")
+
+    @staticmethod
+    def _digital_id(cert_value: str) -> str:
+        """Return the SHA-256 hex digest of a base64 encoded certificate, or an empty string if it is invalid."""
+        try:
+            return hashlib.sha256(base64.b64decode(cert_value)).hexdigest()
+        except ValueError:
+            return ""
+
+    @staticmethod
+    def _start_date(date_str: str) -> datetime | None:
+        """Return the parsed ISO 8601 date, or None if it is missing or invalid."""
+        try:
+            return datetime.fromisoformat(date_str) if date_str else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _status_simple(status_uri: str) -> str:
+        """Return the last path segment of a service status URI (e.g. "granted")."""
+        return urlparse(status_uri).path.split("/")[-1] if status_uri else ""
+
+    @staticmethod
+    def _node_text_from_first_child(node: Optional[Node]) -> Optional[str]:
+        """Return stripped text of `node.firstChild.nodeValue` if present and a string."""
+        if node is None:
+            return None
+        first = getattr(node, "firstChild", None)
+        value = getattr(first, "nodeValue", None)
+        return value.strip() if isinstance(value, str) else None
+
+    @staticmethod
+    def _child_node_value(node: Element, index: int) -> Optional[str]:
+        """Return `node.childNodes[index].firstChild.nodeValue` if present."""
+        if not node.childNodes or len(node.childNodes) <= index:
+            return None
+        candidate = getattr(node.childNodes[index], "firstChild", None)
+        value = getattr(candidate, "nodeValue", None)
+        return value if isinstance(value, str) else None
+
+    @staticmethod
+    def _get_text(node: Element, tag: str, index: int = 0, default: str = "") -> str:
+        """
+        Safely get text content from the given XML tag.
+
+        Args:
+            node: XML element to search in.
+            tag: Tag local name.
+            index: Index of the occurrence.
+            default: Default value if the tag is missing.
+
+        Returns:
+            The text value or the default.
+        """
+        try:
+            el = node.getElementsByTagNameNS("*", tag)[index]
+        except IndexError:
+            return default
+
+        text = TslParser._node_text_from_first_child(el)
+        return text if text is not None else default
+
+    @staticmethod
+    def _et_local_name(tag: Any) -> str:
+        """Return the local name of an ElementTree tag (comments and processing instructions have none)."""
+        return tag.rpartition("}")[2] if isinstance(tag, str) else ""
+
+    @staticmethod
+    def _et_collect(node: Any, tags: frozenset[str]) -> Fields:
+        """Walk an ElementTree subtree once and group its descendants with the given local names."""
+        fields: Fields = {}
+        for el in node.iter():
+            if el is node:
+                continue
+            name = TslParser._et_local_name(el.tag)
+            if name in tags:
+                fields.setdefault(name, []).append(el)
+        return fields
+
+    @staticmethod
+    def _et_descendants(node: Any, tag: str) -> list[Any]:
+        """Return descendants of `node` with the local name `tag`, in document order (like getElementsByTagNameNS)."""
+        return [el for el in node.iter() if el is not node and TslParser._et_local_name(el.tag) == tag]
+
+    @staticmethod
+    def _et_first_child_value(node: Any) -> Optional[str]:
+        """Return what minidom's `node.firstChild.nodeValue` would be for an ElementTree element."""
+        if node.text:
+            return str(node.text)
+        if len(node):
+            first = node[0]
+            if not isinstance(first.tag, str):  # comment: its data is the node value
+                return str(first.text or "")
+        return None
+
+    @staticmethod
+    def _et_first_child_text(node: Any) -> Optional[str]:
+        """Return stripped text of the first child node of an ElementTree element, if it is a text node."""
+        value = TslParser._et_first_child_value(node)
+        return value.strip() if isinstance(value, str) else None
+
+    @staticmethod
+    def _et_child_node_value(node: Any, index: int) -> Optional[str]:
+        """Return what minidom's `node.childNodes[index].firstChild.nodeValue` would be for an ElementTree element."""
+        child_nodes: list[Any] = [node.text] if node.text else []
+        for child in node:
+            child_nodes.append(child)
+            if child.tail:
+                child_nodes.append(child.tail)
+        if len(child_nodes) <= index:
+            return None
+        child = child_nodes[index]
+        if isinstance(child, str) or not isinstance(child.tag, str):  # text and comment nodes have no children
+            return None
+        return TslParser._et_first_child_value(child)
+
+    @staticmethod
+    def _et_english_name(node: Any) -> str:
+        """Return the English `Name` child of a multilingual ElementTree element, or its first `Name`."""
+        names = [
+            (child.get(XML_LANG_ATTRIBUTE), (child.text or "").strip())
+            for child in node
+            if TslParser._et_local_name(child.tag) == "Name"
+        ]
+        return next((text for lang, text in names if lang == "en"), names[0][1] if names else "")
+
+    @staticmethod
+    def _et_get_text(node: Any, tag: str, index: int = 0, default: str = "") -> str:
+        """ElementTree counterpart of `_get_text`."""
+        elements = TslParser._et_descendants(node, tag)
+        if len(elements) <= index:
+            return default
+        text = TslParser._et_first_child_text(elements[index])
+        return text if text is not None else default
+
+
+def _parse_file_records(
+    path: Path, countries: Mapping[str, str], backend: str
+) -> tuple[list[tuple[Any, ...]], TslFileState | None, str | None, float]:
+    """
+    Parses a single XML file in a worker process.
+
+    Errors are returned as text rather than raised: parser exceptions (e.g. from lxml) cannot always be pickled.
+
+    Args:
+        path: Path to the XML file.
+        countries: Mapping of country codes to country names.
+        backend: XML engine used to read the file.
+
+    Returns:
+        The services found in the file, each as a tuple of `ParsedService` fields, the scheme header
+        (None if the file could not be parsed), the error message and the parse time in seconds.
+    """
+    started = time.perf_counter()
+    try:
+        services, header = TslParser(path.parent, countries, backend)._parse_file(path)
+    except Exception as e:
+        return [], None, str(e), time.perf_counter() - started
+    return [astuple(service) for service in services], header, None, time.perf_counter() - started
@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Mapping, Protocol, cast
+
+from django.conf import settings
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+from ..choices import TslValidityAlert
+from ..models import TslValidityInfo
+from .tsl_parser import TslFileState
+
+logger = logging.getLogger(__name__)
+
+
+class _SettingsWithExpiryWarning(Protocol):
+    TSL_EXPIRY_WARNING_DAYS: int
+
+
+def _warning_period() -> timedelta:
+    return timedelta(days=cast(_SettingsWithExpiryWarning, cast(object, settings)).TSL_EXPIRY_WARNING_DAYS)
+
+
+def validity_alert(next_update: datetime | None, now: datetime) -> str:
+    """
+    Returns the validity alert of a TSL with the given next update date.
+
+    Args:
+        next_update: Date by which the next version of the list is due; None for a closed list.
+        now: Current date and time.
+
+    Returns:
+        str: One of the `TslValidityAlert` values.
+    """
+    if next_update is None:
+        return TslValidityAlert.CLOSED
+    if next_update <= now:
+        return TslValidityAlert.EXPIRED
+    if next_update <= now + _warning_period():
+        return TslValidityAlert.EXPIRING_SOON
+    return TslValidityAlert.VALID
+
+
+def save_validity_info(file_states: Mapping[str, TslFileState], countries: Mapping[str, str]) -> None:
+    """
+    Records the scheme header of the imported TSL files, one row per country, in a single upsert.
+
+    Files whose header lacks a country code or an issue date are skipped.
+
+    Args:
+        file_states (Mapping[str, TslFileState]): State of every imported TSL file, keyed by file name.
+        countries (Mapping[str, str]): Mapping of country codes to country names.
+    """
+    now = timezone.now()
+    rows: dict[str, TslValidityInfo] = {}
+    for file_name, state in file_states.items():
+        if not state.country_code or state.issue_date is None:
+            logger.warning(f"Cannot record the validity of {file_name}: its scheme header is incomplete")
+            continue
+        rows[state.country_code] = TslValidityInfo(
+            country_code=state.country_code,
+            country_name=countries.get(state.country_code, "Unknown"),
+            tsl_operator_name=state.operator_name[:255],
+            tsl_sequence_number=state.sequence_number,
+            tsl_issue_date=state.issue_date,
+            tsl_expiry_date=state.next_update,
+            tsl_validity_alert=validity_alert(state.next_update, now),
+        )
+    if not rows:
+        return
+
+    TslValidityInfo.objects.bulk_create(
+        rows.values(),
+        update_conflicts=True,
+        unique_fields=["country_code"],
+        update_fields=[
+            "country_name",
+            "tsl_operator_name",
+            "tsl_sequence_number",
+            "tsl_issue_date",
+            "tsl_expiry_date",
+            "tsl_validity_alert",
+        ],
+    )
+    logger.info(f"Recorded the validity of {len(rows)} TSLs")
+
+
+def refresh_validity_alerts() -> int:
+    """
+    Recomputes the validity alert of every recorded TSL against the current date, in a single UPDATE.
+
+    The alerts are stored so the TSL status page reads them as they are; this keeps the alerts of the lists
+    that did not change since their import up to date.
+
+    Returns:
+        int: Number of rows whose alert changed.
+    """
+    now = timezone.now()
+    alert = Case(
+        When(tsl_expiry_date__isnull=True, then=Value(TslValidityAlert.CLOSED)),
+        When(tsl_expiry_date__lte=now, then=Value(TslValidityAlert.EXPIRED)),
+        When(tsl_expiry_date__lte=now + _warning_period(), then=Value(TslValidityAlert.EXPIRING_SOON)),
+        default=Value(TslValidityAlert.VALID),
+    )
+    changed = TslValidityInfo.objects.exclude(tsl_validity_alert=alert).update(tsl_validity_alert=alert)
+    if changed:
+        logger.info(f"Updated the validity alert of {changed} TSLs")
+    return changed
@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Protocol, cast
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import push_metrics
+from .services.tsl_import import FAILED, PENDING, RUNNING, ImportProgress, import_services
+
+logger = logging.getLogger(__name__)
+
+# Progress of an import job, kept in the shared cache for the web workers to poll. It outlives the import lock,
+# so that a job whose worker died is reported as failed rather than unknown.
+IMPORT_JOB_KEY = "tsl:import-job:{job_id}"
+IMPORT_JOB_KEY_TIMEOUT_FACTOR = 2
+# Id of the running import job; taking it is what starts a job, so concurrent requests share one import
+IMPORT_LOCK_KEY = "tsl:import-lock"
+
+
+class _SettingsWithImportJobs(Protocol):
+    DATA_DIRECTORY: Path
+    TSL_IMPORT_JOB_TIMEOUT: int
+
+
+def _job_timeout() -> int:
+    return cast(_SettingsWithImportJobs, cast(object, settings)).TSL_IMPORT_JOB_TIMEOUT
+
+
+def _save_progress(job_id: str, progress: ImportProgress) -> None:
+    cache.set(IMPORT_JOB_KEY.format(job_id=job_id), asdict(progress), _job_timeout() * IMPORT_JOB_KEY_TIMEOUT_FACTOR)
+
+
+def get_import_progress(job_id: str) -> dict[str, Any] | None:
+    """
+    Returns the progress of an import job, or None if the job is unknown or expired.
+
+    A pending or running job that no longer holds the import lock was given up on: its worker died, or never
+    picked it up, before the lock expired. It is reported as failed.
+    """
+    progress: dict[str, Any] | None = cache.get(IMPORT_JOB_KEY.format(job_id=job_id))
+    if progress is not None and progress["state"] in (PENDING, RUNNING) and cache.get(IMPORT_LOCK_KEY) != job_id:
+        progress = {**progress, "state": FAILED, "error": "The update stopped before completing. Please try again."}
+    return progress
+
+
+class ImportJobError(Exception):
+    """
+    Raised when an import job cannot be enqueued.
+    """
+
+
+def start_import_job() -> str:
+    """
+    Enqueues a service import, unless one is already pending or running.
+
+    If the job cannot be enqueued (e.g. the broker is down), the lock and the progress record are removed
+    again, so the next request starts a new job rather than waiting for one that never runs.
+
+    Returns:
+        str: Id of the new job, or of the job already in progress.
+
+    Raises:
+        ImportJobError: If the job could not be enqueued.
+    """
+    job_id = uuid.uuid4().hex
+    if not cache.add(IMPORT_LOCK_KEY, job_id, _job_timeout()):
+        running_job_id = cache.get(IMPORT_LOCK_KEY)
+        if running_job_id is not None:
+            return cast(str, running_job_id)
+        cache.set(IMPORT_LOCK_KEY, job_id, _job_timeout())
+
+    _save_progress(job_id, ImportProgress())
+    try:
+        import_services_task.apply_async(args=(job_id,), task_id=job_id)
+    except Exception as e:
+        logger.exception(f"Could not enqueue the service import {job_id}")
+        cache.delete(IMPORT_JOB_KEY.format(job_id=job_id))
+        if cache.get(IMPORT_LOCK_KEY) == job_id:
+            cache.delete(IMPORT_LOCK_KEY)
+        raise ImportJobError("The update could not be started. Please try again later.") from e
+    return job_id
+
+
+@shared_task(name="tsl_manager_app.tasks.import_services_task", ignore_result=True)
+def import_services_task(job_id: str) -> None:
+    """
+    Celery task that imports the services and records its progress under the job id.
+
+    The import metrics are pushed to the Pushgateway once the job is over, whether it succeeded or not.
+
+    Args:
+        job_id: Id of the job, as returned by `start_import_job`.
+    """
+    try:
+        import_services(on_progress=lambda progress: _save_progress(job_id, progress))
+    except Exception as e:
+        logger.exception(f"Service import {job_id} failed")
+        progress = ImportProgress(**(get_import_progress(job_id) or {}))
+        progress.state = FAILED
+        progress.error = str(e)
+        _save_progress(job_id, progress)
+    finally:
+        if cache.get(IMPORT_LOCK_KEY) == job_id:
+            cache.delete(IMPORT_LOCK_KEY)
+        push_metrics()
+
+
+@shared_task(name="tsl_manager_app.tasks.import_country_task", ignore_result=True)
+def import_country_task(country_code: str, sha256: str) -> None:
+    """
+    Celery task that imports the services of one country, sent by the downloader once it replaced the country's file.
+
+    The file is imported only if it changed since the last import (see the manifest), so repeated or stale events
+    are harmless. Events are consumed one at a time, together with the full imports, by the importer worker.
+
+    Args:
+        country_code: Country code, which names the TSL file (e.g. "PL" for "PL.xml").
+        sha256: Hex digest of the file written by the downloader.
+    """
+    file_name = f"{country_code}.xml"
+    path = cast(_SettingsWithImportJobs, cast(object, settings)).DATA_DIRECTORY / file_name
+    try:
+        with open(path, "rb") as f:
+            current_sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+    except FileNotFoundError:
+        logger.warning(f"Ignoring the change event of {file_name}: the file does not exist")
+        return
+    if current_sha256 != sha256:
+        logger.info(f"{file_name} was replaced again since the change event; importing its current content")
+
+    try:
+        progress = import_services(file_names=[file_name])
+    finally:
+        push_metrics()
+    logger.info(
+        f"Imported {file_name}: {progress.files_parsed} file(s) parsed, "
+        f"{progress.created} services created, {progress.updated} updated"
+    )
@@ -0,0 +1,28 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+FIXTURES = Path(__file__).parent / "fixtures" / "tsl"
+
+
+def use_fixture_data_directory(test: SimpleTestCase) -> Path:
+    """
+    Points `DATA_DIRECTORY` to a temporary copy of the TSL fixtures for the duration of a test.
+
+    Imports run in the incremental mode with bulk writes, so they behave the same on every database.
+
+    Returns:
+        Path: The temporary data directory.
+    """
+    data_directory = Path(tempfile.mkdtemp())
+    test.addCleanup(shutil.rmtree, data_directory)
+    for fixture in FIXTURES.glob("*.xml"):
+        shutil.copy(fixture, data_directory)
+    settings_override = override_settings(
+        DATA_DIRECTORY=data_directory, TSL_PARSER_INCREMENTAL=True, TSL_SERVICE_UPDATE_MODE="bulk"
+    )
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+    return data_directory
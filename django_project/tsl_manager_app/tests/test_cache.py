@@ -0,0 +1,94 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..cache import bump_data_version, data_version, filter_choices
+from ..filters import MainViewFilter
+from ..models import DataVersion, TspServiceInfo
+from ..services.tsl_import import import_services
+from .helpers import use_fixture_data_directory
+
+
+class DataVersionTests(TestCase):
+    """
+    The data version is bumped by the writers of the services table, in their transaction.
+    """
+
+    def test_import_bumps_the_version_only_if_services_changed(self) -> None:
+        use_fixture_data_directory(self)
+        version = data_version()
+
+        import_services()
+        self.assertEqual(data_version(), version + 1)
+
+        # Incremental import of unchanged files: nothing is stored
+        import_services()
+        self.assertEqual(data_version(), version + 1)
+
+    def test_bump_recreates_a_missing_row(self) -> None:
+        DataVersion.objects.all().delete()
+        self.assertEqual(data_version(), 0)
+
+        bump_data_version()
+        bump_data_version()
+        self.assertEqual(data_version(), 2)
+
+
+class CachedServiceListTests(TestCase):
+    """
+    The cached service lists are rendered again once an import has changed the services table.
+    """
+
+    user: User
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user("reviewer", password="secret")
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(self.user)
+
+    def test_list_is_rendered_again_after_an_import(self) -> None:
+        use_fixture_data_directory(self)
+        url = reverse("all_services")
+
+        before = self.client.get(url, {"page_size": "100"}).context["service_list"]
+        self.assertEqual(before.count("service-details/"), 0)
+
+        import_services()
+
+        after = self.client.get(url, {"page_size": "100"}).context["service_list"]
+        self.assertEqual(after.count("service-details/"), TspServiceInfo.objects.count())
+
+
+class FilterChoicesTests(TestCase):
+    """
+    The cached filter choices are read again once an import has changed the services table.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_choices_follow_an_import(self) -> None:
+        use_fixture_data_directory(self)
+        self.assertEqual(filter_choices("country_name"), [])
+
+        import_services()
+
+        countries = sorted(set(TspServiceInfo.objects.values_list("country_name", flat=True)))
+        self.assertEqual(filter_choices("country_name"), [(country, country) for country in countries])
+        self.assertEqual(len(countries), 2)
+
+    def test_filter_form_uses_the_current_choices(self) -> None:
+        self.assertEqual(list(MainViewFilter().form.fields["tsp_service_type"].choices), [("", "Service Type...")])
+
+        use_fixture_data_directory(self)
+        import_services()
+
+        service_types = set(TspServiceInfo.objects.values_list("tsp_service_type", flat=True))
+        choices = {value for value, _ in MainViewFilter().form.fields["tsp_service_type"].choices if value}
+        self.assertEqual(choices, service_types)
@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..services.tsl_import import DONE, FAILED, PENDING, RUNNING, ImportProgress
+from ..tasks import IMPORT_LOCK_KEY, _save_progress, get_import_progress, import_services_task, start_import_job
+from .helpers import use_fixture_data_directory
+
+AJAX = {"X-Requested-With": "XMLHttpRequest"}
+
+
+class ImportJobTests(TestCase):
+    """
+    Import jobs run one at a time and report their progress, including jobs whose worker died.
+
+    Without a broker, Celery runs the jobs eagerly (`CELERY_TASK_ALWAYS_EAGER`); a mocked `apply_async`
+    stands for a job that is enqueued but not run yet.
+    """
+
+    user: User
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user("operator", password="secret")
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(cache.clear)
+        use_fixture_data_directory(self)
+        self.client.force_login(self.user)
+
+    def test_jobs_share_the_lock(self) -> None:
+        with mock.patch.object(import_services_task, "apply_async") as apply_async:
+            job_id = start_import_job()
+
+            self.assertEqual(start_import_job(), job_id)
+            apply_async.assert_called_once_with(args=(job_id,), task_id=job_id)
+        self.assertEqual(cache.get(IMPORT_LOCK_KEY), job_id)
+        self.assertEqual((get_import_progress(job_id) or {})["state"], PENDING)
+
+    def test_eager_job(self) -> None:
+        response = self.client.post(reverse("update_services"), headers=AJAX)
+
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        progress = self.client.get(response.json()["progress_url"]).json()
+        self.assertEqual((progress["state"], progress["files_parsed"], progress["files_total"]), (DONE, 2, 2))
+        self.assertIsNone(cache.get(IMPORT_LOCK_KEY))
+        # The lock is free again: the next request starts a new job
+        self.assertNotEqual(start_import_job(), job_id)
+
+    def test_enqueue_failure(self) -> None:
+        url = reverse("update_services")
+        with (
+            mock.patch.object(import_services_task, "apply_async", side_effect=ConnectionError("broker down")),
+            self.assertLogs("tsl_manager_app.tasks", "ERROR"),
+        ):
+            ajax_response = self.client.post(url, headers=AJAX)
+            response = self.client.post(url, follow=True)
+
+        self.assertEqual(ajax_response.status_code, 503)
+        self.assertIn("error", ajax_response.json())
+        self.assertRedirects(response, reverse("new_services"))
+        self.assertContains(response, "The update could not be started.")
+        self.assertIsNone(cache.get(IMPORT_LOCK_KEY))
+
+    def test_failed_job(self) -> None:
+        with (
+            mock.patch("tsl_manager_app.tasks.import_services", side_effect=RuntimeError("disk full")),
+            self.assertLogs("tsl_manager_app.tasks", "ERROR"),
+        ):
+            job_id = start_import_job()
+
+        progress = get_import_progress(job_id) or {}
+        self.assertEqual((progress["state"], progress["error"]), (FAILED, "disk full"))
+        self.assertIsNone(cache.get(IMPORT_LOCK_KEY))
+
+    def test_job_left_behind_by_a_dead_worker(self) -> None:
+        with mock.patch.object(import_services_task, "apply_async"):
+            job_id = start_import_job()
+        _save_progress(job_id, ImportProgress(state=RUNNING, files_parsed=1, files_total=2))
+
+        self.assertEqual(self.client.get(reverse("import_progress", args=[job_id])).json()["state"], RUNNING)
+
+        # The worker died: nobody releases the lock, which expires after the job timeout
+        cache.delete(IMPORT_LOCK_KEY)
+        progress = self.client.get(reverse("import_progress", args=[job_id])).json()
+
+        self.assertEqual((progress["state"], progress["files_parsed"]), (FAILED, 1))
+        self.assertTrue(progress["error"])
+
+    def test_unknown_job(self) -> None:
+        self.assertEqual(self.client.get(reverse("import_progress", args=["missing"])).status_code, 404)
+
+    @override_settings(TSL_IMPORT_JOB_TIMEOUT=60)
+    def test_progress_outlives_the_lock(self) -> None:
+        with (
+            mock.patch.object(cache, "set", wraps=cache.set) as cache_set,
+            mock.patch.object(import_services_task, "apply_async"),
+        ):
+            job_id = start_import_job()
+
+        timeouts = {call.args[0]: call.args[2] for call in cache_set.call_args_list}
+        self.assertEqual(timeouts[f"tsl:import-job:{job_id}"], 120)
+        self.assertEqual(cache.get(IMPORT_LOCK_KEY), job_id)
@@ -0,0 +1,46 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client.parser import text_string_to_metric_families
+
+from ..models import TspServiceInfo
+from ..tasks import get_import_progress, start_import_job
+from .helpers import use_fixture_data_directory
+
+
+class MetricsViewTests(TestCase):
+    """
+    The metrics endpoint serves the import metrics recorded by the web app, to scrapers holding the token if set.
+    """
+
+    def _scrape(self, **headers: str) -> dict[tuple[str, tuple[tuple[str, str], ...]], float]:
+        response = self.client.get(reverse("metrics"), headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return {
+            (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+            for family in text_string_to_metric_families(response.content.decode())
+            for sample in family.samples
+        }
+
+    def test_scrape_after_an_import(self) -> None:
+        use_fixture_data_directory(self)
+        store_count = ("tsl_import_stage_seconds_count", (("stage", "store"),))
+        created_sum = ("tsl_import_services_sum", (("result", "created"),))
+        before = self._scrape()
+
+        # Without a broker, Celery runs the import eagerly, in this process
+        job_id = start_import_job()
+        self.assertEqual((get_import_progress(job_id) or {}).get("state"), "done")
+
+        after = self._scrape()
+        self.assertEqual(after[store_count] - before.get(store_count, 0), 1)
+        self.assertEqual(after[created_sum] - before.get(created_sum, 0), TspServiceInfo.objects.count())
+        self.assertGreater(after[("tsl_parse_file_seconds_count", (("backend", "minidom"),))], 0)
+
+    @override_settings(TSL_METRICS_TOKEN="s3cret")
+    def test_token(self) -> None:
+        url = reverse("metrics")
+
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.assertEqual(self.client.get(url, headers={"Authorization": "Bearer wrong"}).status_code, 401)
+        self.assertEqual(self.client.get(url, headers={"Authorization": "Bearer żółw"}).status_code, 401)
+        self._scrape(Authorization="Bearer s3cret")
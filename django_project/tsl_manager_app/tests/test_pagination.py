@@ -0,0 +1,157 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from urllib.parse import parse_qs
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from ..choices import CrlUrlStatus, ServiceStatus
+from ..models import TspServiceInfo
+from ..pagination import KeysetPaginator
+
+START_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+ORDERING = ["country_name", "tsp_name", "tsp_service_name", "id"]
+
+
+def _cursor(payload: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+class KeysetPaginatorTests(TestCase):
+    """
+    Pages are walked through with cursors, forward and backward, and malformed cursors lead to the first page.
+    """
+
+    expected: list[int]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        TspServiceInfo.objects.bulk_create(
+            TspServiceInfo(
+                country_code="PL" if number % 2 else "CZ",
+                country_name="Poland" if number % 2 else "Czechia",
+                tsp_name=f"Provider {number % 3}",
+                # Duplicate names: the primary key decides the order of the ties
+                tsp_service_name=f"Service {number % 4}",
+                tsp_service_type="http://uri.etsi.org/TrstSvc/Svctype/CA/QC",
+                tsp_service_status="granted",
+                tsp_service_start_date=START_DATE + timedelta(days=number),
+                tsp_service_digital_id=f"id-{number}",
+                service_status_app=ServiceStatus.NEW_NOT_SERVED,
+                crl_url_status_app=CrlUrlStatus.URL_UNDEFINED,
+            )
+            for number in range(23)
+        )
+        cls.expected = list(TspServiceInfo.objects.order_by(*ORDERING).values_list("id", flat=True))
+
+    def _paginator(self, ordering: list[str] = ORDERING) -> KeysetPaginator[Any]:
+        return KeysetPaginator(TspServiceInfo.objects.all(), ordering, page_size=5)
+
+    def test_forward_and_backward_traversal(self) -> None:
+        paginator = self._paginator()
+        pages = [paginator.page()]
+        while pages[-1].has_next:
+            pages.append(paginator.page(after=pages[-1].next_cursor))
+
+        self.assertEqual([obj.id for page in pages for obj in page.object_list], self.expected)
+        self.assertEqual([page.start_index for page in pages], [1, 6, 11, 16, 21])
+        self.assertFalse(pages[0].has_previous)
+        self.assertEqual(pages[-1].end_index, 23)
+
+        backward = [pages[-1]]
+        while backward[-1].has_previous:
+            backward.append(paginator.page(before=backward[-1].previous_cursor))
+
+        self.assertEqual(
+            [[obj.id for obj in page.object_list] for page in backward[::-1]],
+            [[obj.id for obj in page.object_list] for page in pages],
+        )
+        self.assertEqual([page.start_index for page in backward[::-1]], [1, 6, 11, 16, 21])
+
+    def test_datetime_ordering(self) -> None:
+        paginator = self._paginator(["tsp_service_start_date"])
+        second = paginator.page(after=paginator.page().next_cursor)
+
+        self.assertEqual(
+            [obj.id for obj in second.object_list],
+            list(TspServiceInfo.objects.order_by("tsp_service_start_date", "id").values_list("id", flat=True)[5:10]),
+        )
+
+    def test_malformed_cursors_lead_to_the_first_page(self) -> None:
+        paginator = self._paginator()
+        first = [obj.id for obj in paginator.page().object_list]
+        cursors = {
+            "not base64": "%%%",
+            "not JSON": base64.urlsafe_b64encode(b"{").decode(),
+            "missing position": _cursor({"v": ["Poland", "Provider 1", "Service 1", 1]}),
+            "wrong length": _cursor({"v": ["Poland"], "n": 5}),
+            "text for the primary key": _cursor({"v": ["Poland", "Provider 1", "Service 1", "1"], "n": 5}),
+            "number for a text field": _cursor({"v": [1, "Provider 1", "Service 1", 1], "n": 5}),
+            "null for a required field": _cursor({"v": [None, "Provider 1", "Service 1", 1], "n": 5}),
+            "boolean position": _cursor({"v": ["Poland", "Provider 1", "Service 1", 1], "n": True}),
+            "negative position": _cursor({"v": ["Poland", "Provider 1", "Service 1", 1], "n": -3}),
+        }
+        for name, cursor in cursors.items():
+            with self.subTest(name):
+                page = paginator.page(after=cursor)
+                self.assertEqual([obj.id for obj in page.object_list], first)
+                self.assertEqual(page.start_index, 1)
+
+        with self.subTest("date that is not ISO"):
+            dated = self._paginator(["tsp_service_start_date"])
+            page = dated.page(after=_cursor({"v": ["yesterday", 1], "n": 5}))
+            self.assertEqual(page.start_index, 1)
+
+    def test_unsupported_ordering_field(self) -> None:
+        with self.assertRaises(ValueError):
+            KeysetPaginator(TspServiceInfo.objects.all(), ["-tsp_name"], page_size=5)
+
+
+class ServiceListPaginationTests(TestCase):
+    """
+    The page links of the service lists keep the filters of the current request.
+    """
+
+    user: User
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        TspServiceInfo.objects.bulk_create(
+            TspServiceInfo(
+                country_code="PL",
+                country_name="Poland",
+                tsp_name="Provider" if number % 2 else "Other",
+                tsp_service_name=f"Service {number:02}",
+                tsp_service_type="http://uri.etsi.org/TrstSvc/Svctype/CA/QC",
+                tsp_service_status="granted",
+                tsp_service_start_date=START_DATE,
+                tsp_service_digital_id=f"id-{number}",
+                service_status_app=ServiceStatus.NEW_NOT_SERVED,
+                crl_url_status_app=CrlUrlStatus.URL_UNDEFINED,
+            )
+            for number in range(12)
+        )
+        cls.user = User.objects.create_user("reviewer", password="secret")
+
+    def setUp(self) -> None:
+        self.client.force_login(self.user)
+
+    def test_links_keep_the_filters(self) -> None:
+        url = reverse("new_services")
+        response = self.client.get(url, {"tsp_name": "Provider", "page_size": "2"})
+        next_query: dict[str, list[str]] = parse_qs(response.context["page_obj"].next_query)
+
+        self.assertEqual(next_query["tsp_name"], ["Provider"])
+        self.assertEqual(next_query["page_size"], ["2"])
+
+        response = self.client.get(url, {key: values[0] for key, values in next_query.items()})
+        page = response.context["page_obj"]
+        previous_query = parse_qs(page.previous_query)
+
+        self.assertEqual([row.tsp_service_name for row in page.object_list], ["Service 05", "Service 07"])
+        self.assertEqual(previous_query["tsp_name"], ["Provider"])
+        self.assertIn("before", previous_query)
+        self.assertNotIn("after", previous_query)
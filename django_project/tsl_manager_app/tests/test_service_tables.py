@@ -0,0 +1,25 @@
+import re
+
+from django.template.loader import get_template
+from django.test import SimpleTestCase
+
+from ..views import PROCESSED_SERVICES_TABLE, SERVICES_TABLE, AllServicesView, NewServicesView
+
+SERVICE_FIELD = re.compile(r"\bservice\.(\w+)")
+
+
+class ServiceTableTests(SimpleTestCase):
+    """
+    The service list templates read only the fields their table fetches.
+    """
+
+    def test_templates_read_the_table_columns(self) -> None:
+        for table in (SERVICES_TABLE, PROCESSED_SERVICES_TABLE):
+            with self.subTest(template=table.template_name):
+                source = get_template(table.template_name).template.source  # type: ignore[attr-defined]
+                fields = set(SERVICE_FIELD.findall(source))
+
+                self.assertEqual(fields, {"id", *table.columns})
+
+    def test_new_and_all_services_share_the_table(self) -> None:
+        self.assertIs(NewServicesView.table, AllServicesView.table)
@@ -0,0 +1,176 @@
+from datetime import datetime, timezone
+from typing import Any
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from ..choices import CrlUrlStatus, ServiceStatus
+from ..models import TspServiceInfo
+from ..services.service_updater import BULK_MODE, CA_QC_URI, UPSERT_MODE, ServiceUpdater
+from ..services.tsl_parser import ParsedService
+
+TSA_URI = "http://uri.etsi.org/TrstSvc/Svctype/TSA/QTST"
+START_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def _service(name: str, **overrides: Any) -> ParsedService:
+    fields: dict[str, Any] = {
+        "country_code": "PL",
+        "country_name": "Poland",
+        "tsp_name": "Provider",
+        "tsp_service_name": name,
+        "tsp_service_type": CA_QC_URI,
+        "tsp_service_status": "granted",
+        "tsp_service_start_date": START_DATE,
+        "tsp_service_digital_id": f"id-{name}",
+        "tsp_url": f"https://{name}.example/",
+        "crl_url": "",
+    }
+    fields.update(overrides)
+    return ParsedService(**fields)
+
+
+# Imports applied one after another, covering creations, every update rule, services listed twice in one
+# import and qualified CA services without a start date
+IMPORTS: list[list[ParsedService]] = [
+    [
+        _service("new"),
+        _service("withdrawn", tsp_service_status="withdrawn"),
+        _service("undated", tsp_service_start_date=None),
+        _service("undated-existing", tsp_service_start_date=None, tsp_url="https://moved.example/"),
+        _service("served", tsp_service_status="withdrawn"),
+        _service("tsa", tsp_service_type=TSA_URI),
+        _service("twice"),
+        _service("twice", tsp_url="https://twice.example/v2", crl_url="http://crl.example/twice.crl"),
+    ],
+    [
+        _service("new", tsp_service_status="withdrawn", crl_url="http://crl.example/new.crl"),
+        _service("withdrawn"),
+        _service("undated", tsp_service_start_date=None),
+        _service("served", tsp_service_type=TSA_URI),
+        _service("twice", tsp_service_type=TSA_URI),
+        _service("twice", crl_url="http://crl.example/other.crl"),
+    ],
+]
+
+
+def _seed() -> None:
+    """Creates the rows the imports find in the table: a dated service and a service marked as served."""
+    for name, service_status_app in (
+        ("undated-existing", ServiceStatus.NEW_NOT_SERVED),
+        ("served", ServiceStatus.SERVED),
+    ):
+        TspServiceInfo.objects.create(
+            country_code="PL",
+            country_name="Poland",
+            tsp_name="Provider",
+            tsp_service_name=name,
+            tsp_service_type=CA_QC_URI,
+            tsp_service_status="granted",
+            tsp_service_start_date=START_DATE,
+            tsp_url=f"https://{name}.example/",
+            tsp_service_digital_id=f"id-{name}",
+            service_status_app=service_status_app,
+            crl_url_status_app=CrlUrlStatus.URL_DEFINED,
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "The upsert mode requires PostgreSQL")
+class ServiceUpdaterModesTests(TestCase):
+    """
+    The bulk and upsert modes must leave the services table in the same state.
+    """
+
+    def _run(self, mode: str) -> tuple[list[dict[str, Any]], list[tuple[int, int, int]]]:
+        TspServiceInfo.objects.all().delete()
+        _seed()
+        counts = []
+        for services in IMPORTS:
+            updater = ServiceUpdater(services, mode=mode)
+            updater.run()
+            counts.append((updater.created_count, updater.updated_count, updater.skipped_count))
+        rows = list(
+            TspServiceInfo.objects.order_by("tsp_service_name", "tsp_service_digital_id").values(
+                *(field.name for field in TspServiceInfo._meta.fields if field.name != "id")
+            )
+        )
+        return rows, counts
+
+    def test_modes_produce_identical_tables(self) -> None:
+        bulk_rows, bulk_counts = self._run(BULK_MODE)
+        upsert_rows, upsert_counts = self._run(UPSERT_MODE)
+
+        self.assertEqual(upsert_rows, bulk_rows)
+        self.assertEqual(upsert_counts, bulk_counts)
+
+    def test_services_without_digital_id_are_created_once(self) -> None:
+        services = [_service("no-id", tsp_service_digital_id=""), _service("no-id", tsp_service_digital_id="")]
+        for mode in (BULK_MODE, UPSERT_MODE):
+            with self.subTest(mode=mode):
+                TspServiceInfo.objects.all().delete()
+                for _ in range(2):
+                    ServiceUpdater(services, mode=mode).run()
+                self.assertEqual(TspServiceInfo.objects.filter(tsp_service_name="no-id").count(), 1)
+
+    def test_undated_services_are_skipped(self) -> None:
+        for mode in (BULK_MODE, UPSERT_MODE):
+            with self.subTest(mode=mode):
+                rows, counts = self._run(mode)
+                names = {row["tsp_service_name"] for row in rows}
+                self.assertNotIn("undated", names)
+                self.assertIn("undated-existing", names)
+                self.assertEqual([skipped for _, _, skipped in counts], [1, 1])
+
+
+class ServiceUpdaterBulkTests(TestCase):
+    """
+    The bulk mode runs on any database and reports what each import did to the services table.
+    """
+
+    def setUp(self) -> None:
+        _seed()
+
+    @staticmethod
+    def _import(services: list[ParsedService]) -> tuple[int, int, int, int]:
+        """Runs one import and returns the created, updated, skipped and unchanged counts."""
+        updater = ServiceUpdater(services, mode=BULK_MODE)
+        updater.run()
+        return updater.created_count, updater.updated_count, updater.skipped_count, updater.unchanged_count
+
+    def test_counts(self) -> None:
+        # First import: "new", "withdrawn" and "twice" are created, "undated-existing" and "served" updated,
+        # "undated" skipped, while the TSA service and the second "twice" entry leave the table unchanged
+        self.assertEqual(self._import(IMPORTS[0]), (3, 2, 1, 2))
+        self.assertEqual(self._import(IMPORTS[1]), (0, 4, 1, 1))
+        self.assertFalse(TspServiceInfo.objects.filter(tsp_service_name="undated").exists())
+
+    def test_matching_rows_are_unchanged(self) -> None:
+        services = [_service("undated-existing"), _service("served", crl_url="")]
+
+        self.assertEqual(self._import(services), (0, 0, 0, 2))
+
+    def test_served_service_keeps_its_status(self) -> None:
+        self.assertEqual(self._import([_service("served", tsp_service_status="withdrawn")]), (0, 1, 0, 0))
+
+        served = TspServiceInfo.objects.get(tsp_service_name="served")
+        self.assertEqual(served.tsp_service_status, "withdrawn")
+        self.assertEqual(served.service_status_app, ServiceStatus.SERVED)
+
+    def test_services_without_digital_id_may_share_a_name(self) -> None:
+        for _ in range(2):
+            TspServiceInfo.objects.create(
+                country_code="PL",
+                country_name="Poland",
+                tsp_name="Provider",
+                tsp_service_name="no-id",
+                tsp_service_type=CA_QC_URI,
+                tsp_service_status="granted",
+                tsp_service_start_date=START_DATE,
+                tsp_service_digital_id="",
+                service_status_app=ServiceStatus.NEW_NOT_SERVED,
+                crl_url_status_app=CrlUrlStatus.URL_UNDEFINED,
+            )
+
+        self.assertEqual(self._import([_service("no-id", tsp_service_digital_id="")]), (0, 2, 0, 0))
+        self.assertEqual(TspServiceInfo.objects.filter(tsp_service_name="no-id").count(), 2)
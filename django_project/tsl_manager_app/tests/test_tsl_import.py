@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from ..models import TslFileManifest, TslValidityInfo, TspServiceInfo
+from ..services.tsl_import import DONE, ImportProgress, import_services
+from .helpers import use_fixture_data_directory
+
+
+class IncrementalImportTests(TestCase):
+    """
+    With the incremental mode on, an import parses only the files whose content changed since the last one.
+    """
+
+    def setUp(self) -> None:
+        self.data_directory = use_fixture_data_directory(self)
+
+    def _import(self) -> ImportProgress:
+        progress = import_services()
+        self.assertEqual(progress.state, DONE)
+        return progress
+
+    def test_unchanged_files_are_skipped(self) -> None:
+        first = self._import()
+        manifest = dict(TslFileManifest.objects.values_list("file_name", "sha256"))
+
+        self.assertEqual((first.files_parsed, first.files_total), (2, 2))
+        self.assertEqual(set(manifest), {"CZ.xml", "PL.xml"})
+        self.assertEqual(TslValidityInfo.objects.get(country_code="PL").tsl_operator_name, "PL Supervisory Body")
+
+        second = self._import()
+
+        self.assertEqual((second.files_parsed, second.files_total, second.created, second.updated), (0, 0, 0, 0))
+        self.assertEqual(dict(TslFileManifest.objects.values_list("file_name", "sha256")), manifest)
+
+        cz_file = self.data_directory / "CZ.xml"
+        cz_file.write_text(cz_file.read_text().replace("CZ Trust Provider 0000", "CZ Renamed Provider"))
+        third = self._import()
+
+        self.assertEqual((third.files_parsed, third.files_total), (1, 1))
+        self.assertEqual(third.created, 3)
+        self.assertTrue(TspServiceInfo.objects.filter(tsp_name="CZ Renamed Provider").exists())
+        self.assertNotEqual(TslFileManifest.objects.get(file_name="CZ.xml").sha256, manifest["CZ.xml"])
+        self.assertEqual(TslFileManifest.objects.get(file_name="PL.xml").sha256, manifest["PL.xml"])
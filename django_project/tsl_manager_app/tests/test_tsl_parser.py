@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..constants import COUNTRIES_PL
+from ..services import tsl_parser
+from ..services.tsl_parser import ITERPARSE_BACKEND, MINIDOM_BACKEND, TslParser
+from .helpers import FIXTURES
+
+
+class TslParserBackendTests(SimpleTestCase):
+    """
+    The parser backends read the same records from the fixture lists, including their edge cases.
+    """
+
+    def _parse(self, backend: str, workers: int = 1) -> list[tsl_parser.ParsedService]:
+        return TslParser(FIXTURES, COUNTRIES_PL, backend=backend, workers=workers).parse_all()
+
+    def test_backends_produce_identical_records(self) -> None:
+        expected = self._parse(MINIDOM_BACKEND)
+
+        self.assertEqual(len(expected), 18)
+        self.assertEqual({service.country_code for service in expected}, {"CZ", "PL"})
+        self.assertEqual(self._parse(ITERPARSE_BACKEND), expected)
+        with mock.patch.object(tsl_parser, "lxml_etree", None):
+            self.assertEqual(self._parse(ITERPARSE_BACKEND), expected)
+
+    def test_backends_read_identical_headers(self) -> None:
+        states = []
+        for backend in (MINIDOM_BACKEND, ITERPARSE_BACKEND):
+            parser = TslParser(FIXTURES, COUNTRIES_PL, backend=backend)
+            parser.parse_all()
+            states.append(parser.file_states)
+
+        self.assertEqual(states[0], states[1])
+        self.assertEqual(states[0]["PL.xml"].sequence_number, 1)
+        self.assertEqual(states[0]["PL.xml"].operator_name, "PL Supervisory Body")
+        self.assertEqual(states[0]["CZ.xml"].country_code, "CZ")
+
+    def test_workers_produce_identical_records(self) -> None:
+        for backend in (MINIDOM_BACKEND, ITERPARSE_BACKEND):
+            with self.subTest(backend=backend):
+                self.assertEqual(self._parse(backend, workers=2), self._parse(backend))
+
+    def test_edge_cases(self) -> None:
+        services = {
+            service.tsp_service_name: service
+            for service in self._parse(ITERPARSE_BACKEND)
+            if service.tsp_name == "PL Edge Case Provider"
+        }
+
+        # The provider without a trade name, the untyped service and the service without history are skipped
+        self.assertEqual(set(services), {"legacy name", "OCSP Responder", "Undated Service"})
+        self.assertEqual(services["legacy name"].crl_url, "http://crl.edge.pl.example/commented.crl")
+        self.assertEqual(services["OCSP Responder"].tsp_url, "https://edge.pl.example/scheme-definition")
+        self.assertEqual(services["OCSP Responder"].tsp_service_digital_id, "")
+        self.assertIsNone(services["Undated Service"].tsp_service_start_date)
@@ -5,6 +5,8 @@ from .views import (
     ConfirmServiceView,
     CrlUrlFormView,
     GreetingView,
+    ImportProgressView,
+    MetricsView,
     NewServicesView,
     ProcessedServicesView,
     ServiceDetailsView,
@@ -22,4 +24,6 @@ urlpatterns = [
     path("crl-url-form/<int:pk>/", CrlUrlFormView.as_view(), name="crl_url_form"),
     path("tsl-status/", TslStatusView.as_view(), name="tsl_status"),
     path("update-services/", UpdateServicesView.as_view(), name="update_services"),
+    path("import-progress/<str:job_id>/", ImportProgressView.as_view(), name="import_progress"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
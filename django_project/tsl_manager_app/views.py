@@ -1,42 +1,135 @@
-from pathlib import Path
+from dataclasses import dataclass
 from typing import Any, Mapping, Protocol, cast
 
 from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
 from django.db.models import QuerySet
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
+from django.urls import reverse
 from django.views.generic import DetailView, TemplateView, UpdateView, View
+from prometheus_client import CONTENT_TYPE_LATEST
 
+from .cache import bump_data_version, list_fragment_key
 from .choices import CrlUrlStatus, ServiceStatus
-from .constants import COUNTRIES_PL
 from .filters import MainViewFilter
 from .forms import CrlUrlForm
+from .metrics import is_scrape_authorized, render_metrics
 from .models import TslValidityInfo, TspServiceInfo
-from .services.service_updater import ServiceUpdater
-from .services.tsl_parser import TslParser
+from .pagination import AFTER_PARAM, BEFORE_PARAM, KeysetPaginator, page_query
+from .tasks import ImportJobError, get_import_progress, start_import_job
 
 
 class GreetingView(TemplateView):
     template_name: str = "greeting_view.html"
 
 
+@dataclass(frozen=True)
+class ServiceTable:
+    """
+    Template of a service list (table and pagination) and the fields it renders.
+
+    Rows are fetched as named tuples of these fields only, so the template must not read any other field
+    of a service but its id.
+    """
+
+    template_name: str
+    columns: tuple[str, ...]
+
+
+SERVICES_TABLE = ServiceTable(
+    template_name="includes/services_table.html",
+    columns=(
+        "tsp_name",
+        "tsp_service_name",
+        "tsp_url",
+        "crl_url",
+        "crl_url_status_app",
+        "tsp_service_status",
+        "tsp_service_type",
+        "service_status_app",
+    ),
+)
+PROCESSED_SERVICES_TABLE = ServiceTable(
+    template_name="includes/processed_services_table.html",
+    columns=(
+        "tsp_service_status",
+        "tsp_name",
+        "tsp_service_name",
+        "tsp_service_start_date",
+        "crl_url",
+        "crl_url_status_app",
+    ),
+)
+
+
 class FilteredServiceListView(LoginRequiredMixin, View):
     model: type[TspServiceInfo] = TspServiceInfo
     template_name: str | None = None
+    # List rendered into the page as `service_list`
+    table: ServiceTable | None = None
+    # Whether the rendered list is cached per query string, until the data version changes
+    cache_list: bool = False
     filter_kwargs: Mapping[str, Any] = {}
     order_by_fields: list[str] = []
+    max_page_size: int = 500
 
     def get_queryset(self) -> QuerySet[TspServiceInfo]:
         return self.model.objects.filter(**self.filter_kwargs).order_by(*self.order_by_fields)
 
+    def get_rows(self, qs: QuerySet[TspServiceInfo]) -> QuerySet[TspServiceInfo, Any]:
+        """
+        Projects the filtered queryset on the table columns, plus the primary key and the ordering fields
+        needed by the pagination.
+        """
+        columns = dict.fromkeys(["id", *cast(ServiceTable, self.table).columns, *self.order_by_fields])
+        return qs.values_list(*columns, named=True)
+
+    def get_page_size(self, request: HttpRequest) -> int:
+        """
+        Returns the page size requested with the `page_size` query parameter, or the configured default.
+        """
+        _settings = cast(_SettingsWithServiceLists, cast(object, settings))
+        try:
+            page_size = int(request.GET.get("page_size", _settings.TSL_SERVICES_PAGE_SIZE))
+        except ValueError:
+            page_size = _settings.TSL_SERVICES_PAGE_SIZE
+        return min(max(page_size, 1), self.max_page_size)
+
+    def render_list(self, request: HttpRequest, my_filter: MainViewFilter) -> str:
+        """
+        Renders the requested page of the filtered services.
+        """
+        paginator = KeysetPaginator(self.get_rows(my_filter.qs), self.order_by_fields, self.get_page_size(request))
+        page = paginator.page(after=request.GET.get(AFTER_PARAM), before=request.GET.get(BEFORE_PARAM))
+        page.next_query = page_query(request.GET, AFTER_PARAM, page.next_cursor)
+        page.previous_query = page_query(request.GET, BEFORE_PARAM, page.previous_cursor)
+        context: dict[str, Any] = {
+            "tsp_services": page.object_list,
+            "page_obj": page,
+        }
+        return render_to_string(cast(ServiceTable, self.table).template_name, context, request=request)
+
     def get(self, request: HttpRequest) -> HttpResponse:
         qs: QuerySet[TspServiceInfo] = self.get_queryset()
         my_filter = MainViewFilter(request.GET, queryset=qs)
+
+        if self.cache_list:
+            _settings = cast(_SettingsWithServiceLists, cast(object, settings))
+            key = list_fragment_key(type(self).__name__, request.GET)
+            service_list = cache.get(key)
+            if service_list is None:
+                service_list = self.render_list(request, my_filter)
+                cache.set(key, service_list, _settings.TSL_LIST_CACHE_TIMEOUT)
+        else:
+            service_list = self.render_list(request, my_filter)
+
         context: dict[str, Any] = {
             "my_filter": my_filter,
-            "tsp_services": my_filter.qs,
+            "service_list": service_list,
         }
         template_name = cast(str, self.template_name)
 
@@ -45,6 +138,7 @@ class FilteredServiceListView(LoginRequiredMixin, View):
 
 class NewServicesView(FilteredServiceListView):
     template_name: str = "new_services.html"
+    table: ServiceTable = SERVICES_TABLE
     filter_kwargs: Mapping[str, Any] = {
         "service_status_app__in": [
             ServiceStatus.NEW_NOT_SERVED,
@@ -56,11 +150,15 @@ class NewServicesView(FilteredServiceListView):
 
 class AllServicesView(FilteredServiceListView):
     template_name: str = "all_services.html"
+    table: ServiceTable = SERVICES_TABLE
+    cache_list: bool = True
     order_by_fields: list[str] = ["country_name", "tsp_name", "tsp_service_name", "id"]
 
 
 class ProcessedServicesView(FilteredServiceListView):
     template_name: str = "processed_services.html"
+    table: ServiceTable = PROCESSED_SERVICES_TABLE
+    cache_list: bool = True
     filter_kwargs: Mapping[str, Any] = {"service_status_app": ServiceStatus.SERVED}
     order_by_fields: list[str] = ["id", "country_name", "tsp_name"]
 
@@ -92,6 +190,7 @@ class ConfirmServiceView(LoginRequiredMixin, View):
         tsp_object = self.get_object(pk)
         tsp_object.service_status_app = ServiceStatus.SERVED
         tsp_object.save()
+        bump_data_version()
 
         if request.headers.get("x-requested-with") == "XMLHttpRequest":
             return JsonResponse({"success": True})
@@ -119,9 +218,12 @@ class CrlUrlFormView(LoginRequiredMixin, UpdateView):
 
         if self.request.headers.get("x-requested-with") == "XMLHttpRequest":
             form.save()
+            bump_data_version()
             return JsonResponse({"success": True})
 
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        bump_data_version()
+        return response
 
     def render_to_response(self, context: dict[str, Any], **response_kwargs: Any) -> HttpResponse:
         if self.request.headers.get("x-requested-with") == "XMLHttpRequest":
@@ -136,28 +238,58 @@ class TslStatusView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["tsp_services"] = self.model.objects.all().order_by("country_name")
+        # The validity alerts are computed by the imports, so the page is a single read of the stored rows
+        context["tsp_services"] = self.model.objects.only(
+            "country_name", "tsl_operator_name", "tsl_issue_date", "tsl_expiry_date", "tsl_validity_alert"
+        ).order_by("country_name")
         return context
 
 
-class _SettingsWithDataDir(Protocol):
-    DATA_DIRECTORY: Path
+class _SettingsWithServiceLists(Protocol):
+    TSL_SERVICES_PAGE_SIZE: int
+    TSL_LIST_CACHE_TIMEOUT: int
 
 
 class UpdateServicesView(LoginRequiredMixin, View):
     template_name: str = "update_services_modal_content.html"
 
     def post(self, request: HttpRequest) -> HttpResponse:
-        _settings = cast(_SettingsWithDataDir, cast(object, settings))
-        data_dir: Path = _settings.DATA_DIRECTORY
+        is_ajax = request.headers.get("x-requested-with") == "XMLHttpRequest"
+        try:
+            job_id = start_import_job()
+        except ImportJobError as e:
+            if not is_ajax:
+                messages.error(request, str(e))
+                return redirect("new_services")
+            return JsonResponse({"error": str(e)}, status=503)
+
+        if is_ajax:
+            return JsonResponse(
+                {"job_id": job_id, "progress_url": reverse("import_progress", args=[job_id])},
+                status=202,
+            )
 
-        parser = TslParser(data_dir, COUNTRIES_PL)
-        parsed_services = parser.parse_all()
+        return redirect("new_services")
 
-        updater = ServiceUpdater(parsed_services)
-        updater.run()
 
-        if request.headers.get("x-requested-with") == "XMLHttpRequest":
-            return JsonResponse({"success": True})
+class ImportProgressView(LoginRequiredMixin, View):
+    def get(self, request: HttpRequest, job_id: str) -> HttpResponse:
+        progress = get_import_progress(job_id)
+        if progress is None:
+            return JsonResponse({"error": "Unknown import job."}, status=404)
+        return JsonResponse(progress)
 
-        return redirect("new_services")
+
+class MetricsView(View):
+    """
+    Serves the import metrics of the web app processes in the Prometheus text format, for scraping.
+
+    There is no login: the scraper authenticates with `TSL_METRICS_TOKEN`, if set, and nginx only lets
+    internal networks reach the endpoint. Imports run by the Celery worker are not included; their metrics
+    are pushed to the Pushgateway (see `tsl_manager_app.metrics`).
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        if not is_scrape_authorized(request.headers.get("Authorization", "")):
+            return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+        return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -11,6 +11,8 @@ app = Celery(
 # Configure routing for specific tasks to a dedicated queue
 app.conf.task_routes = {
     "tasks.update_all_tsl_task": {"queue": "tsl"},
+    "tasks.update_country_task": {"queue": "tsl"},
+    "tasks.save_log_task": {"queue": "tsl"},
 }
 
 # Configure periodic task schedules
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The downloader runs from this directory (`python main.py`, `celery -A celery_app`), so its modules import each
+# other as top-level modules; `main` and `metrics` clash with other modules of the repository. Its tests therefore
+# run on their own and without the Django plugin: `python -m pytest -p no:django downloader`.
+DOWNLOADER_DIR = Path(__file__).resolve().parent
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if not config.pluginmanager.has_plugin("django"):
+        sys.path.insert(0, str(DOWNLOADER_DIR))
+
+
+def pytest_ignore_collect(collection_path: Path, config: pytest.Config) -> bool | None:
+    if config.pluginmanager.has_plugin("django"):
+        return True
+    return None
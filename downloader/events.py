@@ -0,0 +1,34 @@
+import logging
+import os
+
+from celery_app import app
+from kombu.exceptions import OperationalError
+
+# Task of the Django app importing the services of one country, and the queue of its worker
+IMPORT_COUNTRY_TASK = "tsl_manager_app.tasks.import_country_task"
+IMPORT_QUEUE = os.getenv("TSL_IMPORT_QUEUE", "import")
+
+# Whether replaced TSL files are announced to the Django app (disable when running without its worker)
+EMIT_IMPORT_EVENTS = os.getenv("TSL_EMIT_IMPORT_EVENTS", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def emit_country_changed(country_code: str, sha256: str) -> None:
+    """
+    Announces that the TSL file of a country was replaced, so the Django app imports its services.
+
+    The event is a Celery message sent by task name to the import queue; the downloader does not
+    depend on the Django code. A broker failure is logged and does not fail the download: the next
+    full import picks the file up anyway.
+
+    Args:
+        country_code: Country code, which names the TSL file.
+        sha256: Hex digest of the new file.
+    """
+    if not EMIT_IMPORT_EVENTS:
+        return
+    try:
+        app.send_task(IMPORT_COUNTRY_TASK, args=(country_code, sha256), queue=IMPORT_QUEUE, retry=False)
+    except OperationalError as e:
+        logging.warning(f"Could not announce the update of {country_code}.xml: {e}")
+        return
+    logging.info(f"Announced the update of {country_code}.xml ({sha256[:12]})")
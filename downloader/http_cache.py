@@ -0,0 +1,155 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+
+from requests import Response
+
+
+class NotModifiedError(Exception):
+    """
+    Raised when the server answers a conditional request with 304 Not Modified.
+    """
+
+
+@dataclass
+class CacheValidators:
+    """
+    HTTP cache validators and content hash remembered for a single URL.
+    """
+
+    etag: str = ""
+    last_modified: str = ""
+    sha256: str = ""
+
+    @classmethod
+    def from_response(cls, response: Response, sha256: str) -> "CacheValidators":
+        """
+        Builds validators from the headers of a successful response.
+
+        Args:
+            response: Response of the GET request.
+            sha256: Hex digest of the downloaded body.
+
+        Returns:
+            Validators describing the downloaded document.
+        """
+        return cls(
+            etag=response.headers.get("ETag", ""),
+            last_modified=response.headers.get("Last-Modified", ""),
+            sha256=sha256,
+        )
+
+    def request_headers(self) -> dict[str, str]:
+        """
+        Returns the conditional request headers (If-None-Match / If-Modified-Since) for these validators.
+        """
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def file_sha256(path: str) -> str | None:
+    """
+    Computes the SHA-256 hex digest of a file.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        The hex digest, or None if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ValidatorStore:
+    """
+    Persistent, thread-safe store of cache validators keyed by URL.
+
+    The store is kept as a JSON document next to the downloaded files, so validators survive between runs.
+    Several processes may share the document: each one only writes back the entries it changed.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Path to the JSON file backing the store.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, CacheValidators] = self._load()
+        self._changed: set[str] = set()
+
+    def _load(self) -> dict[str, CacheValidators]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                raw = json.load(f)
+            return {url: CacheValidators(**values) for url, values in raw.items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError) as e:
+            logging.warning(f"Ignoring unreadable validator store {self.path}: {e}")
+            return {}
+
+    def get_valid(self, url: str, local_path: str) -> CacheValidators | None:
+        """
+        Returns the validators for a URL only if the local copy still matches the remembered content hash.
+
+        Sending conditional headers for a file that is missing or was modified locally would leave
+        the local copy stale, so such entries are ignored.
+
+        Args:
+            url: URL of the document.
+            local_path: Path to the local copy of the document.
+
+        Returns:
+            The stored validators, or None if they cannot be trusted.
+        """
+        with self._lock:
+            validators = self._entries.get(url)
+        if validators is None or file_sha256(local_path) != validators.sha256:
+            return None
+        return validators
+
+    def set(self, url: str, validators: CacheValidators) -> None:
+        """
+        Remembers the validators for a URL.
+
+        Args:
+            url: URL of the document.
+            validators: Validators of the document currently stored on disk.
+        """
+        with self._lock:
+            self._entries[url] = validators
+            self._changed.add(url)
+
+    def save(self) -> None:
+        """
+        Merges the changed entries into the document on disk, replacing it atomically.
+
+        The merge runs under an exclusive file lock, so concurrent processes do not lose each other's updates.
+        """
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(f"{self.path}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            with self._lock:
+                entries = self._load()
+                entries.update({url: self._entries[url] for url in self._changed})
+                self._entries = entries
+                self._changed.clear()
+                data = {url: asdict(validators) for url, validators in entries.items()}
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
@@ -0,0 +1,105 @@
+import os
+import threading
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Connection pool sizing: number of hosts kept alive and connections kept per host
+POOL_CONNECTIONS = int(os.getenv("TSL_POOL_CONNECTIONS", "32"))
+POOL_MAXSIZE = int(os.getenv("TSL_POOL_MAXSIZE", "4"))
+
+# Retry policy for transient errors: sleep = backoff_factor * 2 ** (retry - 1) + random(0, backoff_jitter)
+RETRY_TOTAL = int(os.getenv("TSL_RETRY_TOTAL", "3"))
+RETRY_BACKOFF_FACTOR = float(os.getenv("TSL_RETRY_BACKOFF_FACTOR", "1.0"))
+RETRY_BACKOFF_JITTER = float(os.getenv("TSL_RETRY_BACKOFF_JITTER", "1.0"))
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@dataclass(frozen=True)
+class HostConfig:
+    """
+    Connection settings that differ from the defaults for a specific host.
+    """
+
+    verify_ssl: bool = True
+
+
+DEFAULT_HOST_CONFIG = HostConfig()
+
+# Per-host overrides, keyed by lower-case host name
+HOST_CONFIG: dict[str, HostConfig] = {
+    # Cyprus serves its TSL with a certificate chain that cannot be verified
+    "dec.dmrid.gov.cy": HostConfig(verify_ssl=False),
+}
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_host_config(url: str) -> HostConfig:
+    """
+    Returns the connection settings for the host of the given URL.
+
+    Args:
+        url: URL to be requested.
+
+    Returns:
+        The host-specific settings, or the defaults if the host has no overrides.
+    """
+    host = (urlparse(url).hostname or "").lower()
+    return HOST_CONFIG.get(host, DEFAULT_HOST_CONFIG)
+
+
+def get_verify(verify_ssl: bool) -> str | bool:
+    """
+    Returns the value of the `verify` argument for a request.
+
+    Args:
+        verify_ssl: Whether the server's SSL certificate should be verified.
+
+    Returns:
+        Path to the certifi CA bundle, or False to disable verification.
+    """
+    return certifi.where() if verify_ssl else False
+
+
+def build_session() -> requests.Session:
+    """
+    Creates a session with keep-alive connection pools and a retry policy with exponential backoff and jitter.
+
+    Returns:
+        A configured requests session.
+    """
+    retry = Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        backoff_jitter=RETRY_BACKOFF_JITTER,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the session shared by all downloads of the current process, creating it on first use.
+
+    Returns:
+        The shared requests session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
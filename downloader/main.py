@@ -1,12 +1,27 @@
 import csv
+import hashlib
+import itertools
 import logging
 import os
+import random
+import tempfile
+import threading
+import time
+import uuid
 import xml.etree.ElementTree as ElementTree
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import urlparse
 
-import certifi
+import redis
 import requests
 import urllib3
+from events import emit_country_changed
+from http_cache import CacheValidators, NotModifiedError, ValidatorStore
+from http_session import get_host_config, get_session, get_verify
+from metrics import DOWNLOAD_BYTES, DOWNLOAD_SECONDS, DOWNLOADS, push_metrics
 from requests.exceptions import SSLError
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -17,21 +32,82 @@ LOG_DIR = os.path.join(BASE_DIR, "logs")
 LOG_FILENAME = f"log_{datetime.now():%Y%m%d_%H%M%S}.csv"
 LOGS_PATH = os.path.join(LOG_DIR, LOG_FILENAME)
 LOTL_URL = "https://ec.europa.eu/tools/lotl/eu-lotl.xml"
+# Validator store and LOTL copy live next to the TSL files; they must not use the .xml extension
+VALIDATORS_PATH = os.path.join(SAVE_FOLDER, ".validators.json")
+LOTL_CACHE_PATH = os.path.join(SAVE_FOLDER, ".eu-lotl.cache")
 NAMESPACE = {"tsl": "http://uri.etsi.org/02231/v2#"}
 
+# Concurrency limits for the country fan-out: total parallel downloads and parallel downloads per host
+MAX_WORKERS = int(os.getenv("TSL_MAX_WORKERS", "8"))
+MAX_PER_HOST = int(os.getenv("TSL_MAX_PER_HOST", "2"))
+
+# Download slots per host shared by the Celery workers: Redis key prefix, lease of a slot (seconds,
+# longer than the country task time limit) and interval between two attempts to take a busy host's slot
+HOST_SLOT_KEY_PREFIX = "tsl:host-slots:"
+HOST_SLOT_LEASE = float(os.getenv("TSL_HOST_SLOT_LEASE", "300"))
+HOST_SLOT_POLL_INTERVAL = float(os.getenv("TSL_HOST_SLOT_POLL_INTERVAL", "0.5"))
+
+# Whether to check that the body starts like an XML document before it is written to disk
+SNIFF_XML = os.getenv("TSL_SNIFF_XML", "true").strip().lower() in {"1", "true", "yes", "on"}
+XML_SNIFF_BYTES = 1024
+
+# Size of the buffer used to stream downloads to disk; it bounds the memory used per download
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 
-def download_lotl() -> bytes:
+def download_lotl(store: ValidatorStore | None = None) -> bytes:
     """
     Downloads the EU LOTL XML file content from the specified URL.
 
+    When a validator store is given, the request is conditional and a 304 answer is served
+    from the local LOTL copy.
+
+    Args:
+        store: Optional store of cache validators.
+
     Returns:
         Raw bytes of the LOTL XML document.
     """
-    response = requests.get(LOTL_URL)
+    validators = store.get_valid(LOTL_URL, LOTL_CACHE_PATH) if store else None
+    headers = validators.request_headers() if validators else {}
+
+    response = get_session().get(LOTL_URL, headers=headers, timeout=30)
+    if response.status_code == 304 and validators is not None:
+        logging.info("LOTL not modified, using the local copy")
+        with open(LOTL_CACHE_PATH, "rb") as f:
+            return f.read()
     response.raise_for_status()
-    return response.content
+
+    if store is not None:
+        save_lotl_copy(response.content, LOTL_CACHE_PATH)
+        store.set(LOTL_URL, CacheValidators.from_response(response, hashlib.sha256(response.content).hexdigest()))
+    content: bytes = response.content
+    return content
+
+
+def save_lotl_copy(content: bytes, path: str) -> None:
+    """
+    Saves the local LOTL copy served on 304 answers.
+
+    The content is written to a temporary file of the same folder, flushed to disk with fsync and then renamed
+    over the copy, so an interrupted write or a concurrent worker never leaves a truncated copy behind.
+
+    Args:
+        content: Raw bytes of the LOTL XML document.
+        path: Path of the local LOTL copy.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".eu-lotl.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        safely_replace_file(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
 
 def parse_lotl(lotl_content: bytes) -> list[tuple[str, str]]:
@@ -71,11 +147,9 @@ def parse_lotl(lotl_content: bytes) -> list[tuple[str, str]]:
 def safely_replace_file(temp_path: str, final_path: str) -> None:
     """
     Safely replaces the final file with a temporary file.
-    Removes the existing final file if it exists before renaming.
+    Uses an atomic rename, so readers never observe a missing or partially written file.
     """
-    if os.path.exists(final_path):
-        os.remove(final_path)
-    os.rename(temp_path, final_path)
+    os.replace(temp_path, final_path)
 
 
 def is_valid_xml_content_type(content_type: str) -> bool:
@@ -91,67 +165,149 @@ def is_valid_xml_content_type(content_type: str) -> bool:
     return "xml" in content_type.lower()
 
 
-def download_tsl_file(url: str, temp_path: str, verify_ssl: bool = True) -> bytes | None:
+def looks_like_xml(prefix: bytes) -> bool:
+    """
+    Checks whether the first bytes of a document look like an XML document (and not like HTML or a PDF).
+
+    Args:
+        prefix: The first bytes of the response body.
+
+    Returns:
+        True if the body starts with an XML prolog or element, False otherwise.
+    """
+    start = prefix.removeprefix(b"\xef\xbb\xbf").lstrip().lower()
+    if start.startswith((b"<!doctype html", b"<html")):
+        return False
+    return start.startswith(b"<")
+
+
+class NonXmlContentError(Exception):
+    """
+    Raised when a downloaded document turns out not to be XML.
+    """
+
+    def __init__(self, status: str) -> None:
+        """
+        Args:
+            status: Status message recorded in the update log.
+        """
+        super().__init__(status)
+        self.status = status
+
+
+def download_tsl_file(
+    url: str,
+    temp_path: str,
+    verify_ssl: bool = True,
+    validators: CacheValidators | None = None,
+    sniff_xml: bool = SNIFF_XML,
+) -> CacheValidators | None:
     """
     Downloads a TSL file from the given URL and saves it to a temporary path.
 
+    The response is streamed: its Content-Type (and, optionally, the first bytes of the body) is checked
+    before anything is written, so non-XML documents are abandoned without downloading the rest.
+    The body is then written chunk by chunk while its SHA-256 is computed, and flushed to disk
+    with fsync before the function returns, so the file can be renamed safely.
+
     Args:
         url: URL of the TSL file.
         temp_path: Temporary file path to save the downloaded content.
         verify_ssl: Whether to verify the server's SSL certificate. Use False to disable verification.
+        validators: Validators of the local copy; when given, the request is conditional.
+        sniff_xml: Whether to reject bodies that do not start like an XML document.
 
     Returns:
-        The content of the downloaded file if successful, or None in case of an SSL error.
+        Validators of the downloaded file if successful, or None in case of an SSL error.
+
+    Raises:
+        NotModifiedError: If the server reports that the local copy is still current.
+        NonXmlContentError: If the document is not XML.
     """
+    headers = validators.request_headers() if validators else {}
     try:
-        response = requests.get(url, timeout=15, verify=certifi.where() if verify_ssl else False)
-        response.raise_for_status()
-
-        with open(temp_path, "wb") as f:
-            f.write(response.content)
-
-        return response.content
+        with get_session().get(
+            url, headers=headers, timeout=15, stream=True, verify=get_verify(verify_ssl)
+        ) as response:
+            if response.status_code == 304:
+                raise NotModifiedError(url)
+            response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type", "")
+            if not is_valid_xml_content_type(content_type):
+                raise NonXmlContentError(f"Skipped (Content-Type: {content_type})")
+
+            chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+            first_chunk = next(chunks, b"")
+            if sniff_xml and not looks_like_xml(first_chunk[:XML_SNIFF_BYTES]):
+                raise NonXmlContentError("Skipped (Content is not XML)")
+
+            digest = hashlib.sha256()
+            with open(temp_path, "wb") as f:
+                for chunk in itertools.chain((first_chunk,), chunks):
+                    f.write(chunk)
+                    digest.update(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+        return CacheValidators.from_response(response, digest.hexdigest())
     except SSLError as e:
         logging.error(f"SSL error while downloading {url}: {e}")
         return None
 
 
-def download_and_replace(url: str, save_folder: str, country_code: str) -> tuple[str, bool]:
+def download_and_replace(
+    url: str, save_folder: str, country_code: str, store: ValidatorStore | None = None
+) -> tuple[str, bool]:
     """
     Downloads the TSL XML for a given country and replaces the existing file if valid.
 
+    With a validator store the download is conditional: a 304 answer or a body identical to the
+    local copy leaves the file untouched and is reported as "Unchanged". A replaced file is announced
+    to the Django app, which imports the services of the country.
+
     Args:
         url: TSL file URL.
         save_folder: Destination folder for saving the XML file.
         country_code: Country code for the file name.
+        store: Optional store of cache validators.
 
     Returns:
         A tuple:
-            - status message ("Success", "SSL Error", "Download Error", etc.)
+            - status message ("Success", "Unchanged", "SSL Error", "Download Error", etc.)
             - boolean indicating whether the file was successfully saved.
     """
     final_path = os.path.join(save_folder, f"{country_code}.xml")
     temp_path = os.path.join(save_folder, f"{country_code}_new.xml")
 
     try:
-        # Disable SSL verification only for problematic domain (Cyprus)
-        verify_ssl = not url.startswith("https://dec.dmrid.gov.cy")
+        # SSL verification is disabled only for hosts configured so (Cyprus)
+        verify_ssl = get_host_config(url).verify_ssl
         if not verify_ssl:
             logging.warning(f"SSL verification disabled for {country_code} ({url})")
 
-        head = requests.head(url, timeout=10, allow_redirects=True, verify=certifi.where() if verify_ssl else False)
-        content_type = head.headers.get("Content-Type", "")
-
-        if not is_valid_xml_content_type(content_type):
-            logging.warning(f"Skipped {country_code}: Content-Type is {content_type}")
-            return f"Skipped (Content-Type: {content_type})", False
-
-        content = download_tsl_file(url, temp_path, verify_ssl)
-        if content is None:
+        previous = store.get_valid(url, final_path) if store else None
+        try:
+            validators = download_tsl_file(url, temp_path, verify_ssl, previous)
+        except NotModifiedError:
+            logging.info(f"{country_code}.xml not modified")
+            return "Unchanged", False
+        except NonXmlContentError as e:
+            logging.warning(f"{e.status} for {country_code} ({url})")
+            return e.status, False
+        if validators is None:
             return "SSL Error", False
+        DOWNLOAD_BYTES.labels(country_code).observe(os.path.getsize(temp_path))
+
+        if store is not None:
+            store.set(url, validators)
+        if previous is not None and previous.sha256 == validators.sha256:
+            logging.info(f"{country_code}.xml content unchanged")
+            return "Unchanged", False
 
         safely_replace_file(temp_path, final_path)
         logging.info(f"Updated {country_code}.xml")
+        emit_country_changed(country_code, validators.sha256)
         return "Success", True
 
     except requests.RequestException as e:
@@ -165,6 +321,16 @@ def download_and_replace(url: str, save_folder: str, country_code: str) -> tuple
             os.remove(temp_path)
 
 
+def build_log_path() -> str:
+    """
+    Builds a timestamped path for the log of an update run started now.
+
+    Returns:
+        Path to the CSV log file.
+    """
+    return os.path.join(LOG_DIR, f"log_{datetime.now():%Y%m%d_%H%M%S}.csv")
+
+
 def save_log(log_path: str, rows: list[dict[str, str]]) -> None:
     """
     Saves the operation log to a CSV file.
@@ -180,23 +346,175 @@ def save_log(log_path: str, rows: list[dict[str, str]]) -> None:
         writer.writerows(rows)
 
 
-def update_all_tsl_entries() -> list[dict[str, str]]:
+class HostLimiter:
+    """
+    Limits the number of concurrent requests sent to a single host.
+    """
+
+    def __init__(self, max_per_host: int) -> None:
+        """
+        Args:
+            max_per_host: Maximum number of simultaneous downloads from one host.
+        """
+        self.max_per_host = max_per_host
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        """
+        Blocks until a download slot for the URL's host is free and holds it for the duration of the block.
+
+        Args:
+            url: URL whose host should be throttled.
+        """
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_per_host))
+        with semaphore:
+            yield
+
+
+class RedisHostLimiter:
+    """
+    Limits the number of concurrent requests sent to a single host across all processes sharing a Redis server.
+
+    Every host has a sorted set in Redis holding one token per download slot in use, scored by the time it was
+    taken. A slot is taken atomically by a Lua script, and is released when the block exits; slots older than
+    the lease, left behind by a killed worker, are reclaimed.
+    """
+
+    # KEYS[1]: slots of the host; ARGV: now, lease (seconds), maximum number of slots, token
+    ACQUIRE_SCRIPT = """
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', tonumber(ARGV[1]) - tonumber(ARGV[2]))
+    if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+        redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+        redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])))
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        max_per_host: int,
+        lease: float = HOST_SLOT_LEASE,
+        poll_interval: float = HOST_SLOT_POLL_INTERVAL,
+    ) -> None:
+        """
+        Args:
+            client: Redis client shared by the workers.
+            max_per_host: Maximum number of simultaneous downloads from one host.
+            lease: Seconds after which a slot that was not released is reclaimed; longer than any download.
+            poll_interval: Seconds between two attempts to take a slot of a busy host.
+        """
+        self.client = client
+        self.max_per_host = max_per_host
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._acquire = client.register_script(self.ACQUIRE_SCRIPT)
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        """
+        Blocks until a download slot for the URL's host is free and holds it for the duration of the block.
+
+        Args:
+            url: URL whose host should be throttled.
+        """
+        key = f"{HOST_SLOT_KEY_PREFIX}{urlparse(url).netloc.lower()}"
+        token = uuid.uuid4().hex
+        while not self._acquire(keys=[key], args=[time.time(), self.lease, self.max_per_host, token]):
+            time.sleep(self.poll_interval * random.uniform(0.5, 1.5))
+        try:
+            yield
+        finally:
+            self.client.zrem(key, token)
+
+
+def group_entries_by_country(entries: list[tuple[str, str]]) -> dict[str, list[str]]:
     """
-    Parses the LOTL and attempts to download all referenced country TSL files.
+    Groups LOTL entries by country, keeping the LOTL order of countries and of URLs within a country.
+
+    Args:
+        entries: A list of (country_code, TSL URL) tuples.
 
     Returns:
-        A list of dictionaries with log entries for each country.
+        A dictionary mapping each country code to its TSL URLs.
+    """
+    grouped: dict[str, list[str]] = {}
+    for country_code, url in entries:
+        grouped.setdefault(country_code, []).append(url)
+    return grouped
+
+
+def update_country_entries(
+    country_code: str,
+    urls: list[str],
+    save_folder: str,
+    host_limiter: HostLimiter | RedisHostLimiter,
+    store: ValidatorStore | None = None,
+) -> list[dict[str, str]]:
+    """
+    Downloads all TSL URLs listed for one country.
+
+    URLs of the same country are processed one after another because they share the target file.
+    The time spent on every URL, once its host slot is free, and its outcome are recorded in the download metrics.
+
+    Args:
+        country_code: Country code for the file name.
+        urls: TSL URLs published for the country, in LOTL order.
+        save_folder: Destination folder for saving the XML file.
+        host_limiter: Per-host concurrency limiter shared by all workers (threads or Celery worker processes).
+        store: Optional store of cache validators shared by all workers.
+
+    Returns:
+        A list of log entries, one per URL.
+    """
+    log_rows = []
+    for url in urls:
+        with host_limiter.limit(url):
+            started = time.perf_counter()
+            status, saved = download_and_replace(url, save_folder, country_code, store)
+            DOWNLOAD_SECONDS.labels(country_code).observe(time.perf_counter() - started)
+        DOWNLOADS.labels(country_code, status).inc()
+        log_rows.append({"Country": country_code, "URL": url, "Status": status, "FileSaved": "Yes" if saved else "No"})
+    return log_rows
+
+
+def update_all_tsl_entries(max_workers: int = MAX_WORKERS, max_per_host: int = MAX_PER_HOST) -> list[dict[str, str]]:
+    """
+    Parses the LOTL and downloads all referenced country TSL files concurrently.
+
+    Downloads are conditional on the validators remembered from the previous run, so unchanged
+    files are neither transferred nor rewritten.
+
+    Args:
+        max_workers: Maximum number of countries downloaded at the same time.
+        max_per_host: Maximum number of simultaneous downloads from one host.
+
+    Returns:
+        A list of dictionaries with log entries for each country, grouped by country in LOTL order.
     """
     os.makedirs(SAVE_FOLDER, exist_ok=True)
-    lotl_content = download_lotl()
+    store = ValidatorStore(VALIDATORS_PATH)
+    lotl_content = download_lotl(store)
     entries = parse_lotl(lotl_content)
+    grouped = group_entries_by_country(entries)
+    host_limiter = HostLimiter(max_per_host)
 
-    log_rows = []
-    logging.info("Starting TL update process...")
+    logging.info(f"Starting TL update process for {len(grouped)} countries ({max_workers} workers)...")
 
-    for country_code, url in entries:
-        status, saved = download_and_replace(url, SAVE_FOLDER, country_code)
-        log_rows.append({"Country": country_code, "URL": url, "Status": status, "FileSaved": "Yes" if saved else "No"})
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tsl") as executor:
+        futures = [
+            executor.submit(update_country_entries, country_code, urls, SAVE_FOLDER, host_limiter, store)
+            for country_code, urls in grouped.items()
+        ]
+        log_rows = [row for future in futures for row in future.result()]
+
+    store.save()
+    push_metrics()
 
     return log_rows
 
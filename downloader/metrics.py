@@ -0,0 +1,53 @@
+import logging
+import os
+import socket
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, push_to_gateway
+
+# Prometheus Pushgateway receiving the download metrics; empty disables pushing
+PUSHGATEWAY_URL = os.getenv("TSL_METRICS_PUSHGATEWAY_URL", "")
+PUSH_JOB = "tsl_downloader"
+
+# Registry of the download metrics. Worker processes are not scraped: each one pushes its registry
+# to the Pushgateway under its own grouping key after every country download.
+REGISTRY = CollectorRegistry()
+
+DOWNLOAD_SECONDS = Histogram(
+    "tsl_download_seconds",
+    "Time spent downloading one TSL URL, including conditional requests answered with 304.",
+    ["country"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60),
+    registry=REGISTRY,
+)
+DOWNLOAD_BYTES = Histogram(
+    "tsl_download_bytes",
+    "Size of the downloaded TSL files.",
+    ["country"],
+    buckets=(10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000, 50_000_000),
+    registry=REGISTRY,
+)
+DOWNLOADS = Counter(
+    "tsl_downloads",
+    "Downloaded TSL URLs, by outcome (the status written to the update log).",
+    ["country", "status"],
+    registry=REGISTRY,
+)
+
+
+def push_metrics() -> None:
+    """
+    Pushes the download metrics of this process to the Pushgateway, if one is configured.
+
+    A failed push is logged and does not fail the download.
+    """
+    if not PUSHGATEWAY_URL:
+        return
+    try:
+        push_to_gateway(
+            PUSHGATEWAY_URL,
+            job=PUSH_JOB,
+            registry=REGISTRY,
+            grouping_key={"instance": f"{socket.gethostname()}:{os.getpid()}"},
+        )
+    except OSError as e:
+        logging.warning(f"Could not push the download metrics to {PUSHGATEWAY_URL}: {e}")
@@ -1,19 +1,142 @@
 import logging
 import os
 
+import redis
+from celery import Task, chord
+from celery.exceptions import SoftTimeLimitExceeded
 from celery_app import app
-from main import LOGS_PATH, save_log, update_all_tsl_entries
+from http_cache import ValidatorStore
+from main import (
+    MAX_PER_HOST,
+    SAVE_FOLDER,
+    VALIDATORS_PATH,
+    RedisHostLimiter,
+    build_log_path,
+    download_lotl,
+    group_entries_by_country,
+    parse_lotl,
+    save_log,
+    update_country_entries,
+)
+from metrics import push_metrics
+
+# Limits for a single country download task (seconds) and its retry policy
+COUNTRY_SOFT_TIME_LIMIT = int(os.getenv("TSL_COUNTRY_SOFT_TIME_LIMIT", "120"))
+COUNTRY_TIME_LIMIT = int(os.getenv("TSL_COUNTRY_TIME_LIMIT", "150"))
+COUNTRY_MAX_RETRIES = int(os.getenv("TSL_COUNTRY_MAX_RETRIES", "2"))
+COUNTRY_RETRY_DELAY = int(os.getenv("TSL_COUNTRY_RETRY_DELAY", "60"))
+
+# Log statuses worth another attempt
+RETRYABLE_STATUSES = {"Download Error", "Timeout", "Task Error"}
+
+# Redis server holding the download slots per host shared by all workers; the broker by default
+HOST_SLOTS_REDIS_URL = os.getenv("TSL_HOST_SLOTS_REDIS_URL", app.conf.broker_url)
+
+_host_limiter: RedisHostLimiter | None = None
+
+
+def get_host_limiter() -> RedisHostLimiter:
+    """
+    Returns the per-host limiter of the worker process, creating it on first use.
+
+    The slots live in Redis, so `MAX_PER_HOST` bounds the downloads from a host across all country tasks
+    running in all workers, not only within one country.
+    """
+    global _host_limiter
+    if _host_limiter is None:
+        _host_limiter = RedisHostLimiter(redis.Redis.from_url(HOST_SLOTS_REDIS_URL), MAX_PER_HOST)
+    return _host_limiter
 
 
 @app.task
 def update_all_tsl_task() -> None:
     """
-    Celery task that downloads all TSL files and writes the update log to a CSV file.
+    Celery task that downloads the LOTL and fans out one download task per country.
+
+    The per-country tasks run as the header of a chord whose callback writes the update log
+    to a CSV file, so the countries are downloaded in parallel by the worker pool. The country
+    tasks report their failures as log rows instead of raising, so the callback always runs.
+    """
+    os.makedirs(SAVE_FOLDER, exist_ok=True)
+    store = ValidatorStore(VALIDATORS_PATH)
+    lotl_content = download_lotl(store)
+    store.save()
+
+    grouped = group_entries_by_country(parse_lotl(lotl_content))
+    logging.info(f"Dispatching TL update tasks for {len(grouped)} countries...")
+
+    chord(update_country_task.s(country_code, urls) for country_code, urls in grouped.items())(save_log_task.s())
+
+
+@app.task(
+    bind=True,
+    soft_time_limit=COUNTRY_SOFT_TIME_LIMIT,
+    time_limit=COUNTRY_TIME_LIMIT,
+    max_retries=COUNTRY_MAX_RETRIES,
+)
+def update_country_task(
+    self: Task, country_code: str, urls: list[str], previous_rows: list[dict[str, str]] | None = None
+) -> list[dict[str, str]]:
+    """
+    Celery task that downloads the TSL files of a single country.
+
+    URLs that ended with a download error, a timeout or an unexpected error are retried after a delay;
+    the log rows of the other URLs are carried over from the previous attempt. Once the retries are
+    exhausted the failures are returned as log rows, so a failing country does not fail the chord
+    and the update log of the other countries is still written.
+
+    Args:
+        country_code: Country code for the file name.
+        urls: TSL URLs published for the country, in LOTL order.
+        previous_rows: Log rows of the previous attempt, aligned with `urls`.
+
+    Returns:
+        A list of log entries, one per URL.
+    """
+    store = ValidatorStore(VALIDATORS_PATH)
+    rows = list(previous_rows) if previous_rows else [{} for _ in urls]
+    # Indexes of the URLs this attempt still has to download
+    pending = [index for index, row in enumerate(rows) if not row or row["Status"] in RETRYABLE_STATUSES]
+
+    try:
+        host_limiter = get_host_limiter()
+        while pending:
+            index = pending[0]
+            rows[index] = update_country_entries(country_code, [urls[index]], SAVE_FOLDER, host_limiter, store)[0]
+            pending.pop(0)
+    except SoftTimeLimitExceeded:
+        logging.error(f"Time limit exceeded while downloading {country_code}")
+        _fill_failed_rows(rows, pending, country_code, urls, "Timeout")
+    except Exception as e:
+        logging.error(f"Unexpected error while downloading {country_code}: {e}", exc_info=True)
+        _fill_failed_rows(rows, pending, country_code, urls, "Task Error")
+    finally:
+        store.save()
+        push_metrics()
+
+    if any(row["Status"] in RETRYABLE_STATUSES for row in rows) and self.request.retries < self.max_retries:
+        raise self.retry(args=(country_code, urls), kwargs={"previous_rows": rows}, countdown=COUNTRY_RETRY_DELAY)
+
+    return rows
+
+
+def _fill_failed_rows(
+    rows: list[dict[str, str]], pending: list[int], country_code: str, urls: list[str], status: str
+) -> None:
+    """Records the status of the URLs that were not downloaded when the attempt failed."""
+    for index in pending:
+        rows[index] = {"Country": country_code, "URL": urls[index], "Status": status, "FileSaved": "No"}
+
+
+@app.task
+def save_log_task(results: list[list[dict[str, str]]]) -> None:
+    """
+    Chord callback that writes the log rows of all country tasks to a CSV file.
 
-    This task ensures the logs directory exists, runs the TSL update logic, and
-    saves the output to a predefined log file path.
+    Args:
+        results: Log rows returned by the country tasks, one list per country.
     """
-    os.makedirs(os.path.dirname(LOGS_PATH), exist_ok=True)
-    log_rows = update_all_tsl_entries()
-    save_log(LOGS_PATH, log_rows)
-    logging.info(f"Log saved to: {LOGS_PATH}")
+    log_path = build_log_path()
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    save_log(log_path, [row for rows in results for row in rows])
+    logging.info(f"Log saved to: {log_path}")
@@ -0,0 +1,225 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+import main
+import requests
+from http_cache import CacheValidators, NotModifiedError, ValidatorStore
+from main import DOWNLOAD_CHUNK_SIZE, NonXmlContentError, download_and_replace, download_lotl, download_tsl_file
+
+URL = "https://tsl.example/PL.xml"
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+VALIDATOR_HEADERS = {"ETag": ETAG, "Last-Modified": LAST_MODIFIED}
+XML_HEADERS = {"Content-Type": "application/xml", **VALIDATOR_HEADERS}
+# Larger than one download chunk, so it is written in several
+BODY = b'<?xml version="1.0"?>\n<TSL>' + b"x" * (2 * DOWNLOAD_CHUNK_SIZE) + b"</TSL>"
+DIGEST = hashlib.sha256(BODY).hexdigest()
+
+
+class RecordingBody(io.BytesIO):
+    """
+    Response body recording the size of every read, to check that it is streamed.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.reads: list[int] = []
+
+    def read(self, size: int | None = -1) -> bytes:
+        self.reads.append(-1 if size is None else size)
+        return super().read(size)
+
+
+def _response(status_code: int = 200, body: bytes = b"", headers: dict[str, str] | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.raw = RecordingBody(body)
+    response.url = URL
+    return response
+
+
+class MockSessionTestCase(TestCase):
+    """
+    Replaces the shared session with a mock answering the given responses, in order.
+    """
+
+    def setUp(self) -> None:
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.session = mock.Mock(spec=requests.Session)
+        patcher = mock.patch.object(main, "get_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def respond(self, *responses: requests.Response) -> None:
+        self.session.get.side_effect = list(responses)
+
+    def request_headers(self, call: int = -1) -> dict[str, str]:
+        headers: dict[str, str] = self.session.get.call_args_list[call].kwargs["headers"]
+        return headers
+
+
+class DownloadTslFileTests(MockSessionTestCase):
+    """
+    TSL files are streamed to the temporary file, and documents that are not XML are abandoned before any write.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.temp_path = os.path.join(self.folder, "PL_new.xml")
+
+    def test_body_is_streamed_to_the_temporary_file(self) -> None:
+        response = _response(body=BODY, headers=XML_HEADERS)
+        self.respond(response)
+
+        validators = download_tsl_file(URL, self.temp_path)
+
+        self.assertEqual(validators, CacheValidators(ETAG, LAST_MODIFIED, DIGEST))
+        with open(self.temp_path, "rb") as f:
+            self.assertEqual(f.read(), BODY)
+        self.assertTrue(self.session.get.call_args.kwargs["stream"])
+        reads = response.raw.reads
+        self.assertGreater(len(reads), 2)
+        self.assertTrue(all(0 < size <= DOWNLOAD_CHUNK_SIZE for size in reads))
+
+    def test_non_xml_content_type_is_rejected(self) -> None:
+        response = _response(body=b"<html></html>", headers={"Content-Type": "text/html"})
+        self.respond(response)
+
+        with self.assertRaises(NonXmlContentError) as raised:
+            download_tsl_file(URL, self.temp_path)
+
+        self.assertEqual(raised.exception.status, "Skipped (Content-Type: text/html)")
+        self.assertEqual(response.raw.reads, [])
+        self.assertFalse(os.path.exists(self.temp_path))
+
+    def test_non_xml_body_is_rejected_when_sniffed(self) -> None:
+        body = b"<!DOCTYPE html><html><body>Maintenance</body></html>"
+        self.respond(_response(body=body, headers=XML_HEADERS), _response(body=body, headers=XML_HEADERS))
+
+        with self.assertRaises(NonXmlContentError) as raised:
+            download_tsl_file(URL, self.temp_path, sniff_xml=True)
+        self.assertEqual(raised.exception.status, "Skipped (Content is not XML)")
+        self.assertFalse(os.path.exists(self.temp_path))
+
+        download_tsl_file(URL, self.temp_path, sniff_xml=False)
+        self.assertTrue(os.path.exists(self.temp_path))
+
+    def test_not_modified(self) -> None:
+        self.respond(_response(304))
+
+        with self.assertRaises(NotModifiedError):
+            download_tsl_file(URL, self.temp_path, validators=CacheValidators(ETAG, LAST_MODIFIED, "digest"))
+
+        self.assertEqual(self.request_headers(), {"If-None-Match": ETAG, "If-Modified-Since": LAST_MODIFIED})
+        self.assertFalse(os.path.exists(self.temp_path))
+
+
+class DownloadAndReplaceTests(MockSessionTestCase):
+    """
+    Files are replaced only when their content changed, and the validators of the download are persisted.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.final_path = os.path.join(self.folder, "PL.xml")
+        self.store = ValidatorStore(os.path.join(self.folder, ".validators.json"))
+        patcher = mock.patch.object(main, "emit_country_changed")
+        self.emit_country_changed = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _download(self) -> tuple[str, bool]:
+        status, saved = download_and_replace(URL, self.folder, "PL", self.store)
+        return status, saved
+
+    def _files(self) -> list[str]:
+        return sorted(os.listdir(self.folder))
+
+    def test_download_then_not_modified(self) -> None:
+        self.respond(_response(body=BODY, headers=XML_HEADERS), _response(304))
+
+        self.assertEqual(self._download(), ("Success", True))
+        self.emit_country_changed.assert_called_once_with("PL", DIGEST)
+        self.store.save()
+        with open(self.store.path, encoding="utf-8") as f:
+            self.assertEqual(
+                json.load(f)[URL],
+                {"etag": ETAG, "last_modified": LAST_MODIFIED, "sha256": DIGEST},
+            )
+
+        # A new run reads the validators persisted by the previous one
+        self.store = ValidatorStore(self.store.path)
+        self.assertEqual(self._download(), ("Unchanged", False))
+        self.assertEqual(self.request_headers(), {"If-None-Match": ETAG, "If-Modified-Since": LAST_MODIFIED})
+        self.assertEqual(self.emit_country_changed.call_count, 1)
+        with open(self.final_path, "rb") as f:
+            self.assertEqual(f.read(), BODY)
+
+    def test_identical_body_leaves_the_file_untouched(self) -> None:
+        new_headers = {**XML_HEADERS, "ETag": '"v2"'}
+        self.respond(_response(body=BODY, headers=XML_HEADERS), _response(body=BODY, headers=new_headers))
+        self._download()
+        modified = os.stat(self.final_path).st_mtime_ns
+
+        self.assertEqual(self._download(), ("Unchanged", False))
+        self.assertEqual(os.stat(self.final_path).st_mtime_ns, modified)
+        self.assertEqual(self.emit_country_changed.call_count, 1)
+        # The new validators are remembered for the next conditional request
+        self.assertEqual(self.store.get_valid(URL, self.final_path), CacheValidators('"v2"', LAST_MODIFIED, DIGEST))
+        self.assertEqual(self._files(), ["PL.xml"])
+
+    def test_rejected_document_keeps_the_previous_file(self) -> None:
+        self.respond(
+            _response(body=BODY, headers=XML_HEADERS),
+            _response(body=b"<html></html>", headers={"Content-Type": "text/html"}),
+        )
+        self._download()
+
+        self.assertEqual(self._download(), ("Skipped (Content-Type: text/html)", False))
+        with open(self.final_path, "rb") as f:
+            self.assertEqual(f.read(), BODY)
+        self.assertEqual(self._files(), ["PL.xml"])
+
+    def test_connection_error(self) -> None:
+        self.session.get.side_effect = requests.ConnectionError("refused")
+
+        self.assertEqual(self._download(), ("Download Error", False))
+        self.assertEqual(self._files(), [])
+
+
+class DownloadLotlTests(MockSessionTestCase):
+    """
+    The LOTL is requested conditionally and a 304 answer is served from the local copy.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.cache_path = os.path.join(self.folder, ".eu-lotl.cache")
+        patcher = mock.patch.object(main, "LOTL_CACHE_PATH", self.cache_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = ValidatorStore(os.path.join(self.folder, ".validators.json"))
+
+    def test_download_then_not_modified(self) -> None:
+        self.respond(_response(body=BODY, headers=VALIDATOR_HEADERS), _response(304))
+
+        self.assertEqual(download_lotl(self.store), BODY)
+        self.assertEqual(os.listdir(self.folder), [".eu-lotl.cache"])
+
+        self.assertEqual(download_lotl(self.store), BODY)
+        self.assertEqual(self.request_headers(), {"If-None-Match": ETAG, "If-Modified-Since": LAST_MODIFIED})
+
+    def test_modified_local_copy_is_not_trusted(self) -> None:
+        self.respond(_response(body=BODY, headers=VALIDATOR_HEADERS), _response(body=BODY, headers=VALIDATOR_HEADERS))
+        download_lotl(self.store)
+        with open(self.cache_path, "ab") as f:
+            f.write(b"truncated or edited")
+
+        self.assertEqual(download_lotl(self.store), BODY)
+        self.assertEqual(self.request_headers(), {})
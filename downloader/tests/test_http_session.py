@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+import certifi
+from http_session import (
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_BACKOFF_JITTER,
+    RETRY_STATUS_CODES,
+    RETRY_TOTAL,
+    build_session,
+    get_host_config,
+    get_verify,
+)
+from requests.adapters import HTTPAdapter
+
+
+class BuildSessionTests(TestCase):
+    """
+    Both schemes share an adapter with keep-alive pools and a retry policy with exponential backoff and jitter.
+    """
+
+    def setUp(self) -> None:
+        session = build_session()
+        adapter = session.get_adapter("https://tsl.example/")
+        assert isinstance(adapter, HTTPAdapter)
+        self.adapter = adapter
+        self.session = session
+
+    def test_adapter(self) -> None:
+        self.assertIs(self.session.get_adapter("http://tsl.example/"), self.adapter)
+        self.assertEqual(self.adapter._pool_connections, POOL_CONNECTIONS)
+        self.assertEqual(self.adapter._pool_maxsize, POOL_MAXSIZE)
+
+    def test_retry_policy(self) -> None:
+        retry = self.adapter.max_retries
+
+        self.assertEqual(retry.total, RETRY_TOTAL)
+        self.assertEqual(set(retry.status_forcelist or ()), set(RETRY_STATUS_CODES))
+        self.assertEqual(retry.allowed_methods, frozenset({"GET", "HEAD"}))
+        self.assertTrue(retry.respect_retry_after_header)
+        # The last response is returned rather than raised once the retries are exhausted
+        self.assertFalse(retry.raise_on_status)
+        self.assertTrue(retry.is_retry("GET", 503))
+        self.assertFalse(retry.is_retry("POST", 503))
+        self.assertFalse(retry.is_retry("GET", 404))
+
+    def test_backoff_grows_exponentially_with_jitter(self) -> None:
+        retry = self.adapter.max_retries
+        for attempt in range(1, RETRY_TOTAL + 1):
+            retry = retry.increment("GET", "/PL.xml")
+            # No sleep before the first retry
+            expected = RETRY_BACKOFF_FACTOR * 2 ** (attempt - 1) if attempt > 1 else 0
+            for _ in range(20):
+                with self.subTest(attempt=attempt):
+                    backoff = retry.get_backoff_time()
+                    self.assertGreaterEqual(backoff, expected)
+                    self.assertLessEqual(backoff, expected + RETRY_BACKOFF_JITTER)
+
+
+class HostConfigTests(TestCase):
+    """
+    Certificates are verified against the certifi bundle, except for the hosts configured otherwise.
+    """
+
+    def test_verification(self) -> None:
+        self.assertEqual(get_verify(get_host_config("https://tsl.example/PL.xml").verify_ssl), certifi.where())
+        self.assertIs(get_verify(get_host_config("https://DEC.dmrid.gov.cy/tsl.xml").verify_ssl), False)